@@ -0,0 +1 @@
+"""Benchmarks of ``hikconnect``, see README.md for usage."""
@@ -0,0 +1,213 @@
+"""Fleet-scale benchmarks of ``HikConnect`` against the local API simulator.
+
+Each scenario reports throughput (items per second of wall time) and
+p50/p95/p99 latency of the individual HTTP requests, as measured by
+``hikconnect.profiling.RequestProfiler``.
+
+Usage::
+
+    python -m benchmarks.fleet                      # run and save results
+    python -m benchmarks.fleet --compare            # ... and compare with the baseline
+    python -m benchmarks.fleet --save-baseline      # make the results the new baseline
+"""
+
+import argparse
+import asyncio
+import functools
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from benchmarks import report
+from hikconnect.api import HikConnect
+from hikconnect.batch import raise_for_errors
+from hikconnect.profiling import RequestProfiler
+from hikconnect.simulator import ApiSimulator
+
+BASELINE = Path(__file__).parent / "baseline.json"
+RESULTS = Path(".cache/benchmarks.json")
+
+CONCURRENCY = 20
+
+
+def percentile(values, q):
+    """Return the ``q``-th percentile (0-100) of ``values``, nearest-rank method."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+class _Run:
+    """A logged-in client connected to a fresh simulator of ``devices`` devices."""
+
+    def __init__(self, devices):
+        self.simulator = ApiSimulator(devices=devices)
+        self.profiler = RequestProfiler(slow_threshold=math.inf, history=1_000_000)
+        self.api = HikConnect(profiler=self.profiler)
+
+    async def __aenter__(self):
+        await self.simulator.start()
+        self.api.BASE_URL = self.simulator.base_url
+        await self.api.login("benchmark", "benchmark")
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.api.close()
+        await self.simulator.stop()
+
+    def measure(self):
+        """Start measuring; returns a function finishing the measurement of ``items``."""
+        self.profiler.recent.clear()
+        start = time.perf_counter()
+
+        def finish(items, unit):
+            elapsed = time.perf_counter() - start
+            latencies = [profile.phases()["total"] for profile in self.profiler.recent]
+            return {
+                "items": items,
+                "unit": unit,
+                "requests": len(latencies),
+                "elapsed": elapsed,
+                "throughput": items / elapsed,
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+            }
+
+        return finish
+
+    async def devices(self):
+        return [device async for device in self.api.get_devices()]
+
+
+async def bench_devices_sweep(size):
+    """Full ``get_devices()`` sweep."""
+    async with _Run(size) as run:
+        finish = run.measure()
+        devices = await run.devices()
+        return finish(len(devices), "devices/s")
+
+
+async def bench_inventory_sweep(size):
+    """``get_devices()`` followed by ``get_cameras()`` of every device."""
+    async with _Run(size) as run:
+        finish = run.measure()
+        devices = await run.devices()
+        results = await run.api.batch(concurrency=CONCURRENCY).run(
+            functools.partial(run.api.get_cameras, device["serial"])
+            for device in devices
+        )
+        raise_for_errors(results)
+        return finish(len(devices), "devices/s")
+
+
+async def bench_call_status_polling(size, rounds=10):
+    """``rounds`` rounds of ``get_call_status()`` of ``size`` door stations."""
+    async with _Run(size) as run:
+        serials = [device["serial"] for device in await run.devices()]
+        finish = run.measure()
+        for _ in range(rounds):
+            results = await run.api.batch(concurrency=CONCURRENCY).run(
+                functools.partial(run.api.get_call_status, serial) for serial in serials
+            )
+            raise_for_errors(results)
+        return finish(len(serials) * rounds, "polls/s")
+
+
+async def bench_bulk_area_edit(size):
+    """``edit_area_members()`` of one area on each of ``size`` devices."""
+    async with _Run(size) as run:
+        serials = [device["serial"] for device in await run.devices()]
+        areas = [
+            await run.api.create_area(serial, "Benchmark", [f"{serial}-cam1"])
+            for serial in serials
+        ]
+        finish = run.measure()
+        results = await run.api.batch(concurrency=CONCURRENCY).run(
+            functools.partial(
+                run.api.edit_area_members,
+                area["device_serial"],
+                area["group_id"],
+                add_ids=[f"{area['device_serial']}-cam2"],
+                group_name=area["group_name"],
+            )
+            for area in areas
+        )
+        raise_for_errors(results)
+        return finish(len(areas), "edits/s")
+
+
+SCENARIOS = {
+    "devices_sweep": bench_devices_sweep,
+    "inventory_sweep": bench_inventory_sweep,
+    "call_status_polling": bench_call_status_polling,
+    "bulk_area_edit": bench_bulk_area_edit,
+}
+# fleet sizes each scenario runs with
+SIZES = {
+    "devices_sweep": (100, 1_000, 10_000),
+    "inventory_sweep": (1_000,),
+    "call_status_polling": (100,),
+    "bulk_area_edit": (500,),
+}
+
+
+async def run_benchmarks(only=None, scale=1.0, repeat=3, min_time=1.0):
+    """Run benchmarks (all, or those named in ``only``) and return their results by name.
+
+    Each benchmark runs at least ``repeat`` times and at least ``min_time``
+    seconds in total; medians over the runs are reported to dampen noise.
+    """
+    results = {}
+    for name, benchmark in SCENARIOS.items():
+        if only and name not in only:
+            continue
+        for size in SIZES[name]:
+            size = max(int(size * scale), 1)
+            key = f"{name}[{size}]"
+            runs = [await benchmark(size)]
+            while len(runs) < repeat or sum(r["elapsed"] for r in runs) < min_time:
+                runs.append(await benchmark(size))
+            results[key] = {
+                **runs[0],
+                "runs": len(runs),
+                **{
+                    metric: statistics.median(run[metric] for run in runs)
+                    for metric in ("elapsed", "throughput", "p50", "p95", "p99")
+                },
+            }
+            print(_format_result(key, results[key]), file=sys.stderr)
+    return report.with_environment(results)
+
+
+def _format_result(key, result):
+    return (
+        f"{key:<32} {result['throughput']:>10.1f} {result['unit']:<10}"
+        f" p50={result['p50'] * 1000:.2f}ms p95={result['p95'] * 1000:.2f}ms"
+        f" p99={result['p99'] * 1000:.2f}ms"
+    )
+
+
+# compared metrics and which direction is a regression
+WORSE = {"throughput": "lower", "p95": "higher"}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fleet-scale HikConnect benchmarks.")
+    parser.add_argument("--only", nargs="*", choices=SCENARIOS, help="scenarios to run")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply fleet sizes (e.g. 0.1)"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark")
+    report.add_arguments(parser, RESULTS, BASELINE)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run_benchmarks(args.only, args.scale, args.repeat))
+    return report.save_and_compare(args, results, WORSE)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Microbenchmarks of ``HikConnect`` response parsing on generated fleet payloads.
+
+Each parser reports CPU time per call (best of ``--repeat`` runs, measured
+with ``time.process_time()``) and peak memory allocated while parsing the
+whole fleet and keeping the results (measured with ``tracemalloc``).
+
+Usage::
+
+    python -m benchmarks.parsing                    # run and save results
+    python -m benchmarks.parsing --compare          # ... and compare with the baseline
+    python -m benchmarks.parsing --save-baseline    # make the results the new baseline
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks import report
+from hikconnect.api import HikConnect
+from hikconnect.payloads import call_status_payloads, generate_fleet, pagelist_pages
+
+BASELINE = Path(__file__).parent / "parsing_baseline.json"
+RESULTS = Path(".cache/parsing.json")
+
+
+def _parse_devices(pages):
+    return [
+        HikConnect._parse_device(device, page)  # pylint: disable=protected-access
+        for page in pages
+        for device in page["deviceInfos"]
+    ]
+
+
+def _parse_locks(statuses):
+    return [
+        HikConnect._parse_locks(status)  # pylint: disable=protected-access
+        for status in statuses
+    ]
+
+
+def _clean_ips(values):
+    return [
+        HikConnect._clean_ip(value)  # pylint: disable=protected-access
+        for value in values
+    ]
+
+
+def _parse_call_statuses(payloads):
+    return [
+        HikConnect._parse_call_status(payload)  # pylint: disable=protected-access
+        for payload in payloads
+    ]
+
+
+def make_inputs(size, seed=0):
+    """Return ``{benchmark: (parser, input, number of calls)}`` for a fleet of ``size``."""
+    pages = pagelist_pages(generate_fleet(size, seed=seed, offline_ratio=0.1), limit=50)
+    statuses = [status for page in pages for status in page["statusInfos"].values()]
+    ips = [
+        ip
+        for page in pages
+        for conn in page["connectionInfos"].values()
+        for ip in (conn["localIp"], conn["netIp"], conn["wanIp"], "0.0.0.0")
+    ]
+    payloads = call_status_payloads(size, seed=seed)
+    return {
+        "parse_device": (_parse_devices, pages, size),
+        "parse_locks": (_parse_locks, statuses, len(statuses)),
+        "clean_ip": (_clean_ips, ips, len(ips)),
+        "parse_call_status": (_parse_call_statuses, payloads, len(payloads)),
+    }
+
+
+def measure(parser, data, calls, repeat=5):
+    """Return CPU time per call and peak memory of ``parser(data)``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        parser(data)
+        best = min(best, time.process_time() - start)
+
+    tracemalloc.start()
+    try:
+        result = parser(data)  # keep the result alive, it counts towards the peak
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {
+        "calls": calls,
+        "cpu_ns_per_call": best / calls * 1e9,
+        "peak_bytes": peak,
+        "peak_bytes_per_call": peak / calls,
+    }
+
+
+def run_benchmarks(size=10_000, repeat=5, only=None):
+    """Run the parser benchmarks (all, or those named in ``only``)."""
+    results = {}
+    for name, (parser, data, calls) in make_inputs(size).items():
+        if only and name not in only:
+            continue
+        key = f"{name}[{size}]"
+        results[key] = measure(parser, data, calls, repeat)
+        print(
+            f"{key:<28} {results[key]['cpu_ns_per_call']:>10.0f} ns/call"
+            f" peak={results[key]['peak_bytes'] / 1024:,.0f} KiB",
+            file=sys.stderr,
+        )
+    return report.with_environment(results)
+
+
+# compared metrics and which direction is a regression
+WORSE = {"cpu_ns_per_call": "higher", "peak_bytes_per_call": "higher"}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HikConnect parser microbenchmarks.")
+    parser.add_argument("--size", type=int, default=10_000, help="fleet size")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="benchmarks to run")
+    report.add_arguments(parser, RESULTS, BASELINE)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.size, args.repeat, args.only)
+    return report.save_and_compare(args, results, WORSE)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
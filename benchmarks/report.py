@@ -0,0 +1,73 @@
+"""Saving benchmark results and comparing them with a stored baseline."""
+
+import json
+import platform
+import sys
+from pathlib import Path
+
+
+def with_environment(results):
+    """Return ``results`` (``{benchmark: {metric: value}}``) with environment info."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def add_arguments(parser, output: Path, baseline: Path):
+    parser.add_argument("--output", type=Path, default=output)
+    parser.add_argument("--baseline", type=Path, default=baseline)
+    parser.add_argument("--compare", action="store_true", help="compare with baseline")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="allowed relative regression"
+    )
+
+
+def compare(results, baseline, worse, tolerance=0.25):
+    """Compare ``results`` with ``baseline``.
+
+    Args:
+        worse: ``{metric: "higher" or "lower"}`` - compared metrics and which
+               direction is a regression.
+        tolerance: Allowed relative change in the worse direction.
+
+    Returns:
+        list of ``(key, metric, baseline value, value, change)`` of regressions.
+        Benchmarks missing in either are ignored.
+    """
+    regressions = []
+    for key, result in results["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        for metric, direction in worse.items():
+            change = result[metric] / base[metric] - 1
+            if (change > tolerance) if direction == "higher" else (change < -tolerance):
+                regressions.append((key, metric, base[metric], result[metric], change))
+    return regressions
+
+
+def save_and_compare(args, results, worse):
+    """Save ``results`` as told by ``args``, compare them if asked and return the exit code."""
+    outputs = [args.output] + ([args.baseline] if args.save_baseline else [])
+    for output in outputs:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Results saved to {output}", file=sys.stderr)
+
+    if not args.compare:
+        return 0
+    regressions = compare(
+        results, json.loads(args.baseline.read_text()), worse, args.tolerance
+    )
+    for key, metric, base, value, change in regressions:
+        print(
+            f"REGRESSION {key} {metric}: {base:.4g} -> {value:.4g} ({change:+.0%})",
+            file=sys.stderr,
+        )
+    if regressions:
+        return 1
+    print("No regressions against the baseline.", file=sys.stderr)
+    return 0
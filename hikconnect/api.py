@@ -1,27 +1,96 @@
+# pylint: disable=too-many-lines
+import asyncio
 import datetime
+import functools
 import hashlib
+import inspect
 import json
 import logging
+import time
 from base64 import urlsafe_b64decode
 from contextlib import contextmanager
 
-from aiohttp import ClientSession
-
-from hikconnect.exceptions import DeviceOffline, LoginError
+from aiohttp import ClientError, ClientResponseError, ClientSession
+
+from hikconnect.batch import BatchExecutor
+from hikconnect.budget import CallBudget
+from hikconnect.coordinator import RefreshCoordinator
+from hikconnect.devices import LazyDevice, device_section
+from hikconnect.events import DROP_OLDEST, EventBus, EventPoller
+from hikconnect.exceptions import (
+    DeadlineExceeded,
+    DeviceOffline,
+    HikConnectError,
+    LoginError,
+)
+from hikconnect.history import StatusHistory
+from hikconnect.metrics import Metrics
+from hikconnect.ordering import DeviceSerializer, serialized_per_device
+from hikconnect.profiling import RequestProfiler
+from hikconnect.timeouts import (
+    acquire,
+    as_client_timeout,
+    deadline,
+    resolve_timeout,
+    time_left,
+)
 
 log = logging.getLogger(__name__)
 
+# Errors a single API operation may fail with. Bulk operations catch these to
+# report a per-target failure instead of aborting the whole batch.
+OPERATION_ERRORS = (HikConnectError, ClientError, ValueError, asyncio.TimeoutError)
+
+# endpoints of door commands, they don't queue behind other requests for a connection
+PRIORITY_ENDPOINTS = frozenset(
+    {"call/unlock", "call/answer", "call/cancel", "call/hangup"}
+)
+
+# Max. distinct JSON strings embedded in responses ("lockNum", call status "data")
+# kept decoded by each of the memoized decoders.
+DECODE_CACHE_SIZE = 1024
+
 
 class _HikConnectClient(ClientSession):
     FEATURE_CODE = "deadbeef"  # any non-empty hex string works
 
-    def __init__(self):
+    def __init__(self, trace_configs=None, transport=None, reserved_connections=10):
         headers = {
             "clientType": "55",
             "lang": "en-US",
             "featureCode": self.FEATURE_CODE,
         }
-        super().__init__(raise_for_status=True, headers=headers)
+        super().__init__(
+            raise_for_status=True, headers=headers, trace_configs=trace_configs
+        )
+        # optional layer between HikConnect and the network, see hikconnect.transport
+        self.transport = transport
+        # requests of other than PRIORITY_ENDPOINTS leave ``reserved_connections``
+        # of the connection pool free (no limit for an unlimited pool)
+        limit = self.connector.limit if self.connector is not None else 0
+        self._regular = (
+            asyncio.Semaphore(max(limit - reserved_connections, 1)) if limit else None
+        )
+
+    async def fetch(self, endpoint, method, url, **kwargs):
+        """Send a request through ``transport`` and return its status and body."""
+        if self._regular is None or endpoint in PRIORITY_ENDPOINTS:
+            return await self._fetch(endpoint, method, url, **kwargs)
+        await acquire(self._regular, "a connection")
+        try:
+            return await self._fetch(endpoint, method, url, **kwargs)
+        finally:
+            self._regular.release()
+
+    async def _fetch(self, endpoint, method, url, **kwargs):
+        if self.transport is None:
+            return await self.send(method, url, **kwargs)
+        return await self.transport(self.send, endpoint, method, url, **kwargs)
+
+    async def send(self, method, url, **kwargs):
+        """Send a request over the network and return its status and body."""
+        async with self.request(method, url, **kwargs) as res:
+            return res.status, await res.read()
 
     def set_session_id(self, session_id):
         self.headers.update({"sessionId": session_id})
@@ -39,8 +108,25 @@ class _HikConnectClient(ClientSession):
             self.headers["sessionId"] = session_id
 
 
+class _AreaEdits:  # pylint: disable=too-few-public-methods
+    """Edits of one area to be applied together by ``edit_area_members()``."""
+
+    def __init__(self):
+        self.edits: list[tuple[list, set]] = []  # (add_ids, remove_ids) in call order
+        self.group_name = None
+
+
+class _AreaEditBatch(_AreaEdits):  # pylint: disable=too-few-public-methods
+    """Edits of one area waiting to be applied together by a task of their own."""
+
+    def __init__(self, apply):
+        super().__init__()
+        # starts running on the next event loop iteration, after the first edit is queued
+        self.task = asyncio.ensure_future(apply(self))
+
+
 class HikConnect:
-    # pylint: disable=too-many-public-methods
+    # pylint: disable=too-many-public-methods,too-many-instance-attributes
 
     BASE_URL = "https://api.hik-connect.com"
 
@@ -59,10 +145,131 @@ class HikConnect:
         "lockNum": "lock_number",
     }
 
-    def __init__(self):
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        metrics: Metrics | None = None,
+        profiler: RequestProfiler | None = None,
+        budget: CallBudget | None = None,
+        transport=None,
+        history: StatusHistory | None = None,
+        rules=None,
+        hedging=None,
+        timeouts: dict | None = None,
+        reserved_connections: int = 10,
+    ):
         self._refresh_session_id = None
         self.login_valid_until = None
-        self.client = _HikConnectClient()
+        # reserved_connections of the session's pool are kept for door commands
+        self.client = _HikConnectClient(
+            trace_configs=[profiler.trace_config] if profiler else None,
+            transport=transport,
+            reserved_connections=reserved_connections,
+        )
+        self.metrics = metrics
+        self.profiler = profiler
+        self.budget = budget
+        # optional hedging.HedgingPolicy racing duplicates of slow reads
+        self.hedging = hedging
+        # endpoint ("*" for the others) -> ClientTimeout, see hikconnect.timeouts
+        self.timeouts = {
+            endpoint: as_client_timeout(timeout)
+            for endpoint, timeout in (timeouts or {}).items()
+        }
+        self.history = history
+        # rules.RuleEngine reacting to call status changes, see hikconnect.rules
+        self.rules = rules
+        # (device_serial, old group_id) -> group_id of the area recreated by update_area()
+        self._area_group_ids: dict[tuple[str, int], int] = {}
+        # (device_serial, group_id) -> _AreaEditBatch not yet being applied
+        self._area_edit_batches: dict[tuple[str, int], _AreaEditBatch] = {}
+        # device_serial -> "locks" of the device as last seen by get_devices()
+        self.device_locks: dict[str, dict[int, int]] = {}
+        # area mutations of one device run in order, see ordering.DeviceSerializer
+        self.device_serializer = DeviceSerializer()
+        # one refresh loop shared by its listeners and subscribe(), refreshing
+        # the kinds required by them, e.g. coordinator.require(["cameras"])
+        self.coordinator = RefreshCoordinator(self, kinds=())
+        # change events of subscribe(), published from the coordinator's cycles
+        self.events = EventBus()
+        self.poller = EventPoller(self.coordinator, self.events)
+
+    async def _request(self, method, endpoint, url, **kwargs):
+        """Send a request and return its decoded JSON body.
+
+        ``endpoint`` is a logical name of the API endpoint used for metrics,
+        profiling, call budgets, timeouts and hedging.
+        """
+        timeout = resolve_timeout(self.timeouts, endpoint, self.client.timeout)
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        if self.hedging is not None and self.hedging.applies(endpoint, method):
+            # a duplicate is a request of its own: charged, measured and profiled
+            return await self.hedging.run(
+                endpoint,
+                functools.partial(self._send, method, endpoint, url, **kwargs),
+            )
+        return await self._send(method, endpoint, url, **kwargs)
+
+    async def _send(  # pylint: disable=too-many-locals
+        self, method, endpoint, url, **kwargs
+    ):
+        if self.metrics is None and self.profiler is None and self.budget is None:
+            _, body = await self.client.fetch(endpoint, method, url, **kwargs)
+            return self._decode_json(body)
+
+        if self.budget is not None:
+            self.budget.acquire(endpoint)  # raises BudgetExceeded before sending
+
+        profiler, profile = self.profiler, None
+        if profiler is not None:
+            profile = profiler.start(endpoint, method, url)
+            kwargs["trace_request_ctx"] = profile
+        status = res_json = None
+        error: BaseException | None = None
+        size = 0
+        start = time.perf_counter()
+        try:
+            status, body = await self.client.fetch(endpoint, method, url, **kwargs)
+            size = len(body)
+            if profile is not None:
+                profile.mark("body_read")
+            res_json = self._decode_json(body)
+            if profile is not None:
+                profile.mark("decoded")
+        except ClientResponseError as e:
+            status, error = e.status, e
+            raise
+        except asyncio.CancelledError as e:
+            # e.g. the loser of a hedged request, it didn't fail
+            status, error = "cancelled", e
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            if self.metrics is not None:
+                self.metrics.observe(
+                    endpoint, status, self._parse_meta_code(res_json), elapsed, size
+                )
+            if self.budget is not None:
+                self.budget.record(endpoint, size, elapsed)
+            if profiler is not None:
+                profiler.finish(profile, error)
+        return res_json
+
+    @staticmethod
+    def _decode_json(body):
+        body = body.strip()
+        return json.loads(body) if body else None
+
+    @staticmethod
+    def _parse_meta_code(res_json):
+        try:
+            return res_json["meta"]["code"]
+        except (KeyError, TypeError):
+            return None
 
     async def login(self, username: str, password: str):
         """Login to HikConnect and save state for use by other methods."""
@@ -71,10 +278,9 @@ class HikConnect:
             "password": hashlib.md5(password.encode("utf-8")).hexdigest(),
             # "imageCode": "",  # required when CAPTCHA is presented - plaintext captcha input
         }
-        async with self.client.post(
-            f"{self.BASE_URL}/v3/users/login/v2", data=data
-        ) as res:
-            res_json = await res.json()
+        res_json = await self._request(
+            "POST", "login", f"{self.BASE_URL}/v3/users/login/v2", data=data
+        )
         log.debug("Got login response '%s'", res_json)
 
         if res_json["meta"]["code"] in (1013, 1014):
@@ -91,7 +297,8 @@ class HikConnect:
         if res_json["meta"]["code"] == 1100:
             # https://github.com/tomasbedrich/home-assistant-hikconnect/issues/16
             new_api_domain = res_json["loginArea"]["apiDomain"]
-            self.BASE_URL = f"https://{new_api_domain}"
+            scheme = self.BASE_URL.split("://", 1)[0]
+            self.BASE_URL = f"{scheme}://{new_api_domain}"
             log.debug("Switching API domain to '%s'", self.BASE_URL)
             return await self.login(username, password)
 
@@ -114,11 +321,13 @@ class HikConnect:
             "refreshSessionId": self._refresh_session_id,
             "featureCode": _HikConnectClient.FEATURE_CODE,
         }
-        with self.client.without_session_id() as client:
-            async with client.put(
-                f"{self.BASE_URL}/v3/apigateway/login", data=data
-            ) as res:
-                res_json = await res.json()
+        with self.client.without_session_id():
+            res_json = await self._request(
+                "PUT",
+                "login/refresh",
+                f"{self.BASE_URL}/v3/apigateway/login",
+                data=data,
+            )
         log.debug("Got refresh login response '%s'", res_json)
 
         try:
@@ -150,36 +359,71 @@ class HikConnect:
             hours=1
         )
 
-    async def get_devices(self):
-        """Get info about devices associated with currently logged user."""
+    async def get_devices(self, lazy=False):
+        """
+        Get info about devices associated with currently logged user.
+
+        With `lazy=True`, yield `LazyDevice` mappings parsing the device data only
+        when read, which also give access to the extra sections of the device list
+        (no-disturb state, switch state, P2P, ...). See `hikconnect.devices`.
+        """
+        async for res_json in self.get_device_pages():
+            for device in res_json["deviceInfos"]:
+                if lazy:
+                    serial = device["deviceSerial"]
+                    status = device_section(res_json, "statusInfos", serial)
+                    self.device_locks[serial] = self._parse_locks(status)
+                    yield LazyDevice(device, res_json, self._parse_device)
+                else:
+                    parsed = self._parse_device(device, res_json)
+                    self.device_locks[parsed["serial"]] = parsed["locks"]
+                    yield parsed
+
+    async def get_device_pages(self):
+        """Get raw device list responses, one per page (e.g. for `hikconnect.snapshot`)."""
         limit, offset, has_next_page = 50, 0, True
         while has_next_page:
-            async with self.client.get(
-                f"{self.BASE_URL}/v3/userdevices/v1/devices/pagelist?groupId=-1&limit={limit}&offset={offset}&filter=TIME_PLAN,CONNECTION,SWITCH,STATUS,STATUS_EXT,WIFI,NODISTURB,P2P,KMS,HIDDNS"
-            ) as res:
-                res_json = await res.json()
+            res_json = await self._request(
+                "GET",
+                "devices/pagelist",
+                f"{self.BASE_URL}/v3/userdevices/v1/devices/pagelist?groupId=-1&limit={limit}&offset={offset}&filter=TIME_PLAN,CONNECTION,SWITCH,STATUS,STATUS_EXT,WIFI,NODISTURB,P2P,KMS,HIDDNS",
+            )
             log.debug("Got device list response '%s'", res_json)
             log.info("Received device list")
-            for device in res_json["deviceInfos"]:
-                yield self._parse_device(device, res_json)
+            if self.history is not None:
+                self._record_history(self.history, res_json)
+            yield res_json
             offset += limit
             has_next_page = res_json["page"]["hasNext"]
 
+    @classmethod
+    def _record_history(cls, history, res_json):
+        now = time.time()
+        for device in res_json["deviceInfos"]:
+            serial = device["deviceSerial"]
+            is_online = cls._parse_is_online(
+                device_section(res_json, "statusInfos", serial)
+            )
+            wifi_signal = cls._parse_wifi_signal(
+                device_section(res_json, "wifiInfos", serial)
+            )
+            history.record_device(
+                serial, is_online, wifi_signal if is_online else None, now
+            )
+
     @classmethod
     def _parse_device(cls, device, res_json):
         serial = device["deviceSerial"]
-        conn = (res_json.get("connectionInfos") or {}).get(serial) or {}
-        status = (res_json.get("statusInfos") or {}).get(serial) or {}
-        wifi = (res_json.get("wifiInfos") or {}).get(serial) or {}
+        conn = device_section(res_json, "connectionInfos", serial)
+        status = device_section(res_json, "statusInfos", serial)
+        wifi = device_section(res_json, "wifiInfos", serial)
 
         is_online = cls._parse_is_online(status)
         local_ip = cls._clean_ip(conn.get("localIp")) or cls._clean_ip(
             wifi.get("address")
         )
         wan_ip = cls._clean_ip(conn.get("netIp"))
-        wifi_signal = (
-            wifi.get("signal") if isinstance(wifi.get("signal"), int) else None
-        )
+        wifi_signal = cls._parse_wifi_signal(wifi)
 
         # Cloud keeps stale IP/signal after device goes offline; clear them.
         if not is_online:
@@ -210,27 +454,40 @@ class HikConnect:
         code = status.get("globalStatus")
         return (code == 1) if code is not None else None
 
+    @staticmethod
+    def _parse_wifi_signal(wifi):
+        signal = wifi.get("signal")
+        return signal if isinstance(signal, int) else None
+
     @staticmethod
     def _parse_update_available(status):
         value = status.get("upgradeAvailable")
         return bool(value) if value is not None else None
 
-    @staticmethod
-    def _parse_locks(status):
+    @classmethod
+    def _parse_locks(cls, status):
         # "lockNum" format: {"1":1,"2":1,...} meaning <channel number>: <number of locks connected>
         # Some devices don't have "lockNum" (e.g. NVRs like DS-7608NI-K2-8P).
         try:
-            locks_json = json.loads(status["optionals"]["lockNum"])
+            lock_num = status["optionals"]["lockNum"]
         except KeyError:
             return {}
-        return {int(k): v for k, v in locks_json.items()}
+        return dict(cls._decode_locks(lock_num))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=DECODE_CACHE_SIZE)
+    def _decode_locks(lock_num):
+        # A fleet has only a few distinct "lockNum" strings, decode each once. Cached
+        # results are shared, hence immutable; callers get a fresh dict.
+        return tuple((int(k), v) for k, v in json.loads(lock_num).items())
 
     async def get_cameras(self, device_serial: str):
         """Get info about cameras connected to a device."""
-        async with self.client.get(
-            f"{self.BASE_URL}/v3/userdevices/v1/cameras/info?deviceSerial={device_serial}"
-        ) as res:
-            res_json = await res.json()
+        res_json = await self._request(
+            "GET",
+            "cameras/info",
+            f"{self.BASE_URL}/v3/userdevices/v1/cameras/info?deviceSerial={device_serial}",
+        )
         log.debug("Got camera list response '%s'", res_json)
         log.info("Received camera info for device '%s'", device_serial)
         for camera in res_json["cameraInfos"]:
@@ -244,6 +501,8 @@ class HikConnect:
 
     # ------------------------------------------------------------------
     # Area (group) management
+    # Mutations run in order per device and in parallel across devices,
+    # see ``self.device_serializer`` for per-device queue depths.
     # ------------------------------------------------------------------
 
     async def get_areas(self, device_serial: str):
@@ -255,10 +514,11 @@ class HikConnect:
 
         ``mode`` meanings (as observed): 0 = disarmed, 1 = armed, 2 = armed-silent.
         """
-        async with self.client.get(
-            f"{self.BASE_URL}/v3/devices/group/{device_serial}/list"
-        ) as res:
-            res_json = await res.json()
+        res_json = await self._request(
+            "GET",
+            "group/list",
+            f"{self.BASE_URL}/v3/devices/group/{device_serial}/list",
+        )
         log.debug("Got area list response '%s'", res_json)
         log.info("Received area list for device '%s'", device_serial)
         for area in res_json["list"]:
@@ -280,10 +540,11 @@ class HikConnect:
 
         ``member_id`` corresponds to a camera ``id`` returned by ``get_cameras()``.
         """
-        async with self.client.get(
-            f"{self.BASE_URL}/v3/devices/group/{device_serial}/{group_id}"
-        ) as res:
-            res_json = await res.json()
+        res_json = await self._request(
+            "GET",
+            "group/detail",
+            f"{self.BASE_URL}/v3/devices/group/{device_serial}/{group_id}",
+        )
         log.debug("Got area detail response '%s'", res_json)
         log.info(
             "Received area detail for device '%s' group '%d'", device_serial, group_id
@@ -297,6 +558,7 @@ class HikConnect:
             for member in res_json["list"]
         ]
 
+    @serialized_per_device
     async def create_area(
         self, device_serial: str, group_name: str, resource_ids: list
     ):
@@ -315,10 +577,12 @@ class HikConnect:
             ``mode``, ``create_time``, ``modify_time``.
         """
         payload = {"groupName": group_name, "resourceIds": resource_ids}
-        async with self.client.post(
-            f"{self.BASE_URL}/v3/devices/group/{device_serial}", json=payload
-        ) as res:
-            res_json = await res.json()
+        res_json = await self._request(
+            "POST",
+            "group/create",
+            f"{self.BASE_URL}/v3/devices/group/{device_serial}",
+            json=payload,
+        )
         log.debug("Got create area response '%s'", res_json)
         log.info("Created area '%s' on device '%s'", group_name, device_serial)
         if "groupInfo" not in res_json:
@@ -334,8 +598,14 @@ class HikConnect:
             "modify_time": info["modifyTime"],
         }
 
-    async def update_area(
-        self, device_serial: str, group_id: int, group_name: str, resource_ids: list
+    async def update_area(  # pylint: disable=too-many-arguments
+        self,
+        device_serial: str,
+        group_id: int,
+        group_name: str,
+        resource_ids: list,
+        *,
+        timeout: float | None = None,
     ):
         """Update an existing area (group) on a device.
 
@@ -353,13 +623,22 @@ class HikConnect:
             group_name: Name for the recreated area.
             resource_ids: Complete list of camera ``id`` strings for the area.
                           Must contain at least one ID.
+            timeout: Seconds for the whole update, see ``timeouts.deadline()``:
+                     waiting for other operations on the device and both
+                     requests. If it runs out after the delete, the area is
+                     gone, like when the create fails otherwise.
 
         Returns:
             dict with the same shape as ``create_area()`` / ``get_areas()``
             items, including the new ``group_id``.
         """
-        await self.delete_area(device_serial, group_id)
-        result = await self.create_area(device_serial, group_name, resource_ids)
+        # the deadline includes waiting for the turn of the device
+        with deadline(timeout):
+            async with self.device_serializer.hold(device_serial):
+                await self.delete_area(device_serial, group_id)
+                result = await self.create_area(device_serial, group_name, resource_ids)
+                self._area_group_ids[(device_serial, group_id)] = result["group_id"]
+                self._area_group_ids.pop((device_serial, result["group_id"]), None)
         log.info(
             "Area '%d' on device '%s' replaced by new area '%d'",
             group_id,
@@ -368,6 +647,17 @@ class HikConnect:
         )
         return result
 
+    def resolve_area_group_id(self, device_serial: str, group_id: int) -> int:
+        """Return the current ``group_id`` of an area which may have been recreated.
+
+        ``update_area()`` (and therefore ``edit_area_members()``) replaces the
+        area by a new one with a new ``group_id``. This follows such
+        replacements done by this instance, so stale IDs keep working.
+        """
+        while (device_serial, group_id) in self._area_group_ids:
+            group_id = self._area_group_ids[(device_serial, group_id)]
+        return group_id
+
     # pylint: disable=too-many-arguments
     async def edit_area_members(
         self,
@@ -377,6 +667,7 @@ class HikConnect:
         add_ids: list | None = None,
         remove_ids: list | None = None,
         group_name: str | None = None,
+        timeout: float | None = None,
     ) -> dict:
         """Add and/or remove members from an area, auto-deleting if it becomes empty.
 
@@ -385,6 +676,14 @@ class HikConnect:
         The area cannot be empty on the Hik-Connect platform, so deletion is
         automatic when the last member would be removed.
 
+        Concurrent calls for the same area are coalesced: edits queued while
+        another edit of the area is running are applied together, in call
+        order, by a single delete → recreate. A ``group_id`` of an area
+        recreated earlier by this instance is followed automatically (see
+        ``resolve_area_group_id()``). Called by a task holding the device
+        (``device_serializer.hold()``), the edit is applied by the task
+        itself, without coalescing.
+
         Args:
             device_serial: Serial of the NVR/device.
             group_id: ID of the area to edit (from ``get_areas()``).
@@ -395,12 +694,20 @@ class HikConnect:
                         the name is fetched automatically via ``get_areas()``.
                         Pass it explicitly to avoid an extra API round-trip when
                         the caller already has the area info cached.
+            timeout: Seconds for the whole edit, all its requests together,
+                     see ``timeouts.deadline()``. Coalesced edits are applied
+                     within the deadline of the call which started the batch,
+                     later calls only stop waiting at theirs.
 
         Returns:
             dict with key ``"action"``:
 
             * ``"updated"`` — area was modified; also contains ``"member_ids"``
-              (the new list of member IDs after the edit).
+              (the new list of member IDs after the edit), the new
+              ``"group_id"``, the replaced ``"previous_group_id"`` and
+              ``"area"``, the recreated area as returned by ``update_area()``.
+            * ``"unchanged"`` — the edit was a no-op, nothing was sent; also
+              contains ``"member_ids"``.
             * ``"deleted"`` — area was deleted because no members remained.
 
         Raises:
@@ -408,6 +715,7 @@ class HikConnect:
                         ``None``.
             LookupError: If ``group_name`` is ``None`` and the area cannot be
                          found in ``get_areas()`` (e.g. wrong ``group_id``).
+            DeadlineExceeded: If ``timeout`` ran out.
         """
         add_ids = list(add_ids or [])
         remove_ids_set = set(remove_ids or [])
@@ -417,54 +725,121 @@ class HikConnect:
                 "At least one of 'add_ids' or 'remove_ids' must be provided."
             )
 
-        # Fetch current members
-        current_members = await self.get_area(device_serial, group_id)
-        current_ids = [m["member_id"] for m in current_members]
-
-        # Resolve group_name if not supplied
-        if group_name is None:
-            async for area in self.get_areas(device_serial):
-                if area["group_id"] == group_id:
-                    group_name = area["group_name"]
-                    break
-            if group_name is None:
-                raise LookupError(
-                    f"Area with group_id={group_id} not found on device '{device_serial}'."
+        key = (device_serial, self.resolve_area_group_id(device_serial, group_id))
+        if self.device_serializer.holds(device_serial):
+            # a batch task would wait for the caller's hold forever, apply it here
+            edits = _AreaEdits()
+            edits.edits.append((add_ids, remove_ids_set))
+            edits.group_name = group_name
+            with deadline(timeout):
+                return dict(await self._apply_area_edits(key, edits))
+        with deadline(timeout):
+            batch = self._area_edit_batches.get(key)
+            if batch is None:
+                # the task inherits the deadline of this call
+                batch = self._area_edit_batches[key] = _AreaEditBatch(
+                    functools.partial(self._apply_area_edits, key)
                 )
+            batch.edits.append((add_ids, remove_ids_set))
+            if group_name is not None:
+                batch.group_name = group_name
+            try:
+                # shield: a cancelled caller must not cancel edits of the other callers
+                return dict(
+                    await asyncio.wait_for(asyncio.shield(batch.task), time_left())
+                )
+            except asyncio.TimeoutError:
+                if batch.task.done():
+                    # finished meanwhile, e.g. a request of the edit timed out or
+                    # the edit's own wait for the device hit the same deadline
+                    return dict(batch.task.result())
+                raise DeadlineExceeded(
+                    f"Deadline exceeded waiting for edits of area {key[1]} on device '{device_serial}'"
+                ) from None
+
+    async def _apply_area_edits(self, key, batch):
+        device_serial, group_id = key
+        async with self.device_serializer.hold(device_serial):
+            # edits arriving from now on go to a new batch
+            if self._area_edit_batches.get(key) is batch:
+                del self._area_edit_batches[key]
+            group_id = self.resolve_area_group_id(device_serial, group_id)
+
+            # Fetch current members
+            current_members = await self.get_area(device_serial, group_id)
+            current_ids = [m["member_id"] for m in current_members]
+
+            new_ids = current_ids
+            for add_ids, remove_ids in batch.edits:
+                new_ids = self._edit_member_ids(new_ids, add_ids, remove_ids)
+
+            if new_ids == current_ids:
+                log.info(
+                    "Area '%d' on device '%s' unchanged (%d edit(s) were no-op)",
+                    group_id,
+                    device_serial,
+                    len(batch.edits),
+                )
+                return {
+                    "action": "unchanged",
+                    "group_id": group_id,
+                    "member_ids": new_ids,
+                }
+
+            if not new_ids:
+                # Last member removed — the API forbids empty areas, so delete it
+                await self.delete_area(device_serial, group_id)
+                log.info(
+                    "Area '%d' on device '%s' deleted (no members remaining)",
+                    group_id,
+                    device_serial,
+                )
+                return {"action": "deleted", "group_id": group_id}
 
-        # Build new member list: (current ∪ add_ids) \ remove_ids, preserving order
-        seen: set[str] = set()
-        new_ids: list[str] = []
-        for mid in current_ids + add_ids:
-            if mid not in remove_ids_set and mid not in seen:
-                seen.add(mid)
-                new_ids.append(mid)
-
-        if not new_ids:
-            # Last member removed — the API forbids empty areas, so delete it
-            await self.delete_area(device_serial, group_id)
+            # Resolve group_name if not supplied
+            group_name = batch.group_name
+            if group_name is None:
+                async for area in self.get_areas(device_serial):
+                    if area["group_id"] == group_id:
+                        group_name = area["group_name"]
+                        break
+                if group_name is None:
+                    raise LookupError(
+                        f"Area with group_id={group_id} not found on device '{device_serial}'."
+                    )
+
+            # update_area = delete + recreate; returns new group info
+            new_area = await self.update_area(
+                device_serial, group_id, group_name, new_ids
+            )
             log.info(
-                "Area '%d' on device '%s' deleted (no members remaining)",
+                "Area '%d' on device '%s' updated -> new group_id=%d, %d member(s), %d edit(s) coalesced",
                 group_id,
                 device_serial,
+                new_area["group_id"],
+                len(new_ids),
+                len(batch.edits),
             )
-            return {"action": "deleted", "group_id": group_id}
+            return {
+                "action": "updated",
+                "group_id": new_area["group_id"],
+                "previous_group_id": group_id,
+                "member_ids": new_ids,
+                "area": new_area,
+            }
 
-        # update_area = delete + recreate; returns new group info
-        new_area = await self.update_area(device_serial, group_id, group_name, new_ids)
-        log.info(
-            "Area '%d' on device '%s' updated -> new group_id=%d, %d member(s)",
-            group_id,
-            device_serial,
-            new_area["group_id"],
-            len(new_ids),
-        )
-        return {
-            "action": "updated",
-            "group_id": new_area["group_id"],
-            "member_ids": new_ids,
-        }
+    @staticmethod
+    def _edit_member_ids(member_ids, add_ids, remove_ids):
+        # (member_ids ∪ add_ids) \ remove_ids, preserving order
+        seen: set[str] = set()
+        new_ids: list[str] = []
+        for mid in member_ids + add_ids:
+            if mid not in remove_ids and mid not in seen:
+                seen.add(mid)
+                new_ids.append(mid)
+        return new_ids
 
+    @serialized_per_device
     async def delete_area(self, device_serial: str, group_id: int):
         """Delete an area (group).
 
@@ -472,10 +847,11 @@ class HikConnect:
             device_serial: Serial of the NVR/device.
             group_id: ID of the area to delete (from ``get_areas()``).
         """
-        async with self.client.delete(
-            f"{self.BASE_URL}/v3/devices/group/{device_serial}/{group_id}"
-        ) as res:
-            res_json = await res.json()
+        res_json = await self._request(
+            "DELETE",
+            "group/delete",
+            f"{self.BASE_URL}/v3/devices/group/{device_serial}/{group_id}",
+        )
         log.debug("Got delete area response '%s'", res_json)
 
         meta = res_json.get("meta", {})
@@ -484,6 +860,7 @@ class HikConnect:
 
         log.info("Deleted area '%d' on device '%s'", group_id, device_serial)
 
+    @serialized_per_device
     async def set_area_defence_mode(self, device_serial: str, group_id: int, mode: int):
         """Set the defence (arm/disarm) mode for an area.
 
@@ -496,11 +873,12 @@ class HikConnect:
         and ``disarm_area()`` instead of calling this directly.
         """
         payload = {"groupId": group_id, "mode": mode}
-        async with self.client.post(
+        res_json = await self._request(
+            "POST",
+            "group/switchDefenceMode",
             f"{self.BASE_URL}/v3/devices/group/{device_serial}/switchDefenceMode",
             json=payload,
-        ) as res:
-            res_json = await res.json()
+        )
         log.debug("Got set defence mode response '%s'", res_json)
 
         meta = res_json.get("meta", {})
@@ -546,6 +924,91 @@ class HikConnect:
         """
         await self.set_area_defence_mode(device_serial, group_id, 0)
 
+    async def set_areas_defence_mode(
+        self, targets, *, concurrency: int = 10, skip_unchanged: bool = True
+    ) -> list[dict]:
+        """Set the defence mode of many areas, across many devices, concurrently.
+
+        Areas of one device are switched one by one (see ``device_serializer``),
+        different devices in parallel, with at most ``concurrency`` requests in
+        flight. A failure of one target doesn't affect the others.
+
+        Args:
+            targets: Iterable of ``(device_serial, group_id, mode)`` tuples.
+            concurrency: Maximum number of requests in flight.
+            skip_unchanged: Fetch current modes with ``get_areas()`` (one call
+                            per device) and skip areas already in the target
+                            ``mode``.
+
+        Returns:
+            list of dicts in the order of ``targets`` with keys
+            ``device_serial``, ``group_id``, ``mode``, ``result`` and ``error``.
+            ``result`` is one of ``"set"``, ``"skipped"`` (already in ``mode``),
+            ``"offline"`` (``error`` is ``DeviceOffline``) or ``"failed"``
+            (``error`` holds the exception).
+        """
+        results = [
+            {
+                "device_serial": device_serial,
+                "group_id": group_id,
+                "mode": mode,
+                "result": None,
+                "error": None,
+            }
+            for device_serial, group_id, mode in targets
+        ]
+        by_device: dict[str, list[dict]] = {}
+        for result in results:
+            by_device.setdefault(result["device_serial"], []).append(result)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def current_modes(device_serial):
+            async with semaphore:
+                try:
+                    return {
+                        area["group_id"]: area["mode"]
+                        async for area in self.get_areas(device_serial)
+                    }
+                except (*OPERATION_ERRORS, KeyError) as e:
+                    # only this device's targets are affected: its switch
+                    # requests report their own per-target results
+                    log.warning(
+                        "Unable to get areas of device '%s', setting all modes: %r",
+                        device_serial,
+                        e,
+                    )
+                    return {}
+
+        async def switch_device(device_serial, device_results):
+            modes = await current_modes(device_serial) if skip_unchanged else {}
+            for result in device_results:
+                if modes.get(result["group_id"], object()) == result["mode"]:
+                    result["result"] = "skipped"
+                    continue
+                try:
+                    async with semaphore:
+                        await self.set_area_defence_mode(
+                            device_serial, result["group_id"], result["mode"]
+                        )
+                except DeviceOffline as e:
+                    result["result"], result["error"] = "offline", e
+                except OPERATION_ERRORS as e:
+                    result["result"], result["error"] = "failed", e
+                else:
+                    result["result"] = "set"
+
+        await asyncio.gather(
+            *(switch_device(serial, res) for serial, res in by_device.items())
+        )
+        log.info(
+            "Set defence mode of %d area(s): %d set, %d skipped, %d failed",
+            len(results),
+            sum(r["result"] == "set" for r in results),
+            sum(r["result"] == "skipped" for r in results),
+            sum(r["result"] in ("offline", "failed") for r in results),
+        )
+        return results
+
     # ------------------------------------------------------------------
 
     async def unlock(
@@ -559,10 +1022,11 @@ class HikConnect:
         has "unlock capability". Also if there is more than one lock connected to a door station,
         you can specify `lock_index` parameter to control which lock to open. The `lock_index` starts with zero!
         """
-        async with self.client.put(
-            f"{self.BASE_URL}/v3/devconfig/v1/call/{device_serial}/{channel_number}/remote/unlock?srcId=1&lockId={lock_index}&userType=0"
-        ) as res:
-            res_json = await res.json()
+        res_json = await self._request(
+            "PUT",
+            "call/unlock",
+            f"{self.BASE_URL}/v3/devconfig/v1/call/{device_serial}/{channel_number}/remote/unlock?srcId=1&lockId={lock_index}&userType=0",
+        )
         log.debug("Got unlock response '%s'", res_json)
         log.info(
             "Unlocked device '%s' channel '%d' lock_index '%d'",
@@ -572,34 +1036,52 @@ class HikConnect:
         )
 
     async def get_call_status(self, device_serial: str):
-        async with self.client.get(
-            f"{self.BASE_URL}/v3/devconfig/v1/call/{device_serial}/status"
-        ) as res:
-            res_json = await res.json()
+        started = time.perf_counter()
+        res_json = await self._request(
+            "GET",
+            "call/status",
+            f"{self.BASE_URL}/v3/devconfig/v1/call/{device_serial}/status",
+        )
         log.debug("Got call status response '%s'", res_json)
         log.info("Got call status for device '%s'", device_serial)
+        call_status = self._parse_call_status(res_json)
+        if self.history is not None:
+            self.history.record_call_status(device_serial, call_status["status"])
+        if self.rules is not None:
+            self.rules.observe(self, device_serial, call_status, started)
+        return call_status
+
+    @classmethod
+    def _parse_call_status(cls, res_json):
         if res_json["meta"]["code"] == 2003:
             raise DeviceOffline()
-        data = json.loads(res_json["data"])
+        call_status, info = cls._decode_call_data(res_json["data"])
         try:
-            status = self.CALL_STATUS_MAPPING[data["callStatus"]]
+            status = cls.CALL_STATUS_MAPPING[call_status]
         except KeyError:
-            log.warning("Unknown call status: %s", data["callStatus"])
+            log.warning("Unknown call status: %s", call_status)
             status = "unknown"
 
-        info = {}
-        for in_key, out_key in self.CALL_INFO_MAPPING.items():
+        return {
+            "status": status,
+            "info": dict(info),
+        }
+
+    @classmethod
+    @functools.lru_cache(maxsize=DECODE_CACHE_SIZE)
+    def _decode_call_data(cls, data):
+        # "data" is a JSON string, almost always the same idle one. Decode each distinct
+        # string once; cached results are shared, hence immutable.
+        data = json.loads(data)
+        info = []
+        for in_key, out_key in cls.CALL_INFO_MAPPING.items():
             try:
-                info[out_key] = data["callerInfo"][in_key]
+                info.append((out_key, data["callerInfo"][in_key]))
             except KeyError:
                 # normally we would log warning, but it seems to be pretty common situation:
                 # https://github.com/tomasbedrich/home-assistant-hikconnect/issues/4#issuecomment-1022526060
                 log.debug("Missing caller info key: %s", in_key)
-
-        return {
-            "status": status,
-            "info": info,
-        }
+        return data["callStatus"], tuple(info)
 
     async def answer_call(self, device_serial: str):
         """
@@ -607,10 +1089,11 @@ class HikConnect:
 
         The `device_serial` parameter can be obtained from `get_devices()` and/or `get_cameras()`.
         """
-        async with self.client.put(
-            f"{self.BASE_URL}/v3/devconfig/v1/call/{device_serial}/operation?cmdId=2"
-        ) as res:
-            res_json = await res.json()
+        res_json = await self._request(
+            "PUT",
+            "call/answer",
+            f"{self.BASE_URL}/v3/devconfig/v1/call/{device_serial}/operation?cmdId=2",
+        )
         log.debug("Got answer_call response '%s'", res_json)
         log.info("Answer call to device '%s'", device_serial)
 
@@ -620,10 +1103,11 @@ class HikConnect:
 
         The `device_serial` parameter can be obtained from `get_devices()` and/or `get_cameras()`.
         """
-        async with self.client.put(
-            f"{self.BASE_URL}/v3/devconfig/v1/call/{device_serial}/operation?cmdId=3"
-        ) as res:
-            res_json = await res.json()
+        res_json = await self._request(
+            "PUT",
+            "call/cancel",
+            f"{self.BASE_URL}/v3/devconfig/v1/call/{device_serial}/operation?cmdId=3",
+        )
         log.debug("Got cancel_call response '%s'", res_json)
         log.info("Cancel call to device '%s'", device_serial)
 
@@ -633,13 +1117,126 @@ class HikConnect:
 
         The `device_serial` parameter can be obtained from `get_devices()` and/or `get_cameras()`.
         """
-        async with self.client.put(
-            f"{self.BASE_URL}/v3/devconfig/v1/call/{device_serial}/operation?cmdId=5"
-        ) as res:
-            res_json = await res.json()
+        res_json = await self._request(
+            "PUT",
+            "call/hangup",
+            f"{self.BASE_URL}/v3/devconfig/v1/call/{device_serial}/operation?cmdId=5",
+        )
         log.debug("Got hangup_call response '%s'", res_json)
         log.info("Hangup call to device '%s'", device_serial)
 
+    @staticmethod
+    def batch(
+        *, concurrency: int | None = 10, timeout=None, on_progress=None
+    ) -> BatchExecutor:
+        """Return a ``BatchExecutor`` for running many operations of this client.
+
+        Example::
+
+            results = await api.batch(concurrency=20, timeout=10).run(
+                [functools.partial(api.get_call_status, serial) for serial in serials]
+            )
+            raise_for_errors(results)  # from hikconnect.batch
+
+        or ``async for result in api.batch().as_completed(operations): ...``.
+        See ``BatchExecutor`` for details.
+        """
+        return BatchExecutor(
+            concurrency=concurrency, timeout=timeout, on_progress=on_progress
+        )
+
+    DOOR_COMMANDS = ("unlock", "answer_call", "cancel_call", "hangup_call")
+
+    async def send_door_commands(self, command: str, targets) -> list[dict]:
+        """Send a door command to many targets at once.
+
+        All requests are sent concurrently, without any concurrency limit and
+        bypassing the per-device queue of area mutations, so that the last
+        door opens as soon as the first one. Door commands have priority for
+        connections: other requests leave ``HikConnect(reserved_connections=...)``
+        of the session's connection pool to them, so they don't queue behind
+        e.g. a device list sweep.
+
+        Args:
+            command: One of ``DOOR_COMMANDS``.
+            targets: Iterable of argument tuples of ``command``, e.g.
+                     ``(device_serial, channel_number, lock_index)`` for
+                     ``"unlock"`` or ``(device_serial,)`` (or just
+                     ``device_serial``) for the call commands.
+
+        Returns:
+            list of dicts in the order of ``targets`` with keys ``target``
+            (the argument tuple), ``result`` (``"sent"``, ``"invalid"``,
+            ``"offline"`` or ``"failed"``), ``error`` (the exception or
+            ``None``) and ``latency`` (seconds, ``None`` if not sent).
+
+            ``"invalid"`` means the target doesn't fit the arguments of
+            ``command``, or the unlock target doesn't match ``locks`` of the
+            device as last seen by ``get_devices()``; devices not seen yet are
+            not validated. ``"failed"`` is reported for ``OPERATION_ERRORS``
+            only, other exceptions are raised once all commands finished.
+        """
+        if command not in self.DOOR_COMMANDS:
+            raise ValueError(f"Unknown door command '{command}'.")
+        method = getattr(self, command)
+
+        targets = [(t,) if isinstance(t, str) else tuple(t) for t in targets]
+        results = [
+            {"target": target, "result": None, "error": None, "latency": None}
+            for target in targets
+        ]
+        to_send = []
+        for result in results:
+            error = self._validate_door_target(command, method, result["target"])
+            if error:
+                result["result"], result["error"] = "invalid", ValueError(error)
+            else:
+                to_send.append(result)
+
+        executor = BatchExecutor(concurrency=None)
+        batch_results = await executor.run(
+            [functools.partial(method, *result["target"]) for result in to_send]
+        )
+        for result, batch_result in zip(to_send, batch_results):
+            result["latency"] = batch_result.elapsed
+            result["error"] = error = batch_result.error
+            if error is None:
+                result["result"] = "sent"
+            elif isinstance(error, DeviceOffline):
+                result["result"] = "offline"
+            elif isinstance(error, OPERATION_ERRORS):
+                result["result"] = "failed"
+            else:
+                raise error
+
+        log.info(
+            "Sent '%s' to %d target(s), %d succeeded",
+            command,
+            len(results),
+            sum(r["result"] == "sent" for r in results),
+        )
+        return results
+
+    def _validate_door_target(self, command, method, target):
+        try:
+            inspect.signature(method).bind(*target)
+        except TypeError as e:
+            return f"Invalid '{command}' target {target!r}: {e}"
+        if command == "unlock":
+            return self._validate_unlock_target(*target)
+        return None
+
+    def _validate_unlock_target(self, device_serial, channel_number, lock_index=0):
+        locks = self.device_locks.get(device_serial)
+        if locks is None:
+            return None
+        if locks.get(channel_number, 0) <= lock_index:
+            return (
+                f"Device '{device_serial}' has {locks.get(channel_number, 0)} lock(s) "
+                f"on channel {channel_number}, lock_index {lock_index} is invalid."
+            )
+        return None
+
     @staticmethod
     def _decode_jwt_expiration(jwt):
         # decode JWT manually because of PyJWT version incompatibility with HomeAssistant
@@ -652,12 +1249,30 @@ class HikConnect:
         claims = json.loads(claims_json_raw)
         return datetime.datetime.fromtimestamp(claims["exp"])
 
+    def subscribe(self, kinds=None, *, maxsize=100, overflow=DROP_OLDEST):
+        """
+        Subscribe to change events, starting `self.coordinator` if not running.
+
+        Returns a `Subscription` to iterate with `async for`, see `hikconnect.events`.
+        All subscribers share the coordinator's refresh cycles, so subscribing
+        doesn't add any requests; set its `intervals` to poll more or less often.
+        """
+        subscription = self.events.subscribe(kinds, maxsize=maxsize, overflow=overflow)
+        self.coordinator.start()
+        return subscription
+
     async def __aenter__(self):
         await self.client.__aenter__()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.coordinator.stop()
+        if self.rules is not None:
+            await self.rules.drain()
         await self.client.__aexit__(exc_type, exc_val, exc_tb)
 
     async def close(self):
+        await self.coordinator.stop()
+        if self.rules is not None:
+            await self.rules.drain()
         await self.client.close()
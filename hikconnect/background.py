@@ -0,0 +1,34 @@
+import asyncio
+
+
+class BackgroundLoop:
+    """Mixin running ``self._run()`` in a background task with ``start()`` / ``stop()``."""
+
+    _task: asyncio.Task | None = None
+
+    async def _run(self):
+        raise NotImplementedError
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start in a background task, if not running yet, and return the task."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    def cancel(self):
+        """Stop without waiting for the task, e.g. from synchronous code."""
+        if self._task is not None:
+            self._task.cancel()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
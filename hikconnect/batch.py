@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+from typing import Any, NamedTuple
+
+from hikconnect.exceptions import BatchError
+
+log = logging.getLogger(__name__)
+
+
+class BatchResult(NamedTuple):
+    position: int  # of the operation in the submitted list
+    value: Any
+    error: Exception | None
+    elapsed: float  # seconds
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class BatchExecutor:
+    """Run many ``HikConnect`` operations with bounded concurrency.
+
+    An operation is a callable without arguments returning an awaitable (e.g.
+    ``functools.partial(api.unlock, serial, 1)``) or an async iterator (e.g.
+    ``functools.partial(api.get_cameras, serial)``), which is collected into
+    a list. An exception of one operation doesn't affect the others, it's
+    kept - including its type - in the operation's ``BatchResult``.
+
+    Args:
+        concurrency: Maximum number of operations running at once, ``None``
+                     for no limit.
+        timeout: Per-operation timeout in seconds, ``None`` for no timeout.
+                 A timed out operation fails with ``asyncio.TimeoutError``.
+        on_progress: Called as ``on_progress(done, total, result)`` after each
+                     finished operation.
+    """
+
+    def __init__(self, concurrency: int | None = 10, timeout=None, on_progress=None):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.on_progress = on_progress
+
+    async def run(self, operations) -> list[BatchResult]:
+        """Run ``operations`` and return their results in submission order."""
+        operations = list(operations)
+        results: list[BatchResult] = [None] * len(operations)  # type: ignore[list-item]
+        async for result in self.as_completed(operations):
+            results[result.position] = result
+        return results
+
+    async def as_completed(self, operations):
+        """Run ``operations`` and yield their results as they finish.
+
+        Operations still running when the consumer stops iterating are cancelled.
+        """
+        operations = list(operations)
+        semaphore = asyncio.Semaphore(self.concurrency) if self.concurrency else None
+        tasks = [
+            asyncio.ensure_future(self._run_one(index, operation, semaphore))
+            for index, operation in enumerate(operations)
+        ]
+        done = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                done += 1
+                if self.on_progress is not None:
+                    self.on_progress(done, len(tasks), result)
+                yield result
+            log.debug(
+                "Batch of %d operation(s) finished, %d failed",
+                len(tasks),
+                sum(not task.result().ok for task in tasks),
+            )
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _run_one(self, index, operation, semaphore):
+        if semaphore is not None:
+            async with semaphore:
+                return await self._call(index, operation)
+        return await self._call(index, operation)
+
+    async def _call(self, index, operation):
+        start = time.perf_counter()
+        try:
+            value = await asyncio.wait_for(self._invoke(operation), self.timeout)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            return BatchResult(index, None, e, time.perf_counter() - start)
+        return BatchResult(index, value, None, time.perf_counter() - start)
+
+    @staticmethod
+    async def _invoke(operation):
+        result = operation()
+        if hasattr(result, "__aiter__"):
+            return [item async for item in result]
+        return await result
+
+
+def raise_for_errors(results, message="Batch operation(s) failed"):
+    """Raise ``BatchError`` grouping exceptions of failed ``results``, if any.
+
+    The group keeps the original exceptions, so they can be handled by type
+    with ``except*``, e.g. ``except* DeviceOffline``.
+    """
+    errors = [result.error for result in results if result.error is not None]
+    if errors:
+        raise BatchError(f"{message}: {len(errors)} of {len(results)}", errors)
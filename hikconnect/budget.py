@@ -0,0 +1,148 @@
+import contextvars
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from hikconnect.exceptions import BudgetExceeded
+
+UNTAGGED = "untagged"
+
+# caller / feature label of requests sent by the current task, see caller_tag()
+_caller_tag: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "caller_tag", default=UNTAGGED
+)
+
+
+@contextmanager
+def caller_tag(tag: str):
+    """Attribute requests sent within the block (and tasks started from it) to ``tag``.
+
+    Example::
+
+        with caller_tag("notifications"):
+            await api.get_call_status(serial)
+    """
+    token = _caller_tag.set(tag)
+    try:
+        yield
+    finally:
+        _caller_tag.reset(token)
+
+
+def current_caller_tag() -> str:
+    return _caller_tag.get()
+
+
+class _Usage:  # pylint: disable=too-few-public-methods
+    __slots__ = ("requests", "bytes", "time")
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self.time = 0.0
+
+
+class CallBudget:
+    """Per-caller accounting (and optional limiting) of API calls of a ``HikConnect`` client.
+
+    Pass an instance as ``HikConnect(budget=CallBudget())``. Calls are
+    attributed to the tag set by ``caller_tag()`` (``"untagged"`` otherwise).
+
+    ``limits`` maps a tag to ``(max_requests, window)``: at most
+    ``max_requests`` calls of the tag in any ``window`` seconds. Calls over the
+    limit raise ``BudgetExceeded`` before anything is sent.
+    """
+
+    def __init__(self, limits: dict[str, tuple[int, float]] | None = None):
+        self._limits: dict[str, tuple[int, float]] = {}
+        # tag -> time.monotonic() of calls within the limit window
+        self._calls: dict[str, deque[float]] = {}
+        # tag -> endpoint -> _Usage
+        self._usage: dict[str, dict[str, _Usage]] = {}
+        self._rejected: dict[str, int] = {}
+        for tag, (max_requests, window) in (limits or {}).items():
+            self.set_limit(tag, max_requests, window)
+
+    def set_limit(self, tag: str, max_requests: int, window: float = 60.0):
+        """Allow at most ``max_requests`` calls of ``tag`` per ``window`` seconds."""
+        if max_requests < 0 or window <= 0:
+            raise ValueError("max_requests must be >= 0 and window > 0.")
+        self._limits[tag] = (max_requests, window)
+        self._calls.setdefault(tag, deque())
+
+    def remove_limit(self, tag: str):
+        self._limits.pop(tag, None)
+        self._calls.pop(tag, None)
+
+    def _prune(self, tag, now):
+        _, window = self._limits[tag]
+        calls = self._calls[tag]
+        while calls and calls[0] <= now - window:
+            calls.popleft()
+        return calls
+
+    def acquire(self, endpoint: str):
+        """Charge one call to ``endpoint`` against the current caller tag.
+
+        Raises:
+            BudgetExceeded: If the tag has used up its budget for the current window.
+        """
+        tag = _caller_tag.get()
+        if tag in self._limits:
+            now = time.monotonic()
+            calls = self._prune(tag, now)
+            max_requests, window = self._limits[tag]
+            if len(calls) >= max_requests:
+                self._rejected[tag] = self._rejected.get(tag, 0) + 1
+                raise BudgetExceeded(
+                    f"Caller '{tag}' exceeded its budget of {max_requests} "
+                    f"request(s) per {window}s (endpoint '{endpoint}')."
+                )
+            calls.append(now)
+
+    def record(self, endpoint: str, size: int, elapsed: float):
+        """Record a finished call of the current caller tag.
+
+        ``size`` bytes were received in ``elapsed`` seconds.
+        """
+        endpoints = self._usage.setdefault(_caller_tag.get(), {})
+        usage = endpoints.get(endpoint)
+        if usage is None:
+            usage = endpoints[endpoint] = _Usage()
+        usage.requests += 1
+        usage.bytes += size
+        usage.time += elapsed
+
+    def remaining(self, tag: str) -> int | None:
+        """Return calls ``tag`` may still make in the current window, ``None`` if unlimited."""
+        if tag not in self._limits:
+            return None
+        return max(self._limits[tag][0] - len(self._prune(tag, time.monotonic())), 0)
+
+    def usage(self):
+        """Return usage as ``{tag: {endpoint: {"requests", "bytes", "time"}}}``.
+
+        The ``"*"`` entry of each tag holds totals over all endpoints plus
+        ``rejected`` - the number of calls refused by the tag's limit.
+        """
+        usage = {}
+        for tag in self._usage.keys() | self._rejected.keys():
+            endpoints = {
+                endpoint: {"requests": u.requests, "bytes": u.bytes, "time": u.time}
+                for endpoint, u in self._usage.get(tag, {}).items()
+            }
+            endpoints["*"] = {
+                "requests": sum(e["requests"] for e in endpoints.values()),
+                "bytes": sum(e["bytes"] for e in endpoints.values()),
+                "time": sum(e["time"] for e in endpoints.values()),
+                "rejected": self._rejected.get(tag, 0),
+            }
+            usage[tag] = endpoints
+        return usage
+
+    def reset(self):
+        """Forget recorded usage, limits stay (with their windows cleared)."""
+        self._usage.clear()
+        self._rejected.clear()
+        for calls in self._calls.values():
+            calls.clear()
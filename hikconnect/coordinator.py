@@ -0,0 +1,264 @@
+"""Scheduled refresh of devices, cameras, areas and call status in one cycle.
+
+Example::
+
+    coordinator = RefreshCoordinator(api, intervals={"call_status": 5, "cameras": 3600})
+    coordinator.add_listener(lambda snapshot: print(snapshot.timings))
+    coordinator.start()
+    ...
+    coordinator.snapshot.call_status["Q1234"]  # {'status': 'idle', 'info': {...}}
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import time
+from types import MappingProxyType
+from typing import NamedTuple
+
+from hikconnect.background import BackgroundLoop
+
+log = logging.getLogger(__name__)
+
+KINDS = ("devices", "cameras", "areas", "call_status")
+# kinds fetched per device, after and depending on the devices refresh
+DEPENDENT_KINDS = ("cameras", "areas", "call_status")
+# HikConnect method fetching a dependent kind of a device
+METHODS = {
+    "cameras": "get_cameras",
+    "areas": "get_areas",
+    "call_status": "get_call_status",
+}
+DEFAULT_INTERVALS = {"devices": 300, "cameras": 3600, "areas": 600, "call_status": 5}
+# device fields whose change makes the device's cameras and areas re-fetched;
+# not e.g. wifi_signal, which changes all the time
+CHANGE_FIELDS = ("name", "type", "version", "is_online", "locks")
+
+
+class RefreshSnapshot(NamedTuple):
+    """State of the fleet after one refresh cycle, data by device serial.
+
+    Kinds not refreshed in the cycle (see ``refreshed``) hold the data of
+    earlier cycles. ``timings`` are seconds per refreshed kind plus
+    ``"total"``, ``errors`` maps ``(kind, device serial)`` to the exception
+    of a failed fetch (the previous data is kept).
+    """
+
+    cycle: int
+    time: float
+    devices: MappingProxyType
+    cameras: MappingProxyType
+    areas: MappingProxyType
+    call_status: MappingProxyType
+    refreshed: frozenset
+    timings: dict[str, float]
+    errors: dict[tuple[str, str], Exception]
+
+
+class RefreshCoordinator(
+    BackgroundLoop
+):  # pylint: disable=too-many-instance-attributes
+    """Refresh ``HikConnect`` data of all kinds in cycles, publishing a snapshot per cycle.
+
+    Each kind has its own interval, a cycle refreshes the kinds due. Devices are
+    refreshed first. Then, concurrently:
+
+    - cameras and areas of online devices which are new or changed (in
+      ``CHANGE_FIELDS``) in this cycle's devices refresh, and of all online
+      devices when the kind is due,
+    - call status of online devices with locks (door stations), when due.
+
+    Dependent kinds are refreshed if in ``kinds`` or required by a consumer
+    (see ``require()``). A coordinator without ``kinds`` of its own, like
+    ``HikConnect.coordinator``, refreshes only what is required and stops once
+    nothing is.
+
+    Args:
+        intervals: Seconds between refreshes per kind, merged with
+                   ``DEFAULT_INTERVALS``; ``None`` disables a dependent kind.
+        concurrency: Maximum concurrent requests of per device fetches.
+        kinds: Dependent kinds refreshed whether required or not.
+    """
+
+    def __init__(self, api, intervals=None, concurrency=10, kinds=DEPENDENT_KINDS):
+        self.api = api
+        self.intervals = {**DEFAULT_INTERVALS, **(intervals or {})}
+        if self.intervals["devices"] is None:
+            raise ValueError(
+                "Devices can't be disabled, the other kinds depend on them"
+            )
+        self.concurrency = concurrency
+        self.kinds = frozenset(kinds)
+        self._required: list[frozenset] = []
+        self.snapshot: RefreshSnapshot | None = None
+        self._listeners: list = []
+        self._last_refresh: dict[str, float] = {}
+        self._fingerprints: dict[str, tuple] = {}
+
+    def add_listener(self, listener):
+        """Call ``listener(snapshot)`` after each cycle, return a function removing it.
+
+        A listener may be a coroutine function, the cycle waits for it.
+        """
+        self._listeners.append(listener)
+        return functools.partial(self._listeners.remove, listener)
+
+    def require(self, kinds):
+        """Refresh ``kinds`` (besides devices) until the returned function is called."""
+        demand = frozenset(kinds) - {"devices"}
+        unknown = demand - set(DEPENDENT_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown kind(s): {', '.join(sorted(unknown))}")
+        self._required.append(demand)
+        return functools.partial(self._release, demand)
+
+    def _release(self, demand):
+        self._required.remove(demand)
+        if not self.kinds and not self._required:
+            self.cancel()  # nothing to refresh
+
+    def wanted(self):
+        """Return kinds to refresh: devices, ``kinds`` and required ones, unless disabled."""
+        dependent = self.kinds.union(*self._required)
+        return [
+            kind
+            for kind in KINDS
+            if self.intervals[kind] is not None
+            and (kind == "devices" or kind in dependent)
+        ]
+
+    def due(self, now=None):
+        """Return wanted kinds due for a refresh at ``now`` (``time.monotonic()``)."""
+        now = time.monotonic() if now is None else now
+        return [
+            kind
+            for kind in self.wanted()
+            if now - self._last_refresh.get(kind, -float("inf")) >= self.intervals[kind]
+        ]
+
+    def _changed_devices(self, devices):
+        changed = set()
+        for serial, device in devices.items():
+            fingerprint = tuple(
+                sorted(device["locks"].items()) if field == "locks" else device[field]
+                for field in CHANGE_FIELDS
+            )
+            if self._fingerprints.get(serial) != fingerprint:
+                changed.add(serial)
+            self._fingerprints[serial] = fingerprint
+        for serial in set(self._fingerprints) - set(devices):
+            del self._fingerprints[serial]
+        return changed
+
+    async def _refresh_devices(self, data, timings):
+        """Refresh devices into ``data``, return serials of new / changed devices."""
+        start = time.perf_counter()
+        devices = {d["serial"]: d async for d in self.api.get_devices()}
+        timings["devices"] = time.perf_counter() - start
+        data["devices"] = devices
+        for kind in DEPENDENT_KINDS:  # forget removed devices
+            data[kind] = {s: v for s, v in data[kind].items() if s in devices}
+        return self._changed_devices(devices)
+
+    def _targets(self, kinds, devices, changed):
+        """Return ``{dependent kind: serials of devices to fetch it for}``."""
+        online = [s for s, d in devices.items() if d["is_online"] is not False]
+        wanted = self.wanted()
+        # changed devices only when the kind is wanted, e.g. not cameras of events
+        refetch = {kind: changed if kind in wanted else () for kind in DEPENDENT_KINDS}
+        targets = {
+            "cameras": [
+                s for s in online if "cameras" in kinds or s in refetch["cameras"]
+            ],
+            "areas": [s for s in online if "areas" in kinds or s in refetch["areas"]],
+            "call_status": [
+                s for s in online if "call_status" in kinds and devices[s]["locks"]
+            ],
+        }
+        return {
+            kind: serials
+            for kind, serials in targets.items()
+            if self.intervals[kind] is not None
+        }
+
+    async def _fetch_per_device(self, kind, serials, data, errors):
+        method = getattr(self.api, METHODS[kind])
+        results = await self.api.batch(concurrency=self.concurrency).run(
+            functools.partial(method, serial) for serial in serials
+        )
+        for serial, result in zip(serials, results):
+            if result.ok:
+                data[serial] = result.value
+            else:
+                errors[(kind, serial)] = result.error
+                # count the device as changed in the next devices refresh, to retry
+                self._fingerprints.pop(serial, None)
+                log.debug("Refreshing %s of %s failed: %r", kind, serial, result.error)
+
+    async def _timed(self, kind, fetch, timings):
+        start = time.perf_counter()
+        await fetch
+        timings[kind] = time.perf_counter() - start
+
+    async def refresh(self, kinds=None):
+        """Run one refresh cycle of ``kinds`` (the due ones by default), return its snapshot."""
+        started, now = time.perf_counter(), time.monotonic()
+        kinds = set(self.due(now) if kinds is None else kinds)
+        previous = self.snapshot
+        data = {
+            kind: dict(getattr(previous, kind)) if previous else {} for kind in KINDS
+        }
+        timings: dict[str, float] = {}
+        errors: dict[tuple[str, str], Exception] = {}
+
+        changed: set[str] = set()
+        if "devices" in kinds or previous is None:
+            kinds.add("devices")
+            changed = await self._refresh_devices(data, timings)
+
+        await asyncio.gather(
+            *(
+                self._timed(
+                    kind,
+                    self._fetch_per_device(kind, serials, data[kind], errors),
+                    timings,
+                )
+                for kind, serials in self._targets(
+                    kinds, data["devices"], changed
+                ).items()
+                if serials
+            )
+        )
+
+        for kind in kinds:
+            self._last_refresh[kind] = now
+        timings["total"] = time.perf_counter() - started
+        self.snapshot = RefreshSnapshot(
+            cycle=previous.cycle + 1 if previous else 1,
+            time=time.time(),
+            **{kind: MappingProxyType(data[kind]) for kind in KINDS},
+            refreshed=frozenset(kind for kind in KINDS if kind in timings),
+            timings=timings,
+            errors=errors,
+        )
+        log.debug("Refresh cycle %d took %s", self.snapshot.cycle, timings)
+        for listener in list(self._listeners):
+            result = listener(self.snapshot)
+            if inspect.isawaitable(result):
+                await result
+        return self.snapshot
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception:  # pylint: disable=broad-exception-caught
+                # keep refreshing, the next cycle may succeed
+                log.warning("Refresh cycle failed", exc_info=True)
+            now = time.monotonic()
+            next_due = min(
+                self._last_refresh.get(kind, now) + self.intervals[kind]
+                for kind in self.wanted()
+            )
+            await asyncio.sleep(max(next_due - now, 0))
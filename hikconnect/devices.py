@@ -0,0 +1,100 @@
+"""Lazily parsed devices of a ``devices/pagelist`` response, see ``HikConnect.get_devices(lazy=True)``."""
+
+import functools
+import re
+from collections.abc import Mapping
+
+# keys of the fields HikConnect._parse_device() returns
+CORE_KEYS = (
+    "id",
+    "name",
+    "serial",
+    "type",
+    "version",
+    "locks",
+    "local_ip",
+    "wan_ip",
+    "is_online",
+    "wifi_signal",
+    "update_available",
+)
+
+# key -> pagelist section with extra (per device) information not in the core fields
+EXTRA_SECTIONS = {
+    "time_plan": "timePlanInfos",
+    "switch": "switchStatusInfos",
+    "no_disturb": "alarmNodisturbInfos",
+    "p2p": "p2pInfos",
+    "kms": "kmsInfos",
+    "hiddns": "hiddnsInfos",
+}
+
+
+def device_section(page, section, serial):
+    """Return the entry of device ``serial`` in ``section`` of ``page``, or ``{}``."""
+    return (page.get(section) or {}).get(serial) or {}
+
+
+@functools.lru_cache(maxsize=256)
+def _snake_case_key(key):
+    return re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", key).lower()
+
+
+def _snake_case(value):
+    """Return a copy of decoded JSON ``value`` with ``camelCase`` keys as ``snake_case``."""
+    if isinstance(value, dict):
+        return {_snake_case_key(key): _snake_case(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_snake_case(item) for item in value]
+    return value
+
+
+class LazyDevice(Mapping):
+    """Read-only device mapping parsing its page slice only when read.
+
+    Has the same keys as the dicts ``get_devices()`` yields, plus the extra
+    sections of ``EXTRA_SECTIONS`` (e.g. ``device["no_disturb"]`` is
+    ``{"alarm_enable": 0, "calling_enable": 0}``; ``None`` when the page has
+    no entry for the device). The core fields are parsed together on the
+    first read of any of them, each extra section on its first read. Keeps a
+    reference to the whole page, ``dict(device)`` parses everything and
+    doesn't.
+    """
+
+    __slots__ = ("_device", "_page", "_parse", "_core", "_extras")
+
+    def __init__(self, device, page, parse):
+        """``parse(device, page)`` returns the core fields, e.g. ``HikConnect._parse_device``."""
+        self._device = device
+        self._page = page
+        self._parse = parse
+        self._core = None
+        self._extras = {}
+
+    @property
+    def serial(self):
+        return self._device["deviceSerial"]
+
+    def __getitem__(self, key):
+        if key == "serial":
+            return self.serial
+        if key in EXTRA_SECTIONS:
+            if key not in self._extras:
+                section = (self._page.get(EXTRA_SECTIONS[key]) or {}).get(self.serial)
+                self._extras[key] = _snake_case(section)
+            return self._extras[key]
+        if self._core is None:
+            if key not in CORE_KEYS:
+                raise KeyError(key)
+            self._core = self._parse(self._device, self._page)
+        return self._core[key]
+
+    def __iter__(self):
+        yield from CORE_KEYS
+        yield from EXTRA_SECTIONS
+
+    def __len__(self):
+        return len(CORE_KEYS) + len(EXTRA_SECTIONS)
+
+    def __repr__(self):
+        return f"<LazyDevice {self.serial}>"
@@ -0,0 +1,309 @@
+"""Change events of devices, fanned out from one poller to many subscribers.
+
+Example::
+
+    async with HikConnect() as api:
+        await api.login("foo", "bar")
+        async for event in api.subscribe([CALL_STATUS], overflow=COALESCE):
+            print(event.device_serial, event.old, "->", event.new)
+
+Events come from the refresh cycles of ``HikConnect.coordinator``. Each
+subscriber has its own bounded queue, so a slow subscriber loses (or
+coalesces) its own events instead of stalling the cycles and the others;
+only ``BLOCK`` subscribers make the coordinator wait.
+"""
+
+import asyncio
+import functools
+from collections import deque
+from typing import Any, NamedTuple
+
+# event kinds
+CALL_STATUS = "call_status"  # old / new: "idle", "ringing", ..., data: caller info
+ONLINE = "online"  # old / new: is_online of get_devices()
+AREA_MODE = "area_mode"  # old / new: area mode, group_id is set
+EVENT_KINDS = (CALL_STATUS, ONLINE, AREA_MODE)
+# RefreshCoordinator kind whose refresh reveals changes of an event kind
+SOURCES = {ONLINE: "devices", CALL_STATUS: "call_status", AREA_MODE: "areas"}
+
+# overflow policies of a full subscriber queue
+DROP_OLDEST = "drop_oldest"  # drop the oldest queued event
+COALESCE = "coalesce"  # merge into a queued event of the same key, else drop the oldest
+BLOCK = "block"  # make the publisher wait for space
+OVERFLOW_POLICIES = (DROP_OLDEST, COALESCE, BLOCK)
+
+
+class Event(NamedTuple):
+    kind: str
+    device_serial: str
+    old: Any
+    new: Any
+    time: float  # time.time() of the observation
+    group_id: int | None = None
+    data: Any = None
+
+    @property
+    def key(self):
+        """Events of the same key are about the same thing, see ``COALESCE``."""
+        return self.kind, self.device_serial, self.group_id
+
+
+class Subscription:  # pylint: disable=too-many-instance-attributes
+    """Bounded queue of events for one subscriber, iterate it (``async for``) or ``get()``.
+
+    ``dropped`` counts events lost to overflow, ``coalesced`` events merged into
+    a queued one. A coalesced event keeps ``old`` of the queued event and takes
+    the rest from the newer one (so ``old`` may equal ``new``).
+    """
+
+    def __init__(self, bus, kinds=None, maxsize=100, overflow=DROP_OLDEST):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy {overflow!r}, expected one of {OVERFLOW_POLICIES}"
+            )
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.kinds = frozenset(kinds) if kinds is not None else None
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        self._bus = bus
+        self._queue: deque[Event] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+
+    def wants(self, event):
+        return self.kinds is None or event.kind in self.kinds
+
+    def qsize(self):
+        return len(self._queue)
+
+    def put_nowait(self, event):
+        """Queue ``event``, applying the overflow policy if full (``BLOCK`` drops the oldest)."""
+        if self.closed:
+            return
+        if self.overflow == COALESCE:
+            for i, queued in enumerate(self._queue):
+                if queued.key == event.key:
+                    self._queue[i] = event._replace(old=queued.old)
+                    self.coalesced += 1
+                    return
+        if len(self._queue) >= self.maxsize:
+            self._queue.popleft()
+            self.dropped += 1
+        self._queue.append(event)
+        self._not_empty.set()
+
+    async def put(self, event):
+        """Queue ``event``, waiting for space with the ``BLOCK`` policy."""
+        if self.overflow == BLOCK:
+            while len(self._queue) >= self.maxsize and not self.closed:
+                self._not_full.clear()
+                await self._not_full.wait()
+        self.put_nowait(event)
+
+    async def get(self):
+        """Return the next event, ``None`` once the subscription is closed and drained."""
+        while not self._queue:
+            if self.closed:
+                return None
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        event = self._queue.popleft()
+        self._not_full.set()
+        return event
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    def close(self):
+        """Unsubscribe; queued events can still be read."""
+        self.closed = True
+        self._bus.unsubscribe(self)
+        self._not_empty.set()
+        self._not_full.set()
+
+
+class EventBus:
+    """Fan out published events to the subscriptions wanting them."""
+
+    def __init__(self):
+        self.subscriptions: list[Subscription] = []
+        self._watchers: list = []
+
+    def watch(self, watcher):
+        """Call ``watcher()`` when a subscription is added or removed, return a function removing it."""
+        self._watchers.append(watcher)
+        return functools.partial(self._watchers.remove, watcher)
+
+    def _changed(self):
+        for watcher in list(self._watchers):
+            watcher()
+
+    def subscribe(self, kinds=None, *, maxsize=100, overflow=DROP_OLDEST):
+        """Return a new ``Subscription`` to events of ``kinds`` (all by default)."""
+        subscription = Subscription(self, kinds, maxsize, overflow)
+        self.subscriptions.append(subscription)
+        self._changed()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+            self._changed()
+
+    async def publish(self, event):
+        """Queue ``event`` to all subscriptions wanting it, waiting only for ``BLOCK`` ones."""
+        blocking = []
+        for subscription in list(self.subscriptions):
+            if not subscription.wants(event):
+                continue
+            if subscription.overflow == BLOCK:
+                blocking.append(subscription.put(event))
+            else:
+                subscription.put_nowait(event)
+        if blocking:
+            await asyncio.gather(*blocking)
+
+
+class EventPoller:  # pylint: disable=too-many-instance-attributes
+    """Publish changes seen by the refresh cycles of ``coordinator`` to ``bus``.
+
+    The poller sends no requests of its own, it listens to a
+    ``RefreshCoordinator``: subscribers and other users of the coordinator
+    share its cycles. While ``bus`` has subscriptions, the poller requires the
+    kinds revealing the events they want (see ``SOURCES``) from the
+    coordinator, e.g. no areas for call status subscribers only; with the last
+    subscription closed, a coordinator with nothing else to refresh stops.
+    The first observation of a device / area only sets the
+    baseline, events are published for later changes. The state of removed
+    devices and areas is forgotten. Call status is
+    refreshed for online devices with locks (door stations), area modes for
+    online devices, see ``RefreshCoordinator``.
+    """
+
+    def __init__(self, coordinator, bus):
+        self.coordinator = coordinator
+        self.bus = bus
+        # last seen state: serial -> is_online / call status, (serial, group_id) -> mode
+        self.online: dict[str, bool | None] = {}
+        self.call_status: dict[str, str] = {}
+        self.area_modes: dict[tuple[str, int], int] = {}
+        # events published for the latest refresh cycle
+        self.last_events: list[Event] = []
+        # coordinator kinds required for the live subscriptions
+        self.required: frozenset = frozenset()
+        self._release = None
+        coordinator.add_listener(self.publish_changes)
+        bus.watch(self._subscriptions_changed)
+
+    def _subscriptions_changed(self):
+        kinds: set[str] = set()
+        for subscription in self.bus.subscriptions:
+            kinds.update(
+                EVENT_KINDS if subscription.kinds is None else subscription.kinds
+            )
+        required = frozenset(SOURCES[kind] for kind in kinds if kind in SOURCES)
+        active = bool(self.bus.subscriptions)
+        if (self._release is not None) == active and required == self.required:
+            return
+        release = self._release
+        self._release = self.coordinator.require(required) if active else None
+        self.required = required
+        if release is not None:
+            release()  # after requiring the new kinds, not to stop in between
+
+    async def poll(self, kinds=None):
+        """Run a refresh cycle of ``kinds`` (the wanted ones by default), return its events."""
+        await self.coordinator.refresh(
+            self.coordinator.wanted() if kinds is None else kinds
+        )
+        return self.last_events
+
+    async def _publish_change(self, state, key, new, event):
+        """Remember ``new`` state under ``key``, publish ``event`` if it changed."""
+        old = state.get(key, new)
+        state[key] = new
+        if old == new:
+            return None
+        event = event._replace(old=old)
+        await self.bus.publish(event)
+        return event
+
+    def _forget_removed_devices(self, present):
+        """Drop the state of devices not ``present``, a re-added one starts a new baseline."""
+        for state in (self.online, self.call_status):
+            for serial in [serial for serial in state if serial not in present]:
+                del state[serial]
+        for key in [key for key in self.area_modes if key[0] not in present]:
+            del self.area_modes[key]
+
+    async def publish_changes(self, snapshot):
+        """Publish changes of the kinds refreshed in ``snapshot`` and return them."""
+        changes = []
+        if "devices" in snapshot.refreshed:
+            for serial, device in snapshot.devices.items():
+                online = device["is_online"]
+                event = Event(ONLINE, serial, None, online, snapshot.time)
+                changes.append(
+                    await self._publish_change(self.online, serial, online, event)
+                )
+            self._forget_removed_devices(snapshot.devices)
+        if "call_status" in snapshot.refreshed:
+            for serial, call_status in snapshot.call_status.items():
+                if ("call_status", serial) in snapshot.errors:
+                    continue
+                status = call_status["status"]
+                event = Event(
+                    CALL_STATUS,
+                    serial,
+                    None,
+                    status,
+                    snapshot.time,
+                    data=call_status["info"],
+                )
+                changes.append(
+                    await self._publish_change(self.call_status, serial, status, event)
+                )
+        if "areas" in snapshot.refreshed:
+            fetched = {
+                serial
+                for serial in snapshot.areas
+                if ("areas", serial) not in snapshot.errors
+            }
+            current = {
+                (serial, area["group_id"])
+                for serial in fetched
+                for area in snapshot.areas[serial]
+            }
+            for key in [k for k in self.area_modes if k[0] in fetched]:
+                if key not in current:
+                    del self.area_modes[key]  # the area was deleted
+            for serial, areas in snapshot.areas.items():
+                if ("areas", serial) in snapshot.errors:
+                    continue
+                for area in areas:
+                    key = (serial, area["group_id"])
+                    event = Event(
+                        AREA_MODE,
+                        serial,
+                        None,
+                        area["mode"],
+                        snapshot.time,
+                        area["group_id"],
+                    )
+                    changes.append(
+                        await self._publish_change(
+                            self.area_modes, key, area["mode"], event
+                        )
+                    )
+        self.last_events = [event for event in changes if event is not None]
+        return self.last_events
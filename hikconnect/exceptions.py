@@ -8,3 +8,19 @@ class LoginError(HikConnectError, ValueError):
 
 class DeviceOffline(HikConnectError):
     pass
+
+
+class BudgetExceeded(HikConnectError):
+    """A caller used up its ``CallBudget`` limit, the request wasn't sent."""
+
+
+class TraceMismatch(HikConnectError):
+    """A replayed request doesn't appear in the recorded trace."""
+
+
+class DeadlineExceeded(HikConnectError, TimeoutError):
+    """The ``timeouts.deadline()`` of an operation is over, the request wasn't sent."""
+
+
+class BatchError(ExceptionGroup, HikConnectError):
+    """Failures of a batch, the original (typed) exceptions are in ``exceptions``."""
@@ -0,0 +1,152 @@
+"""Hedged requests: race a duplicate of a slow idempotent read against the original.
+
+Example::
+
+    hedging = HedgingPolicy(endpoints={"call/status"}, percentile=95, max_extra=0.05)
+    api = HikConnect(hedging=hedging)
+    ...  # poll get_call_status()
+    hedging.stats()  # {'requests': 1200, 'hedged': 48, 'hedge_wins': 31, ...}
+
+When a request of a hedged endpoint hasn't answered within the ``percentile``
+of the endpoint's recent latency, the same request is sent again. The first
+response wins and the other request is cancelled. While the first request
+holds its connection, the session's connection pool sends the duplicate over
+another one, so it doesn't queue behind a stalled connection.
+
+Only ``GET`` requests are hedged: sending a request twice must be harmless.
+A duplicate is accounted like any other request: it is charged to the
+caller's ``CallBudget``, observed by ``Metrics`` and profiled separately.
+"""
+
+import asyncio
+import statistics
+import time
+from collections import deque
+
+DEFAULT_ENDPOINTS = frozenset({"call/status"})
+
+
+class HedgingPolicy:  # pylint: disable=too-many-instance-attributes
+    """Decide when to hedge requests of ``HikConnect(hedging=...)`` and run them.
+
+    Args:
+        endpoints: Logical endpoint names (as in ``Metrics``) whose ``GET``
+                   requests are hedged.
+        percentile: Percentile (whole, 1 - 99) of recent latency after which a
+                    duplicate is sent.
+        max_extra: Duplicates allowed per request, e.g. ``0.05`` adds at most
+                   5 % requests (plus ``burst``) however slow the API gets.
+        burst: Duplicates which may be sent at once from unused allowance.
+        window: Recent latencies kept per endpoint.
+        min_samples: Latencies needed before an endpoint is hedged at all.
+        min_delay: Shortest wait before sending a duplicate, in seconds.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        endpoints=DEFAULT_ENDPOINTS,
+        *,
+        percentile=95,
+        max_extra=0.05,
+        burst=5,
+        window=200,
+        min_samples=20,
+        min_delay=0.0,
+    ):
+        if not 1 <= round(percentile) <= 99:
+            raise ValueError("percentile must be between 1 and 99")
+        if max_extra < 0 or burst < 1:
+            raise ValueError("max_extra must be >= 0 and burst >= 1")
+        self.endpoints = frozenset(endpoints)
+        self.percentile = percentile
+        self.max_extra = max_extra
+        self.burst = burst
+        self.window = window
+        self.min_samples = max(min_samples, 2)
+        self.min_delay = min_delay
+        self._latencies: dict[str, deque[float]] = {}
+        self._tokens = 0.0
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.over_budget = 0  # slow requests not hedged for lack of allowance
+
+    def applies(self, endpoint, method):
+        return method == "GET" and endpoint in self.endpoints
+
+    def observe(self, endpoint, latency):
+        """Record a latency of ``endpoint``, in seconds."""
+        latencies = self._latencies.get(endpoint)
+        if latencies is None:
+            latencies = self._latencies[endpoint] = deque(maxlen=self.window)
+        latencies.append(latency)
+
+    def delay(self, endpoint):
+        """Return seconds to wait before hedging ``endpoint``, ``None`` if it isn't hedged yet."""
+        latencies = self._latencies.get(endpoint)
+        if latencies is None or len(latencies) < self.min_samples:
+            return None
+        cut = statistics.quantiles(latencies, n=100, method="inclusive")
+        return max(cut[round(self.percentile) - 1], self.min_delay)
+
+    def _take_allowance(self):
+        if self._tokens < 1:
+            self.over_budget += 1
+            return False
+        self._tokens -= 1
+        return True
+
+    async def run(self, endpoint, send):
+        """Await ``send()``, racing it against a second ``send()`` if it's slow."""
+        self.requests += 1
+        self._tokens = min(self._tokens + self.max_extra, self.burst)
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(send())
+        try:
+            delay = self.delay(endpoint)
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                if not done and self._take_allowance():
+                    result = await self._race(primary, send)
+                else:
+                    result = await primary
+            else:
+                result = await primary
+        finally:
+            primary.cancel()
+        # the latency seen by the caller, i.e. the winner's when hedged
+        self.observe(endpoint, time.perf_counter() - start)
+        return result
+
+    async def _race(self, primary, send):
+        self.hedged += 1
+        hedge = asyncio.ensure_future(send())
+        pending = {primary, hedge}
+        winner = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # retrieve every exception, not to leave one unreported
+                failed = {task for task in done if task.exception() is not None}
+                winner = next(iter(done - failed), None)
+        finally:
+            for task in pending:
+                task.cancel()
+        if winner is None:
+            # both failed, report the original request's error
+            return primary.result()
+        if winner is hedge:
+            self.hedge_wins += 1
+        return winner.result()
+
+    def stats(self):
+        """Return request and hedging counters."""
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "over_budget": self.over_budget,
+            "hedge_rate": self.hedged / self.requests if self.requests else 0.0,
+        }
@@ -0,0 +1,212 @@
+"""Compact per-device history of device and call status, see ``HikConnect(history=...)``.
+
+Every device has, per metric, a ring buffer of the latest raw samples and a
+ring buffer of hourly aggregates (min, max, sum and number of samples), both
+preallocated ``array.array`` buffers. Memory per device is fixed however long
+the process runs: the oldest samples / hours are overwritten.
+
+Example::
+
+    history = StatusHistory(raw_samples=24 * 60, hours=30 * 24)
+    api = HikConnect(history=history)
+    ...  # sweep devices / poll call status every minute
+    history.uptime(serial, since=time.time() - 86400)  # 0.98
+    history.min_per_hour(serial, "wifi_signal", since=time.time() - 86400)
+    # {1760270400: 42, 1760274000: 38, ...}
+"""
+
+import time
+from array import array
+
+METRICS = ("is_online", "wifi_signal", "call_status")
+# value recorded when unknown / missing
+UNKNOWN = -1
+HOUR = 3600
+
+# call status -> recorded value, see HikConnect.CALL_STATUS_MAPPING
+CALL_STATUS_VALUES = {"unknown": 0, "idle": 1, "ringing": 2, "call in progress": 3}
+
+
+class _Ring:
+    """Fixed capacity ring buffer of rows with columns of the given ``array`` typecodes."""
+
+    def __init__(self, capacity, **typecodes):
+        self.capacity = capacity
+        self.columns = {
+            name: array(typecode, [0]) * capacity
+            for name, typecode in typecodes.items()
+        }
+        self.size = 0
+        self._next = 0
+
+    def append(self, **row):
+        for name, value in row.items():
+            self.columns[name][self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def first(self, name):
+        """Return column ``name`` of the oldest row, ``None`` when empty."""
+        return (
+            self.columns[name][(self._next - self.size) % self.capacity]
+            if self.size
+            else None
+        )
+
+    def rows(self):
+        """Yield rows as tuples of column values, oldest first."""
+        columns = list(self.columns.values())
+        for i in range(self._next - self.size, self._next):
+            yield tuple(column[i % self.capacity] for column in columns)
+
+    def nbytes(self):
+        return sum(column.itemsize * len(column) for column in self.columns.values())
+
+
+class _Series:
+    """Raw samples and hourly aggregates of one metric of one device."""
+
+    def __init__(self, raw_samples, hours):
+        self.raw = _Ring(raw_samples, t="I", value="h")
+        self.hourly = _Ring(hours, hour="I", min="h", max="h", sum="q", count="H")
+        self.last = 0
+        # the hour being aggregated: [hour, min, max, sum, count]
+        self._bucket = [0, 0, 0, 0, 0]
+
+    def append(self, t, value):
+        t = max(int(t), self.last)  # keep time order if the clock goes backwards
+        self.last = t
+        self.raw.append(t=t, value=value)
+        if value == UNKNOWN:
+            return
+        hour = t - t % HOUR
+        bucket = self._bucket
+        if bucket[4] and bucket[0] != hour:
+            self._close_bucket()
+        if not bucket[4]:
+            bucket[:] = [hour, value, value, 0, 0]
+        bucket[1] = min(bucket[1], value)
+        bucket[2] = max(bucket[2], value)
+        bucket[3] += value
+        bucket[4] += 1
+
+    def _close_bucket(self):
+        hour, low, high, total, count = self._bucket
+        self.hourly.append(hour=hour, min=low, max=high, sum=total, count=count)
+        self._bucket[4] = 0
+
+    def hours(self, since, until):
+        """Yield ``(hour, min, max, sum, count)`` of hours overlapping ``since`` - ``until``."""
+        rows = list(self.hourly.rows())
+        if self._bucket[4]:
+            rows.append(tuple(self._bucket))
+        for row in rows:
+            if row[0] + HOUR > since and row[0] <= until:
+                yield row
+
+    def samples(self, since, until):
+        """Yield known ``(t, value)`` raw samples within ``since`` - ``until``."""
+        for t, value in self.raw.rows():
+            if since <= t <= until and value != UNKNOWN:
+                yield t, value
+
+
+class StatusHistory:
+    """Bounded history of ``is_online``, ``wifi_signal`` and ``call_status`` per device.
+
+    Args:
+        raw_samples: Raw samples kept per device and metric (e.g. 1440 is 24 hours
+                     of samples taken every minute).
+        hours: Hourly aggregates kept per device and metric.
+    """
+
+    def __init__(self, raw_samples=24 * 60, hours=7 * 24):
+        self.raw_samples = raw_samples
+        self.hours = hours
+        # (device serial, metric) -> _Series
+        self._series: dict[tuple[str, str], _Series] = {}
+
+    def record(self, device_serial, metric, value, at=None):
+        """Record ``value`` (``None`` if unknown) of ``metric`` of a device, at time ``at``."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+        key = (device_serial, metric)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series(self.raw_samples, self.hours)
+        series.append(
+            time.time() if at is None else at,
+            UNKNOWN if value is None else int(value),
+        )
+
+    def record_device(self, device_serial, is_online, wifi_signal, at=None):
+        self.record(device_serial, "is_online", is_online, at)
+        self.record(device_serial, "wifi_signal", wifi_signal, at)
+
+    def record_call_status(self, device_serial, status, at=None):
+        """Record a call status as returned by ``get_call_status()`` (e.g. ``"ringing"``)."""
+        self.record(device_serial, "call_status", CALL_STATUS_VALUES.get(status, 0), at)
+
+    def devices(self):
+        return sorted({serial for serial, _ in self._series})
+
+    def forget(self, device_serial):
+        """Drop the history of a device, e.g. one removed from the account."""
+        for metric in METRICS:
+            self._series.pop((device_serial, metric), None)
+
+    def nbytes(self):
+        """Return memory taken by the sample buffers, fixed per device and metric."""
+        return sum(
+            series.raw.nbytes() + series.hourly.nbytes()
+            for series in self._series.values()
+        )
+
+    def _get(self, device_serial, metric):
+        try:
+            return self._series[(device_serial, metric)]
+        except KeyError:
+            raise KeyError(f"No {metric} history of device {device_serial}") from None
+
+    def samples(self, device_serial, metric, since=0, until=None):
+        """Return known raw ``(timestamp, value)`` samples within ``since`` - ``until``."""
+        until = time.time() if until is None else until
+        return list(self._get(device_serial, metric).samples(since, until))
+
+    def hourly(self, device_serial, metric, since=0, until=None):
+        """Return ``{hour start: {"min", "max", "mean", "count"}}`` of known samples."""
+        until = time.time() if until is None else until
+        return {
+            hour: {"min": low, "max": high, "mean": total / count, "count": count}
+            for hour, low, high, total, count in self._get(device_serial, metric).hours(
+                since, until
+            )
+        }
+
+    def min_per_hour(self, device_serial, metric="wifi_signal", since=0, until=None):
+        """Return ``{hour start: minimum}`` of a metric within ``since`` - ``until``."""
+        return {
+            hour: stats["min"]
+            for hour, stats in self.hourly(device_serial, metric, since, until).items()
+        }
+
+    def uptime(self, device_serial, since=0, until=None):
+        """Return the fraction of samples the device was online, ``None`` without samples.
+
+        Computed from raw samples while they reach back to ``since``, otherwise from
+        hourly aggregates, i.e. with whole hours precision.
+        """
+        until = time.time() if until is None else until
+        series = self._get(device_serial, "is_online")
+        oldest = series.raw.first("t")
+        if series.raw.size < series.raw.capacity or (
+            oldest is not None and oldest <= since
+        ):
+            values = [value for _, value in series.samples(since, until)]
+            online, count = sum(values), len(values)
+        else:
+            online = count = 0
+            for _, _, _, total, hour_count in series.hours(since, until):
+                online += total
+                count += hour_count
+        return online / count if count else None
@@ -0,0 +1,231 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+
+from hikconnect.api import OPERATION_ERRORS
+
+log = logging.getLogger(__name__)
+
+
+async def fetch_inventory(api, *, concurrency: int = 10):
+    """Fetch devices, cameras, areas and area members for the whole fleet.
+
+    Per-device requests run concurrently, with at most ``concurrency`` of
+    them in flight. A device whose cameras or areas can't be fetched is kept
+    in the inventory with empty camera/area lists.
+
+    Returns:
+        dict with keys ``devices`` (list of ``get_devices()`` items),
+        ``cameras`` (device serial -> list of ``get_cameras()`` items) and
+        ``areas`` (device serial -> list of ``get_areas()`` items, each extended
+        with ``member_ids``).
+    """
+    devices = [device async for device in api.get_devices()]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def get_area(serial, group_id):
+        async with semaphore:
+            return await api.get_area(serial, group_id)
+
+    async def fetch_device(serial):
+        try:
+            async with semaphore:
+                cameras = [camera async for camera in api.get_cameras(serial)]
+        except (*OPERATION_ERRORS, KeyError) as e:
+            log.warning("Unable to fetch cameras for device '%s': %r", serial, e)
+            cameras = []
+        try:
+            async with semaphore:
+                areas = [area async for area in api.get_areas(serial)]
+            members = await asyncio.gather(
+                *(get_area(serial, area["group_id"]) for area in areas)
+            )
+        except (*OPERATION_ERRORS, KeyError) as e:
+            log.warning("Unable to fetch areas for device '%s': %r", serial, e)
+            areas, members = [], []
+        for area, area_members in zip(areas, members):
+            area["member_ids"] = [m["member_id"] for m in area_members]
+        return cameras, areas
+
+    serials = [device["serial"] for device in devices]
+    results = await asyncio.gather(*(fetch_device(serial) for serial in serials))
+    return {
+        "devices": devices,
+        "cameras": {serial: res[0] for serial, res in zip(serials, results)},
+        "areas": {serial: res[1] for serial, res in zip(serials, results)},
+    }
+
+
+class InventoryStore:
+    """Local SQLite snapshot of the fleet inventory for instant warm start.
+
+    Typical usage::
+
+        store = InventoryStore("inventory.sqlite")
+        inventory = store.load()      # instant, possibly stale data
+        store.start_revalidation(api) # refresh in the background
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS devices (
+            serial TEXT PRIMARY KEY,
+            type TEXT,
+            is_online INTEGER,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS devices_type ON devices (type);
+        CREATE INDEX IF NOT EXISTS devices_is_online ON devices (is_online);
+        CREATE TABLE IF NOT EXISTS cameras (
+            id TEXT NOT NULL,
+            device_serial TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (device_serial, id)
+        );
+        CREATE TABLE IF NOT EXISTS areas (
+            device_serial TEXT NOT NULL,
+            group_id INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (device_serial, group_id)
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.stale = True
+        self._db = sqlite3.connect(path)
+        self._db.executescript(self.SCHEMA)
+        self._revalidation = None
+
+    @property
+    def saved_at(self):
+        """Return UNIX timestamp of the last save, or ``None`` if the store is empty."""
+        row = self._db.execute(
+            "SELECT value FROM meta WHERE key = 'saved_at'"
+        ).fetchone()
+        return float(row[0]) if row else None
+
+    def save(self, inventory):
+        """Replace the stored snapshot with ``inventory`` (as returned by ``fetch_inventory()``)."""
+        with self._db:
+            self._db.execute("DELETE FROM devices")
+            self._db.execute("DELETE FROM cameras")
+            self._db.execute("DELETE FROM areas")
+            self._db.executemany(
+                "INSERT INTO devices VALUES (?, ?, ?, ?)",
+                (
+                    (d["serial"], d["type"], d.get("is_online"), json.dumps(d))
+                    for d in inventory["devices"]
+                ),
+            )
+            self._db.executemany(
+                "INSERT INTO cameras VALUES (?, ?, ?)",
+                (
+                    (c["id"], serial, json.dumps(c))
+                    for serial, cameras in inventory["cameras"].items()
+                    for c in cameras
+                ),
+            )
+            self._db.executemany(
+                "INSERT INTO areas VALUES (?, ?, ?)",
+                (
+                    (serial, a["group_id"], json.dumps(a))
+                    for serial, areas in inventory["areas"].items()
+                    for a in areas
+                ),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('saved_at', ?)",
+                (str(time.time()),),
+            )
+        log.info("Saved inventory of %d device(s)", len(inventory["devices"]))
+
+    def load(self):
+        """Load the stored snapshot.
+
+        Returns:
+            dict with the same shape as ``fetch_inventory()`` plus ``saved_at``
+            and ``stale`` (``True`` until ``revalidate()`` succeeds).
+        """
+        cameras: dict[str, list] = {}
+        for serial, data in self._db.execute(
+            "SELECT device_serial, data FROM cameras ORDER BY rowid"
+        ):
+            cameras.setdefault(serial, []).append(json.loads(data))
+        areas: dict[str, list] = {}
+        for serial, data in self._db.execute(
+            "SELECT device_serial, data FROM areas ORDER BY rowid"
+        ):
+            areas.setdefault(serial, []).append(json.loads(data))
+        devices = self._query_devices("SELECT data FROM devices ORDER BY rowid")
+        for device in devices:
+            cameras.setdefault(device["serial"], [])
+            areas.setdefault(device["serial"], [])
+        return {
+            "devices": devices,
+            "cameras": cameras,
+            "areas": areas,
+            "saved_at": self.saved_at,
+            "stale": self.stale,
+        }
+
+    def get_device(self, serial):
+        """Return a stored device by serial (index lookup), or ``None``."""
+        for device in self._query_devices(
+            "SELECT data FROM devices WHERE serial = ?", (serial,)
+        ):
+            return device
+        return None
+
+    def find_devices(self, *, device_type=None, is_online=None):
+        """Return stored devices filtered by type and/or online state (index lookups)."""
+        conditions, params = [], []
+        if device_type is not None:
+            conditions.append("type = ?")
+            params.append(device_type)
+        if is_online is not None:
+            conditions.append("is_online = ?")
+            params.append(is_online)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._query_devices(
+            f"SELECT data FROM devices {where} ORDER BY rowid", params
+        )
+
+    def _query_devices(self, sql, params=()):
+        devices = []
+        for (data,) in self._db.execute(sql, params):
+            device = json.loads(data)
+            # JSON object keys are always strings, restore integer channel numbers
+            device["locks"] = {int(k): v for k, v in device["locks"].items()}
+            devices.append(device)
+        return devices
+
+    async def revalidate(self, api):
+        """Re-fetch the whole inventory, save it and mark the store fresh."""
+        inventory = await fetch_inventory(api)
+        self.save(inventory)
+        self.stale = False
+        return inventory
+
+    def start_revalidation(self, api):
+        """Start ``revalidate()`` in a background task and return the task.
+
+        A failure is logged, the store stays stale.
+        """
+        if self._revalidation is None or self._revalidation.done():
+            self._revalidation = asyncio.create_task(self.revalidate(api))
+            self._revalidation.add_done_callback(self._log_revalidation_failure)
+        return self._revalidation
+
+    @staticmethod
+    def _log_revalidation_failure(task):
+        if not task.cancelled() and task.exception() is not None:
+            log.error("Inventory revalidation failed", exc_info=task.exception())
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,144 @@
+import bisect
+
+
+class _EndpointStats:  # pylint: disable=too-few-public-methods
+    __slots__ = (
+        "statuses",
+        "codes",
+        "latency_buckets",
+        "latency_sum",
+        "bytes_sum",
+        "count",
+        "responses",
+    )
+
+    def __init__(self, bucket_count):
+        self.statuses = {}
+        self.codes = {}
+        # non-cumulative counts, the last one is the +Inf bucket
+        self.latency_buckets = [0] * (bucket_count + 1)
+        self.latency_sum = 0.0
+        self.bytes_sum = 0
+        self.count = 0
+        self.responses = 0  # requests with an observed latency and size
+
+
+class Metrics:
+    """Per-endpoint request metrics of a ``HikConnect`` client.
+
+    Pass an instance as ``HikConnect(metrics=Metrics())`` to enable recording.
+    ``endpoint`` labels are logical names like ``"devices/pagelist"`` or
+    ``"call/unlock"``, not URLs, so the cardinality doesn't grow with the fleet.
+
+    ``status`` is the HTTP status, or ``"error"`` when no response was
+    received; ``code`` is ``meta.code`` of the JSON response body (if any).
+    ``"cancelled"`` requests (e.g. the loser of a hedged request) are counted,
+    but their partial latency and size aren't observed.
+    """
+
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS):
+        self.latency_buckets = tuple(sorted(latency_buckets))
+        self._endpoints = {}
+
+    def observe(self, endpoint, status, code, latency, size):
+        """Record one request."""
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints[endpoint] = _EndpointStats(
+                len(self.latency_buckets)
+            )
+        status = "error" if status is None else status
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        if code is not None:
+            stats.codes[code] = stats.codes.get(code, 0) + 1
+        stats.count += 1
+        if status == "cancelled":
+            return
+        stats.latency_buckets[bisect.bisect_left(self.latency_buckets, latency)] += 1
+        stats.latency_sum += latency
+        stats.bytes_sum += size
+        stats.responses += 1
+
+    def reset(self):
+        self._endpoints.clear()
+
+    def snapshot(self):
+        """Return recorded metrics as a dict keyed by endpoint.
+
+        Each value has keys ``requests``, ``statuses`` (status -> count),
+        ``codes`` (``meta.code`` -> count), ``latency`` (``count``, ``sum`` and
+        cumulative ``buckets``: upper bound -> count) and ``bytes``
+        (``count``, ``sum``).
+        """
+        snapshot = {}
+        for endpoint, stats in self._endpoints.items():
+            cumulative, buckets = 0, {}
+            for bound, count in zip(
+                self.latency_buckets + (float("inf"),), stats.latency_buckets
+            ):
+                cumulative += count
+                buckets[bound] = cumulative
+            snapshot[endpoint] = {
+                "requests": stats.count,
+                "statuses": dict(stats.statuses),
+                "codes": dict(stats.codes),
+                "latency": {
+                    "count": stats.responses,
+                    "sum": stats.latency_sum,
+                    "buckets": buckets,
+                },
+                "bytes": {"count": stats.responses, "sum": stats.bytes_sum},
+            }
+        return snapshot
+
+    def to_prometheus(self, prefix="hikconnect"):
+        """Return recorded metrics in Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_requests_total Requests by endpoint and HTTP status.",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        for endpoint, stats in snapshot.items():
+            for status, count in stats["statuses"].items():
+                lines.append(
+                    f'{prefix}_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}'
+                )
+        lines += [
+            f"# HELP {prefix}_response_codes_total Responses by endpoint and meta.code.",
+            f"# TYPE {prefix}_response_codes_total counter",
+        ]
+        for endpoint, stats in snapshot.items():
+            for code, count in stats["codes"].items():
+                lines.append(
+                    f'{prefix}_response_codes_total{{endpoint="{endpoint}",code="{code}"}} {count}'
+                )
+        lines += [
+            f"# HELP {prefix}_request_duration_seconds Request latency by endpoint.",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        for endpoint, stats in snapshot.items():
+            name = f"{prefix}_request_duration_seconds"
+            for bound, count in stats["latency"]["buckets"].items():
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(
+                    f'{name}_bucket{{endpoint="{endpoint}",le="{le}"}} {count}'
+                )
+            lines.append(
+                f'{name}_sum{{endpoint="{endpoint}"}} {stats["latency"]["sum"]}'
+            )
+            lines.append(
+                f'{name}_count{{endpoint="{endpoint}"}} {stats["latency"]["count"]}'
+            )
+        lines += [
+            f"# HELP {prefix}_response_bytes Response body size by endpoint.",
+            f"# TYPE {prefix}_response_bytes summary",
+        ]
+        for endpoint, stats in snapshot.items():
+            name = f"{prefix}_response_bytes"
+            lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {stats["bytes"]["sum"]}')
+            lines.append(
+                f'{name}_count{{endpoint="{endpoint}"}} {stats["bytes"]["count"]}'
+            )
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,77 @@
+import asyncio
+import functools
+from contextlib import asynccontextmanager
+
+from hikconnect.timeouts import acquire
+
+
+class DeviceSerializer:
+    """Run operations on one device in order, operations on different devices in parallel.
+
+    Each device serial gets its own FIFO queue (an ``asyncio.Lock``, which wakes
+    up waiters in order). Holding is re-entrant within a task, so composite
+    operations (e.g. ``update_area()`` = ``delete_area()`` + ``create_area()``)
+    don't deadlock on themselves and run as one uninterrupted unit. Tasks
+    started by the holder are not the holder, they wait for their turn. Waiting
+    for the turn counts towards the current ``timeouts.deadline()``.
+    """
+
+    def __init__(self):
+        self._locks = {}
+        self._depths = {}
+        # device_serial -> task holding its queue, used to make holding re-entrant
+        self._owners = {}
+
+    @asynccontextmanager
+    async def hold(self, device_serial: str):
+        """Wait for the turn of ``device_serial`` and hold its queue for the block.
+
+        Raises:
+            DeadlineExceeded: The current ``deadline()`` is over before the turn comes.
+        """
+        task = asyncio.current_task()
+        if self._owners.get(device_serial) is task:
+            yield
+            return
+
+        lock = self._locks.setdefault(device_serial, asyncio.Lock())
+        self._depths[device_serial] = self._depths.get(device_serial, 0) + 1
+        try:
+            await acquire(lock, f"the turn of device '{device_serial}'")
+            self._owners[device_serial] = task
+            try:
+                yield
+            finally:
+                del self._owners[device_serial]
+                lock.release()
+        finally:
+            self._depths[device_serial] -= 1
+            if not self._depths[device_serial]:
+                # forget idle devices, the fleet may be large
+                del self._depths[device_serial]
+                del self._locks[device_serial]
+
+    def holds(self, device_serial: str) -> bool:
+        """Return whether the current task holds the queue of ``device_serial``."""
+        return device_serial in self._owners and (
+            self._owners[device_serial] is asyncio.current_task()
+        )
+
+    def queue_depth(self, device_serial: str) -> int:
+        """Return number of operations running or waiting on a device."""
+        return self._depths.get(device_serial, 0)
+
+    def queue_depths(self) -> dict[str, int]:
+        """Return queue depths of all devices with pending operations."""
+        return dict(self._depths)
+
+
+def serialized_per_device(func):
+    """Decorate a ``HikConnect`` method taking ``device_serial`` first to run via ``self.device_serializer``."""
+
+    @functools.wraps(func)
+    async def wrapper(self, device_serial, *args, **kwargs):
+        async with self.device_serializer.hold(device_serial):
+            return await func(self, device_serial, *args, **kwargs)
+
+    return wrapper
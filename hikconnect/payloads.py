@@ -0,0 +1,291 @@
+"""Deterministic generator of realistic Hik-Connect API payloads for fleets of any size.
+
+The shapes (including the fields ``HikConnect`` ignores) follow real API
+responses, see ``tests/test_api.py``. Used by ``hikconnect.simulator`` and the
+benchmarks.
+
+Example::
+
+    fleet = generate_fleet(10_000, seed=1)
+    page = pagelist_payload(fleet, offset=0, limit=50)
+"""
+
+import json
+import random
+
+DEVICE_TYPES = (
+    # (device type, sub category, locks per channel or None, channels)
+    ("DS-KV6113-WPE1", "VIS", {"1": 1}, 1),
+    ("DS-KH6210-L", "VIS", {"1": 1, "2": 1, "3": 2, "4": 0}, 4),
+    ("DS-7608NI-K2-8P", "NVR", None, 8),
+)
+
+_SUPPORT_EXT = json.dumps(
+    {"1": "0", "2": "1", "10": "1", "26": "4", "52": "2", "154": "0", "234": 9},
+    separators=(",", ":"),
+)
+_CAPABILITY = json.dumps(
+    {"175": "1", "232": "0", "262": "1", "264": "1", "268": "1"}, separators=(",", ":")
+)
+
+# callerInfo of an idle door station, the most common call status payload
+IDLE_CALLER_INFO = {
+    "buildingNo": 0,
+    "floorNo": 0,
+    "zoneNo": 0,
+    "unitNo": 0,
+    "devNo": 0,
+    "devType": 0,
+    "lockNum": 0,
+}
+
+
+class FleetDevice:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """State of one generated device, mutable to simulate changes."""
+
+    def __init__(self, index, rng, offline_ratio=0.0, cameras_per_device=2):
+        device_type, category, locks, channels = DEVICE_TYPES[index % len(DEVICE_TYPES)]
+        self.serial = f"Q{index:08d}"
+        self.name = f"Simulated device {index}"
+        self.type = device_type
+        self.category = category
+        self.version = f"V5.{index % 7}.0 build 2{index % 10}0101"
+        self.locks = locks
+        self.is_online = rng.random() >= offline_ratio
+        self.update_available = index % 7 == 0
+        self.wifi_signal = rng.randint(20, 100)
+        self.local_ip = f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"
+        self.wan_ip = (
+            f"81.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+        )
+        self.cameras = [
+            {"id": f"{self.serial}-cam{channel}", "channel": channel}
+            for channel in range(1, min(cameras_per_device, channels) + 1)
+        ]
+        # group_id -> {"name", "mode", "members", "create_time", "modify_time"}
+        self.areas: dict[int, dict] = {}
+        self.call_status = 1
+        self.caller_info = dict(IDLE_CALLER_INFO)
+
+
+def generate_fleet(size, *, seed=0, offline_ratio=0.0, cameras_per_device=2):
+    """Return ``size`` devices, the same ones for the same arguments."""
+    rng = random.Random(seed)
+    return [
+        FleetDevice(index, rng, offline_ratio, cameras_per_device)
+        for index in range(size)
+    ]
+
+
+def _device_info(device):
+    return {
+        "name": device.name,
+        "deviceSerial": device.serial,
+        "fullSerial": f"{device.type}{device.serial}",
+        "deviceType": device.type,
+        "devicePicPrefix": "https://devpic.ezvizlife.com/device/image/DVR/",
+        "version": device.version,
+        "supportExt": _SUPPORT_EXT,
+        "status": int(device.is_online),
+        "userDeviceCreateTime": "2020-10-20 13:11:08",
+        "casIp": "eucas.ezvizlife.com",
+        "casPort": 6500,
+        "channelNumber": len(device.cameras),
+        "hik": True,
+        "deviceCategory": "COMMON",
+        "deviceSubCategory": device.category,
+        "ezDeviceCapability": _CAPABILITY,
+        "customType": device.type,
+        "offlineTime": "2021-08-22 10:17:54",
+        "offlineNotify": 0,
+        "accessPlatform": True,
+        "deviceDomain": device.serial,
+        "instructionBook": f"http://devpic.ezvizlife.com/device/image/{device.type}/instruction.jpeg",
+        "deviceShareInfo": None,
+        "feature": None,
+        "riskLevel": 0,
+        "offlineTimestamp": 1629627474000,
+    }
+
+
+def _status_info(device):
+    optionals = {
+        "latestUnbandTime": "1586592421107",
+        "wanIp": device.wan_ip,
+        "httpPort": "0",
+        "domain": device.serial,
+        "OnlineStatus": str(int(device.is_online)),
+        "cmdPort": "0",
+        "superState": "0",
+        "upnpMappingMode": "0",
+    }
+    if device.locks is not None:
+        optionals["lockNum"] = json.dumps(device.locks, separators=(",", ":"))
+    return {
+        "diskNum": 0,
+        "globalStatus": int(device.is_online),
+        "pirStatus": 0,
+        "isEncrypt": 0,
+        "upgradeAvailable": int(device.update_available),
+        "upgradeProcess": 0,
+        "upgradeStatus": -1,
+        "alarmSoundMode": 0,
+        "optionals": optionals,
+    }
+
+
+_PORTS = dict.fromkeys(
+    (
+        "localRtspPort",
+        "netRtspPort",
+        "netCmdPort",
+        "netHttpPort",
+        "localHttpPort",
+        "netStreamPort",
+    ),
+    0,
+)
+_HIDDNS_INFO = dict.fromkeys(
+    (
+        "upnpMappingMode",
+        "hiddnsHttpPort",
+        "localHiddnsHttpPort",
+        "mappingHiddnsHttpPort",
+        "mappingHiddnsCmdPort",
+        "localHiddnsCmdPort",
+        "hiddnsCmdPort",
+    ),
+    0,
+)
+_VIDEO_QUALITY = ((2, 0), (1, 2))  # (streamType, videoLevel)
+
+
+def _connection_info(device):
+    return {
+        "localIp": device.local_ip,
+        "netIp": device.wan_ip,
+        **_PORTS,
+        "localCmdPort": 9010,
+        "localStreamPort": 9020,
+        "netType": 3,
+        "wanIp": None,
+        "upnp": False,
+    }
+
+
+def pagelist_payload(devices, offset=0, limit=50):
+    """Return a ``devices/pagelist`` response of ``devices[offset:offset + limit]``."""
+    page = devices[offset : offset + limit]
+    return {
+        "deviceInfos": [_device_info(device) for device in page],
+        "connectionInfos": {device.serial: _connection_info(device) for device in page},
+        "statusInfos": {device.serial: _status_info(device) for device in page},
+        "wifiInfos": {
+            device.serial: {"signal": device.wifi_signal, "address": device.local_ip}
+            for device in page
+        },
+        "statusExtInfos": {
+            device.serial: {"upgradeAvailable": int(device.update_available)}
+            for device in page
+        },
+        "switchStatusInfos": {},
+        "alarmNodisturbInfos": {
+            device.serial: {"alarmEnable": 0, "callingEnable": 0} for device in page
+        },
+        "p2pInfos": {
+            device.serial: [{"ip": device.wan_ip, "port": 6000}] for device in page
+        },
+        "kmsInfos": {
+            device.serial: {"secretKey": device.serial.lower() * 4, "version": "101"}
+            for device in page
+        },
+        "hiddnsInfos": {
+            device.serial: {**_HIDDNS_INFO, "domain": "cas.ys7.com"} for device in page
+        },
+        "timePlanInfos": {},
+        "cameraInfos": [],
+        "meta": {"code": 200, "message": "OK", "moreInfo": {}},
+        "page": {
+            "offset": offset,
+            "limit": limit,
+            "totalResults": len(devices),
+            "hasNext": offset + limit < len(devices),
+        },
+    }
+
+
+def pagelist_pages(devices, limit=50):
+    """Return all ``devices/pagelist`` responses of a sweep over ``devices``."""
+    return [
+        pagelist_payload(devices, offset, limit)
+        for offset in range(0, max(len(devices), 1), limit)
+    ]
+
+
+def cameras_payload(device):
+    """Return a ``cameras/info`` response of ``device``."""
+    return {
+        "cameraInfos": [
+            {
+                "cameraId": camera["id"],
+                "cameraName": f"Camera {camera['channel']}",
+                "channelNo": camera["channel"],
+                "cameraCover": "https://ieu.ezvizlife.com/assets/imgs/public/homeDevice.jpeg",
+                "deviceSerial": device.serial,
+                "isShow": 1,
+                "videoLevel": 2,
+                "videoQualityInfos": [
+                    {"streamType": stream_type, "videoLevel": level}
+                    for stream_type, level in _VIDEO_QUALITY
+                ],
+                "streamBizUrl": "biz=1",
+                "deviceChannelInfo": {
+                    "channelDeviceSerial": device.serial,
+                    "channelNo": camera["channel"],
+                    "privacyStatus": 0,
+                    "powerStatus": 0,
+                    "globalStatus": 0,
+                    "signalStatus": int(device.is_online),
+                },
+                "cameraShareInfo": None,
+                "extPermission": None,
+            }
+            for camera in device.cameras
+        ],
+        "meta": {"code": 200, "message": "OK", "moreInfo": None},
+    }
+
+
+def call_status_payload(call_status=1, caller_info=None):
+    """Return a ``call/status`` response, ``data`` is a JSON string like in the real API."""
+    data = {
+        "callStatus": call_status,
+        "verifyMode": 0,
+        "callerInfo": IDLE_CALLER_INFO if caller_info is None else caller_info,
+        "rtc": "",
+    }
+    return {
+        "meta": {"code": 200, "message": "OK", "moreInfo": None},
+        "data": json.dumps(data, separators=(",", ":")),
+    }
+
+
+def call_status_payloads(size, *, seed=0, ringing_ratio=0.05):
+    """Return ``size`` call status responses, mostly idle, some ringing."""
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(size):
+        if rng.random() < ringing_ratio:
+            caller_info = {
+                "buildingNo": rng.randint(1, 5),
+                "floorNo": rng.randint(1, 20),
+                "zoneNo": 1,
+                "unitNo": rng.randint(1, 200),
+                "devNo": rng.randint(1, 4),
+                "devType": 1,
+                "lockNum": rng.randint(1, 2),
+            }
+            payloads.append(call_status_payload(2, caller_info))
+        else:
+            payloads.append(call_status_payload())
+    return payloads
@@ -0,0 +1,139 @@
+import logging
+import time
+from collections import deque
+
+from aiohttp import TraceConfig
+
+log = logging.getLogger(__name__)
+
+
+class RequestProfile:
+    """Timestamps of phases of one request, filled in by ``RequestProfiler``."""
+
+    def __init__(self, endpoint, method, url):
+        self.endpoint = endpoint
+        self.method = method
+        self.url = url
+        self.reused_connection = None
+        self.error = None
+        # phase name -> time.perf_counter() timestamp
+        self.marks = {"start": time.perf_counter()}
+
+    def mark(self, name):
+        self.marks[name] = time.perf_counter()
+
+    def _between(self, start, end):
+        if start not in self.marks or end not in self.marks:
+            return 0.0
+        return self.marks[end] - self.marks[start]
+
+    def phases(self):
+        """Return phase durations in seconds.
+
+        * ``queue`` - waiting for a free connection in the pool
+        * ``dns`` - resolving the host name (new connections only)
+        * ``connect`` - TCP connect and TLS handshake (new connections only,
+          aiohttp doesn't report TLS separately)
+        * ``send`` - sending request headers
+        * ``ttfb`` - waiting for response headers (server time to first byte)
+        * ``body`` - downloading the response body
+        * ``decode`` - decoding the JSON body
+        * ``total`` - the whole request
+        """
+        dns = self._between("dns_start", "dns_end")
+        connected = max(
+            self.marks.get(name, self.marks["start"])
+            for name in ("queue_end", "connect_end", "reuse")
+        )
+        return {
+            "queue": self._between("queue_start", "queue_end"),
+            "dns": dns,
+            "connect": max(self._between("connect_start", "connect_end") - dns, 0.0),
+            "send": (
+                self.marks["headers_sent"] - connected
+                if "headers_sent" in self.marks
+                else 0.0
+            ),
+            "ttfb": self._between("headers_sent", "response_start"),
+            "body": self._between("response_start", "body_read"),
+            "decode": self._between("body_read", "decoded"),
+            "total": self._between("start", "end"),
+        }
+
+
+class RequestProfiler:
+    """Opt-in per-phase timing of requests using aiohttp request tracing.
+
+    Pass an instance as ``HikConnect(profiler=RequestProfiler())``. Requests
+    taking longer than ``slow_threshold`` seconds are logged as warnings
+    together with their phase breakdown. The last ``history`` profiles are
+    kept in ``recent``.
+    """
+
+    def __init__(self, slow_threshold: float = 1.0, history: int = 100):
+        self.slow_threshold = slow_threshold
+        self.recent: deque[RequestProfile] = deque(maxlen=history)
+        self.new_connections = 0
+        self.reused_connections = 0
+
+        self.trace_config = TraceConfig()
+        self.trace_config.on_connection_queued_start.append(self._mark("queue_start"))
+        self.trace_config.on_connection_queued_end.append(self._mark("queue_end"))
+        self.trace_config.on_dns_resolvehost_start.append(self._mark("dns_start"))
+        self.trace_config.on_dns_resolvehost_end.append(self._mark("dns_end"))
+        self.trace_config.on_connection_create_start.append(self._mark("connect_start"))
+        self.trace_config.on_connection_create_end.append(
+            self._on_connection_create_end
+        )
+        self.trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        self.trace_config.on_request_headers_sent.append(self._mark("headers_sent"))
+        self.trace_config.on_request_end.append(self._mark("response_start"))
+
+    @staticmethod
+    def _mark(name):
+        async def hook(_session, ctx, _params):
+            if ctx.trace_request_ctx is not None:
+                ctx.trace_request_ctx.mark(name)
+
+        return hook
+
+    async def _on_connection_create_end(self, _session, ctx, _params):
+        self.new_connections += 1
+        if ctx.trace_request_ctx is not None:
+            ctx.trace_request_ctx.mark("connect_end")
+            ctx.trace_request_ctx.reused_connection = False
+
+    async def _on_connection_reuseconn(self, _session, ctx, _params):
+        self.reused_connections += 1
+        if ctx.trace_request_ctx is not None:
+            ctx.trace_request_ctx.mark("reuse")
+            ctx.trace_request_ctx.reused_connection = True
+
+    def start(self, endpoint, method, url):
+        """Return a new profile, to be passed as ``trace_request_ctx`` of the request."""
+        return RequestProfile(endpoint, method, url)
+
+    def finish(self, profile, error=None):
+        """Complete ``profile`` after the response was decoded (or the request failed)."""
+        profile.mark("end")
+        profile.error = error
+        self.recent.append(profile)
+        phases = profile.phases()
+        if phases["total"] >= self.slow_threshold:
+            log.warning(
+                "Slow request %s '%s' (%s) took %.3fs: %s, %s connection%s",
+                profile.method,
+                profile.endpoint,
+                profile.url,
+                phases["total"],
+                ", ".join(
+                    f"{name}={duration:.3f}s"
+                    for name, duration in phases.items()
+                    if name != "total"
+                ),
+                "reused" if profile.reused_connection else "new",
+                f", failed with {error!r}" if error else "",
+            )
+
+    def connection_stats(self):
+        return {"new": self.new_connections, "reused": self.reused_connections}
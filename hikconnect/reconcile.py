@@ -0,0 +1,171 @@
+import asyncio
+import logging
+
+from hikconnect.api import OPERATION_ERRORS
+from hikconnect.topology import AreaTopology
+
+log = logging.getLogger(__name__)
+
+# order of operations within a device: free names first, create last
+_OP_ORDER = {"delete": 0, "update": 1, "create": 2}
+
+
+def plan_areas(topology, desired):
+    """Compute the minimal list of operations turning indexed areas into ``desired``.
+
+    Args:
+        topology: ``AreaTopology`` built for (at least) the devices in ``desired``.
+        desired: ``{device_serial: {group_name: [member camera ids]}}``. Areas
+                 are matched by name, member order doesn't matter. Devices
+                 missing in ``desired`` are left alone, a device mapped to an
+                 empty dict gets all its areas deleted.
+
+    Returns:
+        list of operation dicts with keys ``op`` (``"create"``, ``"update"``
+        or ``"delete"``), ``device_serial``, ``group_id`` (``None`` for
+        ``"create"``), ``group_name`` and ``member_ids``.
+
+    Raises:
+        ValueError: If a desired area has no members (the API forbids empty areas).
+    """
+    plan = []
+    for device_serial, desired_areas in desired.items():
+        device_plan = []
+        wanted = dict(desired_areas)
+        for name, member_ids in wanted.items():
+            if not member_ids:
+                raise ValueError(
+                    f"Desired area '{name}' on device '{device_serial}' has no members."
+                )
+        for area in topology.areas_for_device(device_serial):
+            group_id, name = area["group_id"], area["group_name"]
+            member_ids = wanted.pop(name, None)
+            if member_ids is None:
+                # not desired, or a duplicate of an already matched name
+                device_plan.append(
+                    _op(
+                        "delete",
+                        device_serial,
+                        group_id,
+                        name,
+                        sorted(topology.members(device_serial, group_id)),
+                    )
+                )
+            elif set(member_ids) != topology.members(device_serial, group_id):
+                device_plan.append(
+                    _op("update", device_serial, group_id, name, list(member_ids))
+                )
+        for name, member_ids in wanted.items():
+            device_plan.append(
+                _op("create", device_serial, None, name, list(member_ids))
+            )
+        plan.extend(sorted(device_plan, key=lambda op: _OP_ORDER[op["op"]]))
+    return plan
+
+
+def _op(op, device_serial, group_id, group_name, member_ids):
+    return {
+        "op": op,
+        "device_serial": device_serial,
+        "group_id": group_id,
+        "group_name": group_name,
+        "member_ids": member_ids,
+    }
+
+
+def format_plan(plan):
+    """Return a human-readable, one operation per line, representation of ``plan``."""
+    if not plan:
+        return "No changes."
+    lines = []
+    for op in plan:
+        if op["op"] == "skip":
+            lines.append(f"{'skip':<6} {op['device_serial']}: {op['error']!r}")
+            continue
+        target = f"{op['device_serial']} '{op['group_name']}'"
+        if op["group_id"] is not None:
+            target += f" (group_id={op['group_id']})"
+        lines.append(f"{op['op']:<6} {target}: {', '.join(op['member_ids'])}")
+    return "\n".join(lines)
+
+
+async def apply_plan(topology, plan):
+    """Apply ``plan`` through ``topology``, devices in parallel, one device's operations in order.
+
+    A failed operation doesn't stop the others.
+
+    Returns:
+        the ``plan`` operations, each extended with ``result`` (``"applied"``
+        or ``"failed"``) and ``error`` (the exception or ``None``). ``"skip"``
+        operations of unreachable devices are reported as ``"failed"``.
+    """
+    by_device: dict[str, list[dict]] = {}
+    for op in plan:
+        by_device.setdefault(op["device_serial"], []).append(dict(op))
+
+    async def apply_device(ops):
+        for op in ops:
+            if op["op"] == "skip":
+                op["result"] = "failed"
+                continue
+            try:
+                if op["op"] == "delete":
+                    await topology.delete_area(op["device_serial"], op["group_id"])
+                elif op["op"] == "update":
+                    await topology.update_area(
+                        op["device_serial"],
+                        op["group_id"],
+                        op["group_name"],
+                        op["member_ids"],
+                    )
+                else:
+                    await topology.create_area(
+                        op["device_serial"], op["group_name"], op["member_ids"]
+                    )
+            except OPERATION_ERRORS as e:
+                log.warning("Failed to %s area: %s", op["op"], e)
+                op["result"], op["error"] = "failed", e
+            else:
+                op["result"], op["error"] = "applied", None
+
+    await asyncio.gather(*(apply_device(ops) for ops in by_device.values()))
+    return [op for ops in by_device.values() for op in ops]
+
+
+async def reconcile_areas(
+    api, desired, *, dry_run: bool = False, concurrency: int = 10
+):
+    """Make areas on devices match ``desired`` with the minimal set of operations.
+
+    Actual state is fetched concurrently for all devices in ``desired``, areas
+    with identical members are left alone. See ``plan_areas()`` for the
+    format of ``desired``. Devices whose areas couldn't be fetched are left
+    alone too, each reported by a ``"skip"`` operation with the ``error``;
+    the other devices are reconciled as usual.
+
+    Args:
+        api: Logged in ``HikConnect`` instance.
+        desired: Desired areas per device.
+        dry_run: Only compute and log the plan, don't change anything.
+        concurrency: Maximum number of requests in flight while fetching the
+                     actual state.
+
+    Returns:
+        the plan (see ``plan_areas()``); unless ``dry_run``, extended with
+        per-operation results (see ``apply_plan()``).
+    """
+    topology = AreaTopology(api)
+    failed = await topology.build(list(desired), concurrency=concurrency)
+    plan = [
+        {**_op("skip", device_serial, None, None, []), "error": error}
+        for device_serial, error in failed.items()
+    ]
+    plan += plan_areas(
+        topology,
+        {serial: areas for serial, areas in desired.items() if serial not in failed},
+    )
+    if dry_run:
+        log.info("Area reconciliation plan (dry run):\n%s", format_plan(plan))
+        return plan
+    log.info("Applying area reconciliation plan of %d operation(s)", len(plan))
+    return await apply_plan(topology, plan)
@@ -0,0 +1,228 @@
+"""Rules reacting to ringing door stations, run on the call status polling path.
+
+Example::
+
+    engine = RuleEngine(
+        [
+            Rule("resident", {"unit_number": {101, 102}}, "unlock", (1, 0)),
+            Rule("night", {}, "cancel_call", condition=between(time(22), time(6))),
+        ]
+    )
+    api = HikConnect(rules=engine)
+    ...  # poll get_call_status(), e.g. via api.subscribe() or RefreshCoordinator
+    engine.latency_stats()  # {'count': 12, 'p50': 0.21, 'p95': 0.34, 'max': 0.41}
+
+A rule fires when a device's call status changes to the rule's ``status``
+(``"ringing"`` by default). Commands are sent at once, in a task started by the
+``get_call_status()`` call which saw the change, through the same session and
+keep-alive connection pool as the polling, so they don't wait for a new
+connection as long as the polling keeps it warm.
+"""
+
+import asyncio
+import datetime
+import logging
+import statistics
+import time
+from collections import deque
+from typing import NamedTuple
+
+from hikconnect.api import HikConnect
+
+log = logging.getLogger(__name__)
+
+# fields of the parsed caller info a rule can match, e.g. "unit_number"
+CALL_INFO_FIELDS = frozenset(HikConnect.CALL_INFO_MAPPING.values())
+
+
+def between(start: datetime.time, end: datetime.time):
+    """Return a rule condition true between ``start`` and ``end`` local time (may span midnight)."""
+
+    def condition(device_serial, call_status):  # pylint: disable=unused-argument
+        now = datetime.datetime.now().time()
+        if start <= end:
+            return start <= now < end
+        return now >= start or now < end
+
+    return condition
+
+
+class Rule:  # pylint: disable=too-few-public-methods
+    """Run ``command`` (a ``HikConnect.DOOR_COMMANDS`` one) when a matching call starts ringing.
+
+    Args:
+        name: Identifies the rule in results and logs.
+        match: ``{caller info field: expected}``, ``expected`` is a value, a
+               collection of accepted values (e.g. a set or ``range``) or a
+               predicate. Empty matches every call.
+        command: Sent as ``command(device_serial, *args)``, e.g. ``"unlock"``
+                 with ``args=(channel_number, lock_index)``.
+        condition: Optional ``condition(device_serial, call_status)``
+                   which has to be true too, e.g. ``between()``.
+        device_serials: Devices the rule applies to, all by default.
+        status: Call status triggering the rule.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        name,
+        match,
+        command,
+        args=(),
+        *,
+        condition=None,
+        device_serials=None,
+        status="ringing",
+    ):
+        unknown = set(match) - CALL_INFO_FIELDS
+        if unknown:
+            raise ValueError(
+                f"Unknown caller info field(s): {', '.join(sorted(unknown))}"
+            )
+        if command not in HikConnect.DOOR_COMMANDS:
+            raise ValueError(f"Unknown door command: {command}")
+        self.name = name
+        self.match = match
+        self.command = command
+        self.args = tuple(args)
+        self.condition = condition
+        self.device_serials = frozenset(device_serials) if device_serials else None
+        self.status = status
+
+    def matches(self, device_serial, call_status):
+        if call_status["status"] != self.status:
+            return False
+        if self.device_serials is not None and device_serial not in self.device_serials:
+            return False
+        info = call_status["info"]
+        for field, expected in self.match.items():
+            value = info.get(field)
+            if callable(expected):
+                if not expected(value):
+                    return False
+            elif isinstance(expected, (set, frozenset, list, tuple, range)):
+                if value not in expected:
+                    return False
+            elif value != expected:
+                return False
+        return self.condition is None or self.condition(device_serial, call_status)
+
+
+class RuleResult(NamedTuple):
+    rule: str
+    device_serial: str
+    command: str
+    error: Exception | None
+    detect: float  # seconds from the call status request start to seeing the change
+    action: float  # seconds from seeing the change to the command response
+    time: float  # time.time() of the change
+
+    @property
+    def latency(self):
+        """Ring-to-action latency: from polling the ring to the command's response."""
+        return self.detect + self.action
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class RuleEngine:
+    """Match ``Rule`` s against polled call status and run their commands at once.
+
+    Rules matching one change run in order, one after another (e.g. unlock,
+    then cancel the call). ``results`` keeps the latest ``history`` results.
+    """
+
+    def __init__(self, rules=(), history=1000):
+        self.rules = list(rules)
+        self.results: deque[RuleResult] = deque(maxlen=history)
+        self._statuses: dict[str, str] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def observe(self, api, device_serial, call_status, request_start):
+        """Handle a ``get_call_status()`` result, ``request_start`` is its ``time.perf_counter()``.
+
+        Called by ``HikConnect`` itself, sends commands of matching rules in a task.
+        A rule whose predicate or condition raises is logged and skipped.
+        """
+        detected = time.perf_counter()
+        previous = self._statuses.get(device_serial)
+        self._statuses[device_serial] = call_status["status"]
+        if previous == call_status["status"]:
+            return None
+        rules = [
+            rule
+            for rule in self.rules
+            if self._matches(rule, device_serial, call_status)
+        ]
+        if not rules:
+            return None
+        task = asyncio.create_task(
+            self._run(api, device_serial, rules, detected - request_start, detected)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    @staticmethod
+    def _matches(rule, device_serial, call_status):
+        # a failing user predicate or condition must not break the polling
+        try:
+            return rule.matches(device_serial, call_status)
+        except Exception:  # pylint: disable=broad-exception-caught
+            log.exception(
+                "Rule '%s' failed to match call status of %s", rule.name, device_serial
+            )
+            return False
+
+    async def _run(self, api, device_serial, rules, detect, detected):
+        changed_at = time.time()
+        for rule in rules:
+            error = None
+            try:
+                await getattr(api, rule.command)(device_serial, *rule.args)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                error = e
+                log.warning(
+                    "Rule '%s' failed to %s %s: %r",
+                    rule.name,
+                    rule.command,
+                    device_serial,
+                    e,
+                )
+            result = RuleResult(
+                rule.name,
+                device_serial,
+                rule.command,
+                error,
+                detect,
+                time.perf_counter() - detected,
+                changed_at,
+            )
+            self.results.append(result)
+            if result.ok:
+                log.info(
+                    "Rule '%s' sent %s to %s, %.3f s after polling the ring",
+                    rule.name,
+                    rule.command,
+                    device_serial,
+                    result.latency,
+                )
+
+    async def drain(self):
+        """Wait for commands being sent."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def latency_stats(self):
+        """Return count, p50, p95 and max ring-to-action latency of successful commands."""
+        latencies = sorted(result.latency for result in self.results if result.ok)
+        if not latencies:
+            return {"count": 0, "p50": None, "p95": None, "max": None}
+        if len(latencies) == 1:
+            p50 = p95 = latencies[0]
+        else:
+            percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50, p95 = percentiles[49], percentiles[94]
+        return {"count": len(latencies), "p50": p50, "p95": p95, "max": latencies[-1]}
@@ -0,0 +1,480 @@
+"""Local stand-in for the Hik-Connect API, for load, latency and fault testing.
+
+Example::
+
+    async with ApiSimulator(devices=1000, latency={"*": lognormal(0.05, 0.5)}) as sim:
+        api = HikConnect()
+        api.BASE_URL = sim.base_url
+        await api.login("user", "password")
+        devices = [device async for device in api.get_devices()]
+
+Run ``python -m hikconnect.simulator --help`` to start it as a standalone server.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import random
+import time
+from collections import deque
+
+from aiohttp import web
+
+from hikconnect.payloads import (
+    call_status_payload,
+    cameras_payload,
+    generate_fleet,
+    pagelist_payload,
+)
+
+log = logging.getLogger(__name__)
+
+# meta.code the API returns when the target device is offline
+OFFLINE_CODES = {"group/switchDefenceMode": 70002}
+DEFAULT_OFFLINE_CODE = 2003
+# endpoints where a device being offline shows up as OFFLINE_CODES
+_DEVICE_ENDPOINTS = frozenset(
+    {
+        "call/status",
+        "call/unlock",
+        "call/answer",
+        "call/cancel",
+        "call/hangup",
+        "group/switchDefenceMode",
+    }
+)
+_CALL_OPERATIONS = {"2": "call/answer", "3": "call/cancel", "5": "call/hangup"}
+_ENDPOINT = web.RequestKey("endpoint", str)
+
+
+class _Offline(Exception):
+    """Raised by endpoint handlers when the target device is offline."""
+
+
+def uniform(low: float, high: float):
+    """Return a latency distribution uniform between ``low`` and ``high`` seconds."""
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float):
+    """Return a long-tailed latency distribution with the given ``median`` seconds."""
+    return lambda rng: median * rng.lognormvariate(0, sigma)
+
+
+def _jwt(lifetime):
+    def encode(data):
+        raw = base64.urlsafe_b64encode(json.dumps(data).encode())
+        return raw.rstrip(b"=").decode()
+
+    claims = {"exp": int(time.time() + lifetime), "jti": random.getrandbits(64)}
+    return f"{encode({'alg': 'none'})}.{encode(claims)}.simulator"
+
+
+class ApiSimulator:
+    """Local HTTP server emulating the Hik-Connect endpoints used by ``HikConnect``.
+
+    The fleet is generated deterministically from ``seed``. Any credentials
+    are accepted.
+
+    Args:
+        devices: Number of devices in the fleet.
+        cameras_per_device: Cameras per device (capped by the device's channel count).
+        offline_ratio: Fraction of devices reported offline.
+        latency: ``{endpoint: seconds or distribution}`` of added response
+                 latency, ``"*"`` applies to endpoints not listed. A
+                 distribution is a callable taking ``random.Random``, see
+                 ``uniform()`` and ``lognormal()``.
+        rate_limits: ``{endpoint: (max_requests, window)}``, requests over the
+                     limit get HTTP 429. ``"*"`` limits all endpoints together.
+        faults: ``{endpoint: {fault: probability}}``, ``"*"`` applies to
+                endpoints not listed. Faults are ``"5xx"`` (HTTP 500/502/503),
+                ``"timeout"`` (hold the response for ``hang_time`` seconds)
+                and ``"offline"`` (meta.code 2003, or 70002 for
+                ``group/switchDefenceMode``).
+        redirect_login: Answer the first login with code 1100, redirecting the
+                        client to ``localhost`` (the same server).
+        hang_time: How long a ``"timeout"`` fault holds the response.
+        seed: Seed of the fleet generator and of random latencies and faults.
+
+    ``endpoint`` names are the ones used by ``hikconnect.metrics``.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        *,
+        devices: int = 100,
+        cameras_per_device: int = 2,
+        offline_ratio: float = 0.0,
+        latency=None,
+        rate_limits: dict[str, tuple[int, float]] | None = None,
+        faults: dict[str, dict[str, float]] | None = None,
+        redirect_login: bool = False,
+        hang_time: float = 30.0,
+        seed: int = 0,
+    ):
+        # pylint: disable=too-many-arguments
+        self.fleet = generate_fleet(
+            devices,
+            seed=seed,
+            offline_ratio=offline_ratio,
+            cameras_per_device=cameras_per_device,
+        )
+        self.devices = {device.serial: device for device in self.fleet}
+        self.rng = random.Random(seed)
+        self.latency = latency or {}
+        self.rate_limits = rate_limits or {}
+        self.faults = faults or {}
+        self.redirect_login = redirect_login
+        self.hang_time = hang_time
+        # endpoint -> number of received requests (including rejected ones)
+        self.request_counts: dict[str, int] = {}
+        # (device_serial, channel_number, lock_index) of received unlock requests
+        self.unlocks: list[tuple[str, int, int]] = []
+        self._rate_windows: dict[str, deque[float]] = {}
+        self._next_group_id = 100000
+        self._runner: web.AppRunner | None = None
+        self._endpoints: dict = {}  # aiohttp route -> endpoint name
+        self.app = self._make_app()
+
+    def _make_app(self):
+        app = web.Application(middlewares=[self._middleware])
+        routes = [
+            ("POST", "/v3/users/login/v2", self._login, "login"),
+            ("PUT", "/v3/apigateway/login", self._refresh, "login/refresh"),
+            (
+                "GET",
+                "/v3/userdevices/v1/devices/pagelist",
+                self._pagelist,
+                "devices/pagelist",
+            ),
+            ("GET", "/v3/userdevices/v1/cameras/info", self._cameras, "cameras/info"),
+            ("GET", "/v3/devices/group/{serial}/list", self._areas, "group/list"),
+            (
+                "POST",
+                "/v3/devices/group/{serial}/switchDefenceMode",
+                self._switch_defence_mode,
+                "group/switchDefenceMode",
+            ),
+            (
+                "GET",
+                r"/v3/devices/group/{serial}/{group_id:\d+}",
+                self._area,
+                "group/detail",
+            ),
+            (
+                "DELETE",
+                r"/v3/devices/group/{serial}/{group_id:\d+}",
+                self._delete_area,
+                "group/delete",
+            ),
+            ("POST", "/v3/devices/group/{serial}", self._create_area, "group/create"),
+            (
+                "GET",
+                "/v3/devconfig/v1/call/{serial}/status",
+                self._call_status,
+                "call/status",
+            ),
+            (
+                "PUT",
+                r"/v3/devconfig/v1/call/{serial}/{channel:\d+}/remote/unlock",
+                self._unlock,
+                "call/unlock",
+            ),
+            (
+                "PUT",
+                "/v3/devconfig/v1/call/{serial}/operation",
+                self._call_operation,
+                "call/operation",  # answer / cancel / hangup by cmdId
+            ),
+        ]
+        for method, path, handler, endpoint in routes:
+            route = app.router.add_route(method, path, handler)
+            self._endpoints[route] = endpoint
+        return app
+
+    # ------------------------------------------------------------------
+    # Server lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        """Start serving, ``port=0`` picks a free port. Returns ``base_url``."""
+        if self._runner is not None:
+            raise RuntimeError("The simulator is already running.")
+        # stop handling requests abandoned by the client (e.g. held by a "timeout" fault)
+        self._runner = web.AppRunner(
+            self.app, access_log=None, shutdown_timeout=0, handler_cancellation=True
+        )
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        log.info("Hik-Connect API simulator listening on %s", self.base_url)
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def base_url(self):
+        """URL to use as ``HikConnect.BASE_URL``."""
+        if self._runner is None:
+            raise RuntimeError("The simulator isn't running.")
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    # ------------------------------------------------------------------
+    # Fleet state
+    # ------------------------------------------------------------------
+
+    def set_call_status(self, device_serial: str, status: int, caller_info=None):
+        """Set call status of a device (1 = idle, 2 = ringing, 3 = call in progress)."""
+        device = self.devices[device_serial]
+        device.call_status = status
+        device.caller_info = dict(caller_info or {})
+
+    def set_online(self, device_serial: str, is_online: bool):
+        self.devices[device_serial].is_online = is_online
+
+    # ------------------------------------------------------------------
+    # Request pipeline: accounting, rate limits, faults, latency
+    # ------------------------------------------------------------------
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        endpoint = self._endpoints.get(request.match_info.route, "unknown")
+        if endpoint == "call/operation":
+            endpoint = _CALL_OPERATIONS.get(request.query.get("cmdId"), endpoint)
+        request[_ENDPOINT] = endpoint
+        self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+
+        if self._rate_limited(endpoint) or self._rate_limited("*"):
+            return web.json_response(
+                {"meta": {"code": 429, "message": "Too many requests"}}, status=429
+            )
+
+        latency = self.latency.get(endpoint, self.latency.get("*", 0))
+        delay = latency(self.rng) if callable(latency) else latency
+        faults = self.faults.get(endpoint, self.faults.get("*", {}))
+        fault = next(
+            (name for name, p in faults.items() if self.rng.random() < p), None
+        )
+        if fault == "timeout":
+            delay = self.hang_time
+        if delay:
+            await asyncio.sleep(delay)
+
+        if fault == "5xx":
+            return web.json_response(
+                {"meta": {"code": 500, "message": "Injected fault"}},
+                status=self.rng.choice((500, 502, 503)),
+            )
+        try:
+            if fault == "offline":
+                raise _Offline()
+            return await handler(request)
+        except _Offline:
+            code = OFFLINE_CODES.get(endpoint, DEFAULT_OFFLINE_CODE)
+            return web.json_response(
+                {"meta": {"code": code, "message": "Device offline"}}
+            )
+
+    def _rate_limited(self, endpoint):
+        if endpoint not in self.rate_limits:
+            return False
+        max_requests, window = self.rate_limits[endpoint]
+        calls = self._rate_windows.setdefault(endpoint, deque())
+        now = time.monotonic()
+        while calls and calls[0] <= now - window:
+            calls.popleft()
+        if len(calls) >= max_requests:
+            return True
+        calls.append(now)
+        return False
+
+    @staticmethod
+    def _ok(**data):
+        return web.json_response({"meta": {"code": 200, "message": "OK"}, **data})
+
+    def _device(self, request):
+        device = self.devices.get(request.match_info.get("serial"))
+        if device is None:
+            raise web.HTTPNotFound()
+        if not device.is_online and request[_ENDPOINT] in _DEVICE_ENDPOINTS:
+            raise _Offline()
+        return device
+
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+
+    async def _login(self, request):
+        if self.redirect_login and request.host.startswith("127.0.0.1"):
+            port = request.url.port
+            return web.json_response(
+                {
+                    "meta": {"code": 1100, "message": "Redirect"},
+                    "loginArea": {"apiDomain": f"localhost:{port}"},
+                }
+            )
+        return self._ok(
+            loginSession={"sessionId": _jwt(86400), "rfSessionId": _jwt(30 * 86400)}
+        )
+
+    async def _refresh(self, _request):
+        return self._ok(
+            sessionInfo={
+                "sessionId": _jwt(86400),
+                "refreshSessionId": _jwt(30 * 86400),
+            }
+        )
+
+    async def _pagelist(self, request):
+        limit = int(request.query.get("limit", 50))
+        offset = int(request.query.get("offset", 0))
+        return web.json_response(pagelist_payload(self.fleet, offset, limit))
+
+    async def _cameras(self, request):
+        device = self.devices.get(request.query.get("deviceSerial"))
+        if device is None:
+            raise web.HTTPNotFound()
+        return web.json_response(cameras_payload(device))
+
+    @staticmethod
+    def _area_payload(device, group_id):
+        area = device.areas[group_id]
+        return {
+            "groupId": group_id,
+            "groupDevSerial": device.serial,
+            "groupName": area["name"],
+            "groupType": 2,
+            "mode": area["mode"],
+            "createTime": area["create_time"],
+            "modifyTime": area["modify_time"],
+        }
+
+    async def _areas(self, request):
+        device = self._device(request)
+        return self._ok(
+            list=[self._area_payload(device, group_id) for group_id in device.areas]
+        )
+
+    async def _area(self, request):
+        device = self._device(request)
+        group_id = int(request.match_info["group_id"])
+        if group_id not in device.areas:
+            return web.json_response({"meta": {"code": 4004, "message": "No group"}})
+        return self._ok(
+            list=[
+                {"groupId": group_id, "groupDevSerial": device.serial, "memberId": m}
+                for m in device.areas[group_id]["members"]
+            ]
+        )
+
+    async def _create_area(self, request):
+        device = self._device(request)
+        body = await request.json()
+        if not body.get("resourceIds"):
+            return web.json_response({"meta": {"code": 4000, "message": "No members"}})
+        self._next_group_id += 1
+        now = int(time.time() * 1000)
+        device.areas[self._next_group_id] = {
+            "name": body["groupName"],
+            "mode": 0,
+            "members": list(body["resourceIds"]),
+            "create_time": now,
+            "modify_time": now,
+        }
+        return self._ok(groupInfo=self._area_payload(device, self._next_group_id))
+
+    async def _delete_area(self, request):
+        device = self._device(request)
+        if device.areas.pop(int(request.match_info["group_id"]), None) is None:
+            return web.json_response({"meta": {"code": 4004, "message": "No group"}})
+        return self._ok()
+
+    async def _switch_defence_mode(self, request):
+        device = self._device(request)
+        body = await request.json()
+        area = device.areas.get(body["groupId"])
+        if area is None:
+            return web.json_response({"meta": {"code": 4004, "message": "No group"}})
+        area["mode"] = body["mode"]
+        area["modify_time"] = int(time.time() * 1000)
+        return self._ok()
+
+    async def _call_status(self, request):
+        device = self._device(request)
+        return web.json_response(
+            call_status_payload(device.call_status, device.caller_info)
+        )
+
+    async def _unlock(self, request):
+        device = self._device(request)
+        self.unlocks.append(
+            (
+                device.serial,
+                int(request.match_info["channel"]),
+                int(request.query.get("lockId", 0)),
+            )
+        )
+        return self._ok()
+
+    async def _call_operation(self, request):
+        device = self._device(request)
+        if request[_ENDPOINT] in ("call/cancel", "call/hangup"):
+            self.set_call_status(device.serial, 1)
+        elif request[_ENDPOINT] == "call/answer":
+            self.set_call_status(device.serial, 3, device.caller_info)
+        return self._ok()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Hik-Connect API simulator.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--offline-ratio", type=float, default=0.0)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="median latency in seconds"
+    )
+    parser.add_argument(
+        "--fault-rate", type=float, default=0.0, help="probability of HTTP 5xx"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    async def serve():
+        simulator = ApiSimulator(
+            devices=args.devices,
+            offline_ratio=args.offline_ratio,
+            latency={"*": lognormal(args.latency, 0.5)} if args.latency else None,
+            faults={"*": {"5xx": args.fault_rate}} if args.fault_rate else None,
+            seed=args.seed,
+        )
+        await simulator.start(args.host, args.port)
+        try:
+            print(f"Serving {args.devices} devices on {simulator.base_url}")
+            await asyncio.Event().wait()
+        finally:
+            await simulator.stop()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
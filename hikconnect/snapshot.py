@@ -0,0 +1,188 @@
+"""Columnar snapshot of a device fleet for fleet-wide analytics.
+
+Built straight from device list pages, without a dict per device. Columns
+are compact ``array.array`` buffers which NumPy and Arrow use without
+copying.
+
+Example::
+
+    snapshot = await FleetSnapshot.fetch(api)
+    snapshot.counts("type", is_online=False)  # {'DS-KV6113-WPE1': 12, ...}
+    snapshot.signal_histogram("version")  # {'V5.1.0 build 210101': {40: 3, 50: 8, ...}, ...}
+
+    columns = snapshot.to_numpy()  # needs numpy
+    (columns["type"] == "DS-KV6113-WPE1").sum()
+    table = snapshot.to_arrow()  # needs pyarrow
+"""
+
+import time
+from array import array
+from collections import Counter, defaultdict
+from itertools import compress
+
+from hikconnect.api import HikConnect
+from hikconnect.devices import device_section
+
+# value of the is_online, update_available and wifi_signal columns when unknown
+UNKNOWN = -1
+
+# columns stored as codes into a list of distinct values (dictionary encoded)
+CATEGORICAL = ("type", "version")
+
+
+class _Categories:  # pylint: disable=too-few-public-methods
+    """Distinct values of a categorical column and their codes."""
+
+    def __init__(self):
+        self.values: list[str] = []
+        self.codes = array("H")
+        self._index: dict[str, int] = {}
+
+    def append(self, value):
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+
+def _flag(value):
+    return UNKNOWN if value is None else int(value)
+
+
+class FleetSnapshot:
+    """Devices of a fleet as parallel columns, row ``i`` of each is device ``serials[i]``.
+
+    Columns:
+        serials: list of device serials.
+        type_codes / types, version_codes / versions: ``array("H")`` of codes
+            into the list of distinct device types / firmware versions.
+        is_online, update_available: ``array("b")`` of 1 / 0 / ``UNKNOWN``.
+        wifi_signal: ``array("h")``, ``UNKNOWN`` if missing or the device is
+            offline (like ``get_devices()`` reports ``None``).
+    """
+
+    def __init__(self):
+        self.taken_at = time.time()
+        self.serials: list[str] = []
+        self._categories = {name: _Categories() for name in CATEGORICAL}
+        self.is_online = array("b")
+        self.update_available = array("b")
+        self.wifi_signal = array("h")
+
+    @classmethod
+    async def fetch(cls, api):
+        """Return a snapshot of all devices of the logged in user."""
+        return cls.from_pages([page async for page in api.get_device_pages()])
+
+    @classmethod
+    def from_pages(cls, pages):
+        """Return a snapshot of devices in device list responses ``pages``."""
+        # pylint: disable=protected-access
+        snapshot = cls()
+        for page in pages:
+            for device in page["deviceInfos"]:
+                serial = device["deviceSerial"]
+                status = device_section(page, "statusInfos", serial)
+                is_online = HikConnect._parse_is_online(status)
+                signal = HikConnect._parse_wifi_signal(
+                    device_section(page, "wifiInfos", serial)
+                )
+
+                snapshot.serials.append(serial)
+                snapshot._categories["type"].append(device["deviceType"])
+                snapshot._categories["version"].append(device["version"])
+                snapshot.is_online.append(_flag(is_online))
+                snapshot.update_available.append(
+                    _flag(HikConnect._parse_update_available(status))
+                )
+                snapshot.wifi_signal.append(
+                    signal if is_online and signal is not None else UNKNOWN
+                )
+        return snapshot
+
+    def __len__(self):
+        return len(self.serials)
+
+    @property
+    def types(self):
+        return self._categories["type"].values
+
+    @property
+    def type_codes(self):
+        return self._categories["type"].codes
+
+    @property
+    def versions(self):
+        return self._categories["version"].values
+
+    @property
+    def version_codes(self):
+        return self._categories["version"].codes
+
+    def _mask(self, is_online):
+        if is_online is None:
+            return None
+        return map(_flag(is_online).__eq__, self.is_online)
+
+    def counts(self, by="type", is_online=None):
+        """Return ``{type / version: number of devices}``, optionally only (not) online."""
+        if by not in CATEGORICAL:
+            raise ValueError(f"Can't count by {by!r}, only by one of {CATEGORICAL}")
+        categories = self._categories[by]
+        mask = self._mask(is_online)
+        codes = categories.codes if mask is None else compress(categories.codes, mask)
+        return {
+            categories.values[code]: count for code, count in Counter(codes).items()
+        }
+
+    def signal_histogram(self, by="version", bin_width=10):
+        """Return ``{type / version: {bin start: number of devices}}`` of known WiFi signals."""
+        if by not in CATEGORICAL:
+            raise ValueError(f"Can't group by {by!r}, only by one of {CATEGORICAL}")
+        categories = self._categories[by]
+        histogram: dict[str, Counter] = defaultdict(Counter)
+        for code, signal in zip(categories.codes, self.wifi_signal):
+            if signal != UNKNOWN:
+                histogram[categories.values[code]][signal // bin_width * bin_width] += 1
+        return {value: dict(sorted(bins.items())) for value, bins in histogram.items()}
+
+    def to_numpy(self):
+        """Return ``{column: numpy array}``, numeric columns share memory with the snapshot."""
+        import numpy  # pylint: disable=import-outside-toplevel,import-error
+
+        columns = {"serial": numpy.array(self.serials)}
+        for name in CATEGORICAL:
+            categories = self._categories[name]
+            codes = numpy.frombuffer(categories.codes, dtype=numpy.uint16)
+            columns[name] = numpy.array(categories.values, dtype=str)[codes]
+        columns["is_online"] = numpy.frombuffer(self.is_online, dtype=numpy.int8)
+        columns["update_available"] = numpy.frombuffer(
+            self.update_available, dtype=numpy.int8
+        )
+        columns["wifi_signal"] = numpy.frombuffer(self.wifi_signal, dtype=numpy.int16)
+        return columns
+
+    def to_arrow(self):
+        """Return a ``pyarrow.Table``, ``type`` and ``version`` dictionary encoded, unknowns null."""
+        import pyarrow  # pylint: disable=import-outside-toplevel,import-error
+
+        def nullable(values, arrow_type, convert):
+            return pyarrow.array(
+                [None if value == UNKNOWN else convert(value) for value in values],
+                arrow_type,
+            )
+
+        columns = {"serial": pyarrow.array(self.serials, pyarrow.string())}
+        for name in CATEGORICAL:
+            categories = self._categories[name]
+            columns[name] = pyarrow.DictionaryArray.from_arrays(
+                pyarrow.array(categories.codes, pyarrow.uint16()),
+                pyarrow.array(categories.values, pyarrow.string()),
+            )
+        columns["is_online"] = nullable(self.is_online, pyarrow.bool_(), bool)
+        columns["update_available"] = nullable(
+            self.update_available, pyarrow.bool_(), bool
+        )
+        columns["wifi_signal"] = nullable(self.wifi_signal, pyarrow.int16(), int)
+        return pyarrow.table(columns)
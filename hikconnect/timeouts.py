@@ -0,0 +1,133 @@
+"""Per-endpoint request timeouts, per-call overrides and deadlines of whole operations.
+
+Example::
+
+    api = HikConnect(
+        timeouts={
+            "*": ClientTimeout(total=30, sock_connect=5, sock_read=10),
+            "devices/pagelist": ClientTimeout(total=60, sock_connect=5, sock_read=30),
+            "call/unlock": 5,  # seconds, total
+        }
+    )
+    with request_timeout(2):
+        await api.get_call_status(serial)
+    with deadline(10):  # both requests of the update, together
+        await api.update_area(serial, group_id, "Garden", camera_ids)
+
+An ``aiohttp.ClientTimeout`` limits connecting (``sock_connect``), waiting
+for the response (``sock_read``: the first byte, then between reads) and the
+whole request (``total``). Endpoints without a timeout of their own use the
+``"*"`` one, or the session's default.
+
+Within ``deadline()`` (and tasks started within it) every request's total
+timeout is cut to the time left, and requests are no longer sent once it's
+over, failing with ``DeadlineExceeded``.
+"""
+
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+
+from aiohttp import ClientTimeout
+
+from hikconnect.exceptions import DeadlineExceeded
+
+# timeout of requests sent by the current task, see request_timeout()
+_request_timeout: contextvars.ContextVar[ClientTimeout | None] = contextvars.ContextVar(
+    "request_timeout", default=None
+)
+# time.monotonic() the current operation has to finish by, see deadline()
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "deadline", default=None
+)
+
+
+def as_client_timeout(timeout) -> ClientTimeout:
+    """Return ``timeout`` as ``ClientTimeout``, a number is the total seconds."""
+    if isinstance(timeout, ClientTimeout):
+        return timeout
+    return ClientTimeout(total=timeout)
+
+
+@contextmanager
+def request_timeout(timeout):
+    """Use ``timeout`` (``ClientTimeout`` or total seconds) for requests sent within the block.
+
+    Overrides the ``HikConnect(timeouts=...)`` of all endpoints; an enclosing
+    ``deadline()`` still applies.
+    """
+    token = _request_timeout.set(as_client_timeout(timeout))
+    try:
+        yield
+    finally:
+        _request_timeout.reset(token)
+
+
+@contextmanager
+def deadline(seconds: float | None):
+    """Make requests sent within the block finish in ``seconds`` from now, altogether.
+
+    Nested deadlines can only shorten the enclosing one; ``None`` keeps it.
+    """
+    if seconds is None:
+        yield
+        return
+    until = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(until if current is None else min(until, current))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left() -> float | None:
+    """Return seconds left until the current ``deadline()``, ``None`` without one."""
+    until = _deadline.get()
+    return None if until is None else until - time.monotonic()
+
+
+async def acquire(lock, what: str):
+    """Acquire ``lock`` (or a semaphore) within the time left of the current ``deadline()``.
+
+    Raises:
+        DeadlineExceeded: The deadline is over before ``lock`` is acquired.
+    """
+    left = time_left()
+    if left is None:
+        await lock.acquire()
+        return
+    try:
+        async with asyncio.timeout(left):
+            await lock.acquire()
+    except TimeoutError:
+        raise DeadlineExceeded(f"Deadline exceeded waiting for {what}") from None
+
+
+def resolve_timeout(
+    timeouts: dict[str, ClientTimeout], endpoint: str, default: ClientTimeout
+) -> ClientTimeout | None:
+    """Return the timeout of a request to ``endpoint``, ``None`` for the session's ``default``.
+
+    Raises:
+        DeadlineExceeded: The current ``deadline()`` is over.
+    """
+    timeout = _request_timeout.get()
+    if timeout is None:
+        timeout = timeouts.get(endpoint, timeouts.get("*"))
+    left = time_left()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded before sending {endpoint}")
+    timeout = timeout or default
+    if timeout.total is not None and timeout.total <= left:
+        return timeout
+    return ClientTimeout(
+        total=left,
+        connect=timeout.connect,
+        sock_read=timeout.sock_read,
+        sock_connect=timeout.sock_connect,
+        ceil_threshold=timeout.ceil_threshold,
+    )
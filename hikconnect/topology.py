@@ -0,0 +1,226 @@
+import asyncio
+import logging
+
+from hikconnect.api import OPERATION_ERRORS
+
+log = logging.getLogger(__name__)
+
+
+class AreaTopology:
+    """In-memory index of areas (groups) and their member cameras across the fleet.
+
+    Build it once with ``build()``, then use the lookup methods - all of them
+    are dict lookups, no API calls. Mutate areas through ``create_area()``,
+    ``update_area()``, ``delete_area()`` and ``edit_area_members()`` of this
+    class to keep the index up to date without rebuilding it.
+    """
+
+    def __init__(self, api):
+        self.api = api
+        # (device_serial, group_id) -> area dict as yielded by HikConnect.get_areas()
+        self._areas = {}
+        # (device_serial, group_id) -> frozenset of member (camera) ids
+        self._members = {}
+        # device_serial -> {group_id: None}, a dict is used as an ordered set
+        self._device_areas = {}
+        # camera id -> {(device_serial, group_id): None}
+        self._camera_areas = {}
+
+    async def build(self, device_serials, *, concurrency: int = 10):
+        """Fetch areas and their members for all ``device_serials`` concurrently.
+
+        At most ``concurrency`` requests are in flight, see ``sync()``.
+
+        Returns:
+            dict of devices which couldn't be fetched, serial -> exception; they
+            are left out of the index.
+        """
+        changes = await self.sync(device_serials, concurrency=concurrency)
+        log.info(
+            "Built area topology of %d area(s) on %d device(s)",
+            len(self._areas),
+            len(self._device_areas),
+        )
+        return changes["failed"]
+
+    async def sync(self, device_serials, *, concurrency: int = 10):
+        """Incrementally refresh the index for ``device_serials``.
+
+        Area lists are fetched for all devices concurrently, but member lists
+        (``get_area()``) only for areas which are new or whose ``modify_time``
+        changed since the last sync. At most ``concurrency`` of these requests
+        are in flight.
+
+        A device which fails doesn't stop the others, its indexed areas are
+        kept as they were.
+
+        Returns:
+            dict with keys ``created``, ``modified`` and ``deleted``, each a
+            list of area dicts, and ``failed``, a dict of devices which
+            couldn't be synced, serial -> exception. Deleted areas are
+            reported as last indexed.
+        """
+        device_serials = list(device_serials)
+        changes: dict[str, list] = {"created": [], "modified": [], "deleted": []}
+        failed = {}
+        semaphore = asyncio.Semaphore(concurrency)
+        results = await asyncio.gather(
+            *(self._sync_device(serial, semaphore) for serial in device_serials),
+            return_exceptions=True,
+        )
+        for serial, device_changes in zip(device_serials, results):
+            if isinstance(device_changes, (*OPERATION_ERRORS, KeyError)):
+                log.warning("Failed to sync areas of %s: %r", serial, device_changes)
+                failed[serial] = device_changes
+                continue
+            if isinstance(device_changes, BaseException):
+                raise device_changes
+            for kind, areas in device_changes.items():
+                changes[kind].extend(areas)
+        log.info(
+            "Synced areas: %d created, %d modified, %d deleted, %d device(s) failed",
+            len(changes["created"]),
+            len(changes["modified"]),
+            len(changes["deleted"]),
+            len(failed),
+        )
+        return {**changes, "failed": failed}
+
+    async def _sync_device(self, device_serial, semaphore):
+        async def get_area(group_id):
+            async with semaphore:
+                return await self.api.get_area(device_serial, group_id)
+
+        async with semaphore:
+            areas = [area async for area in self.api.get_areas(device_serial)]
+        changed = []
+        for area in areas:
+            known = self._areas.get((device_serial, area["group_id"]))
+            if known is None or known["modify_time"] != area["modify_time"]:
+                changed.append(area)
+            else:
+                # refresh metadata such as ``mode``, members are unchanged
+                self._areas[(device_serial, area["group_id"])] = area
+        members = await asyncio.gather(
+            *(get_area(area["group_id"]) for area in changed)
+        )
+
+        current_ids = {area["group_id"] for area in areas}
+        deleted = [
+            self._areas[(device_serial, group_id)]
+            for group_id in self._device_areas.get(device_serial, ())
+            if group_id not in current_ids
+        ]
+        for area in deleted:
+            self._remove(device_serial, area["group_id"])
+
+        created: list[dict] = []
+        modified: list[dict] = []
+        self._device_areas.setdefault(device_serial, {})
+        for area, area_members in zip(changed, members):
+            key = (device_serial, area["group_id"])
+            (modified if key in self._areas else created).append(area)
+            self._remove(*key)
+            self._add(area, [m["member_id"] for m in area_members])
+        return {"created": created, "modified": modified, "deleted": deleted}
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get_area(self, device_serial, group_id):
+        """Return the area dict, or ``None`` if it is not indexed."""
+        return self._areas.get((device_serial, group_id))
+
+    def areas_for_device(self, device_serial):
+        """Return area dicts configured on a device."""
+        return [
+            self._areas[(device_serial, group_id)]
+            for group_id in self._device_areas.get(device_serial, ())
+        ]
+
+    def members(self, device_serial, group_id):
+        """Return a frozenset of member camera ids of an area."""
+        return self._members.get((device_serial, group_id), frozenset())
+
+    def areas_for_camera(self, camera_id):
+        """Return area dicts which contain the camera ``camera_id``."""
+        return [self._areas[key] for key in self._camera_areas.get(camera_id, ())]
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _add(self, area, member_ids):
+        key = (area["device_serial"], area["group_id"])
+        self._areas[key] = area
+        self._members[key] = frozenset(member_ids)
+        self._device_areas.setdefault(area["device_serial"], {})[
+            area["group_id"]
+        ] = None
+        for member_id in member_ids:
+            self._camera_areas.setdefault(member_id, {})[key] = None
+
+    def _remove(self, device_serial, group_id):
+        key = (device_serial, group_id)
+        self._areas.pop(key, None)
+        for member_id in self._members.pop(key, ()):
+            camera_areas = self._camera_areas[member_id]
+            del camera_areas[key]
+            if not camera_areas:
+                del self._camera_areas[member_id]
+        self._device_areas.get(device_serial, {}).pop(group_id, None)
+
+    # ------------------------------------------------------------------
+    # Mutations keeping the index in sync
+    # ------------------------------------------------------------------
+
+    async def create_area(
+        self, device_serial: str, group_name: str, resource_ids: list
+    ):
+        """Call ``HikConnect.create_area()`` and index the new area."""
+        area = await self.api.create_area(device_serial, group_name, resource_ids)
+        self._add(area, resource_ids)
+        return area
+
+    async def update_area(  # pylint: disable=too-many-arguments
+        self,
+        device_serial: str,
+        group_id: int,
+        group_name: str,
+        resource_ids: list,
+        *,
+        timeout: float | None = None,
+    ):
+        """Call ``HikConnect.update_area()`` and re-index the recreated area."""
+        area = await self.api.update_area(
+            device_serial, group_id, group_name, resource_ids, timeout=timeout
+        )
+        self._remove(device_serial, group_id)
+        self._add(area, resource_ids)
+        return area
+
+    async def delete_area(self, device_serial: str, group_id: int):
+        """Call ``HikConnect.delete_area()`` and drop the area from the index."""
+        await self.api.delete_area(device_serial, group_id)
+        self._remove(device_serial, group_id)
+
+    async def edit_area_members(self, device_serial: str, group_id: int, **kwargs):
+        """Call ``HikConnect.edit_area_members()`` and update the index accordingly.
+
+        If the area is indexed and ``group_name`` is not passed, the indexed
+        name is used, saving a ``get_areas()`` round-trip. The recreated area
+        is indexed as returned by the edit, ``modify_time`` included.
+        """
+        old_area = self.get_area(device_serial, group_id)
+        if old_area is not None:
+            kwargs.setdefault("group_name", old_area["group_name"])
+        result = await self.api.edit_area_members(device_serial, group_id, **kwargs)
+        if result["action"] == "unchanged":
+            return result
+        # the API follows areas recreated meanwhile, so the edited ID may differ
+        previous_group_id = result.get("previous_group_id", result["group_id"])
+        self._remove(device_serial, previous_group_id)
+        if result["action"] == "updated":
+            self._add(result["area"], result["member_ids"])
+        return result
@@ -0,0 +1,241 @@
+"""Recording and replaying ``HikConnect`` traffic.
+
+A transport sits between ``HikConnect`` and the network. It's called as
+``await transport(send, endpoint, method, url, **kwargs)`` and returns
+``(HTTP status, response body bytes)``; ``send`` (with the same arguments
+minus ``endpoint``) sends the request over the network.
+
+Example::
+
+    recorder = RecordingTransport()
+    async with HikConnect(transport=recorder) as api:
+        ...  # production traffic
+    recorder.save("trace.jsonl")  # tokens and credentials are redacted
+
+    trace = load_trace("trace.jsonl")
+    async with HikConnect(transport=ReplayTransport(trace, speed=10)) as api:
+        summary = await replay(api, trace, speed=10)
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from aiohttp import ClientError, ClientResponseError, RequestInfo
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from hikconnect.exceptions import TraceMismatch
+
+log = logging.getLogger(__name__)
+
+TRACE_VERSION = 1
+REDACTED = "REDACTED"
+
+# response / request fields holding session JWTs, replaced by JWTs with only "exp"
+TOKEN_KEYS = frozenset({"sessionId", "rfSessionId", "refreshSessionId"})
+# fields holding credentials or other secrets, replaced by REDACTED
+SECRET_KEYS = frozenset({"account", "password", "secretKey", "imageCode", "userCode"})
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+
+def _redact_jwt(token):
+    """Return a JWT keeping only the expiration of ``token``, which ``HikConnect`` parses."""
+    try:
+        claims_raw = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(claims_raw + "=" * 4))
+        exp = int(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError, AttributeError):
+        return REDACTED
+    return f"{_b64({'alg': 'none'})}.{_b64({'exp': exp})}.{REDACTED}"
+
+
+def redact(value):
+    """Return a copy of decoded JSON ``value`` with tokens and secrets redacted."""
+    if isinstance(value, dict):
+        redacted = {}
+        for key, item in value.items():
+            if key in TOKEN_KEYS and isinstance(item, str):
+                redacted[key] = _redact_jwt(item)
+            elif key in SECRET_KEYS and item is not None:
+                redacted[key] = REDACTED
+            else:
+                redacted[key] = redact(item)
+        return redacted
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def _relative_url(url):
+    """Return path and query of ``url``, the part identifying the request in a trace."""
+    parts = urlsplit(str(url))
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+
+class RecordingTransport:
+    """Pass requests to the network and record them, with timing, for replay.
+
+    ``entries`` holds one dict per request with keys ``t`` (request start,
+    seconds since the first request), ``endpoint``, ``method``, ``url``
+    (path and query), ``request`` (``{"json": body}`` / ``{"data": form}``),
+    ``status``, ``body``
+    (decoded JSON response), ``error`` (exception class name of a failed
+    request, ``"TimeoutError"`` for any timeout, else ``None``) and
+    ``elapsed`` (seconds). Tokens and secrets are
+    redacted when recorded.
+    """
+
+    def __init__(self):
+        self.entries: list[dict] = []
+        self._start = None
+
+    async def __call__(self, send, endpoint, method, url, **kwargs):
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+        body_kind = "json" if "json" in kwargs else "data" if "data" in kwargs else None
+        entry = {
+            "t": now - self._start,
+            "endpoint": endpoint,
+            "method": method,
+            "url": _relative_url(url),
+            # {"json": ...} or {"data": ...}, like the keyword argument of the request
+            "request": {body_kind: redact(kwargs[body_kind])} if body_kind else None,
+            "status": None,
+            "body": None,
+            "error": None,
+            "elapsed": None,
+        }
+        self.entries.append(entry)
+        try:
+            entry["status"], body = await send(method, url, **kwargs)
+        except ClientResponseError as e:
+            entry["status"] = e.status
+            raise
+        except (ClientError, asyncio.TimeoutError) as e:
+            # aiohttp's ServerTimeoutError is a ClientError too, keep it a timeout
+            timeout = isinstance(e, asyncio.TimeoutError)
+            entry["error"] = "TimeoutError" if timeout else type(e).__name__
+            raise
+        finally:
+            entry["elapsed"] = time.perf_counter() - now
+        try:
+            entry["body"] = redact(json.loads(body)) if body.strip() else None
+        except ValueError:
+            log.warning("Not recording non-JSON response of %s %s", method, url)
+        return entry["status"], body
+
+    def save(self, path):
+        """Write the trace to ``path`` as JSON lines, the first line is a header."""
+        with open(path, "w", encoding="utf-8") as f:
+            header = {"version": TRACE_VERSION, "requests": len(self.entries)}
+            f.write(json.dumps(header) + "\n")
+            for entry in self.entries:
+                f.write(json.dumps(entry) + "\n")
+
+
+def load_trace(path):
+    """Return entries of a trace saved by ``RecordingTransport.save()``."""
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != TRACE_VERSION:
+            raise ValueError(f"Unsupported trace version: {header.get('version')}")
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayTransport:  # pylint: disable=too-few-public-methods
+    """Answer requests with responses from a recorded trace, without any network.
+
+    Requests are matched to recorded ones by method and URL path and query (the
+    host is ignored, so the API domain may differ), in recorded order. When
+    the recorded responses for a request run out, the last one is repeated.
+
+    Args:
+        trace: Entries from ``load_trace()`` or ``RecordingTransport.entries``.
+        speed: Recorded response latencies are divided by ``speed``;
+               ``None`` answers immediately.
+
+    Raises ``TraceMismatch`` for requests which aren't in the trace at all.
+    """
+
+    def __init__(self, trace, speed: float | None = 1.0):
+        self.speed = speed
+        self._responses: dict[tuple[str, str], deque[dict]] = {}
+        for entry in trace:
+            key = (entry["method"], entry["url"])
+            self._responses.setdefault(key, deque()).append(entry)
+        self.served = 0
+        self.repeated = 0
+
+    async def __call__(self, send, endpoint, method, url, **kwargs):
+        responses = self._responses.get((method, _relative_url(url)))
+        if not responses:
+            raise TraceMismatch(
+                f"Request {method} {url} ('{endpoint}') isn't in the trace."
+            )
+        if len(responses) > 1:
+            entry = responses.popleft()
+        else:
+            entry = responses[0]
+            self.repeated += 1
+        self.served += 1
+
+        if self.speed and entry["elapsed"]:
+            await asyncio.sleep(entry["elapsed"] / self.speed)
+        if entry["error"] is not None:
+            if entry["error"] == "TimeoutError":
+                raise asyncio.TimeoutError()
+            raise ClientError(f"Replayed {entry['error']}")
+        if entry["status"] >= 400:
+            raise ClientResponseError(
+                RequestInfo(
+                    URL(url), method, CIMultiDictProxy(CIMultiDict()), URL(url)
+                ),
+                (),
+                status=entry["status"],
+                message="Replayed error response",
+            )
+        body = b"" if entry["body"] is None else json.dumps(entry["body"]).encode()
+        return entry["status"], body
+
+
+async def replay(api, trace, speed: float | None = 1.0):
+    """Re-issue requests of ``trace`` through ``api`` with their recorded timing.
+
+    Requests start at their recorded offsets divided by ``speed`` (``None``
+    starts them all at once), concurrently like they were recorded. ``api``
+    should use a ``ReplayTransport``, otherwise the requests go to the network.
+
+    Returns:
+        dict with ``requests``, ``errors`` (number of failed requests) and
+        ``elapsed`` (seconds).
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    async def issue(entry):
+        if speed:
+            await asyncio.sleep(max(start + entry["t"] / speed - loop.time(), 0))
+        await api._request(  # pylint: disable=protected-access
+            entry["method"],
+            entry["endpoint"],
+            f"{api.BASE_URL}{entry['url']}",
+            **(entry["request"] or {}),
+        )
+
+    results = await asyncio.gather(
+        *(issue(entry) for entry in trace), return_exceptions=True
+    )
+    return {
+        "requests": len(trace),
+        "errors": sum(isinstance(result, Exception) for result in results),
+        "elapsed": loop.time() - start,
+    }
@@ -0,0 +1,10 @@
+import pytest
+
+from hikconnect.api import HikConnect
+
+
+@pytest.fixture
+async def api():
+    api = HikConnect()
+    yield api
+    await api.close()
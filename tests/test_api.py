@@ -1,21 +1,17 @@
 # pylint: disable=too-many-lines
+import asyncio
+import time
 from typing import Any
 
 import pytest
 from aioresponses import aioresponses
 
 from hikconnect.api import HikConnect, LoginError
+from hikconnect.exceptions import DeviceOffline
 
 pytestmark = pytest.mark.asyncio
 
 
-@pytest.fixture
-async def api():
-    api = HikConnect()
-    yield api
-    await api.close()
-
-
 @pytest.fixture
 def valid_login_response():
     """Return anonymized login response with real structure and fields."""
@@ -311,6 +307,7 @@ async def test_get_devices(api, get_devices_response):
         assert devices[0]["name"] == "device with locks"
         assert devices[0]["type"] == "DS-KH6210-L"
         assert devices[0]["locks"] == {1: 1, 2: 1, 3: 2, 4: 0, 5: 1, 6: 1, 7: 1, 8: 1}
+        assert api.device_locks["D12345678"] == devices[0]["locks"]
         assert devices[0]["local_ip"] == "10.0.0.1"
         assert devices[0]["wan_ip"] == "81.81.81.81"
         assert devices[0]["is_online"] is True
@@ -424,6 +421,46 @@ async def test_get_devices_pagination(api):
     assert devices[1]["serial"] == "D66666666"
 
 
+async def test_get_devices_decoded_locks_are_not_shared(api):
+    """Devices with the same "lockNum" string get independent "locks" dicts."""
+    status_infos = {
+        serial: {"globalStatus": 1, "optionals": {"lockNum": '{"1":1,"2":2}'}}
+        for serial in ("D1", "D2")
+    }
+    response = _base_response(
+        devices=[_base_device("D1", "first"), _base_device("D2", "second")],
+        status_infos=status_infos,
+    )
+    with aioresponses() as mock:
+        mock.get(URL, payload=response)
+        first, second = [d async for d in api.get_devices()]
+    first["locks"][1] = 99
+    assert second["locks"] == {1: 1, 2: 2}
+
+
+async def test_get_call_status_results_are_not_shared(api):
+    payload = {
+        "meta": {"code": 200},
+        "data": '{"callStatus":2,"callerInfo":{"buildingNo":1,"floorNo":2,"unitNo":3}}',
+    }
+    with aioresponses() as mock:
+        mock.get(
+            "https://api.hik-connect.com/v3/devconfig/v1/call/D1/status",
+            payload=payload,
+        )
+        mock.get(
+            "https://api.hik-connect.com/v3/devconfig/v1/call/D1/status",
+            payload=payload,
+        )
+        first = await api.get_call_status("D1")
+        first["info"]["unit_number"] = 99
+        second = await api.get_call_status("D1")
+    assert second == {
+        "status": "ringing",
+        "info": {"building_number": 1, "floor_number": 2, "unit_number": 3},
+    }
+
+
 @pytest.fixture
 def get_cameras_response():
     return {
@@ -994,36 +1031,28 @@ class TestEditAreaMembers:
 
         assert result["action"] == "updated"
         assert result["group_id"] == 300000
+        assert result["area"]["group_id"] == 300000
         assert result["member_ids"] == [MEMBER_ID_1, MEMBER_ID_2]
         assert create_captured["json"]["resourceIds"] == [MEMBER_ID_1, MEMBER_ID_2]
         assert create_captured["json"]["groupName"] == "MyArea"
 
     async def test_add_duplicate_member_is_ignored(
-        self, api, _one_member_area_response, _list_areas_for_edit, ok_response
+        self, api, _one_member_area_response
     ):
-        """Adding an ID already present must not create duplicates."""
-        create_captured: dict[str, Any] = {}
-
-        def _create_cb(_url, **kwargs):
-            create_captured["json"] = kwargs.get("json") or kwargs.get("data")
-
+        """Adding an ID already present is a no-op, the area is not recreated."""
         with aioresponses() as mock:
             mock.get(
                 f"{BASE_URL}/v3/devices/group/{DEVICE_SERIAL}/{GROUP_ID}",
                 payload=_one_member_area_response,
             )
-            mock.get(
-                f"{BASE_URL}/v3/devices/group/{DEVICE_SERIAL}/list",
-                payload=_list_areas_for_edit,
-            )
-            self._mock_update(mock, ok_response, create_callback=_create_cb)
+            # no /list, DELETE or POST mocks: any such call would fail
             result = await api.edit_area_members(
                 DEVICE_SERIAL, GROUP_ID, add_ids=[MEMBER_ID_1]
             )
 
-        assert result["action"] == "updated"
+        assert result["action"] == "unchanged"
+        assert result["group_id"] == GROUP_ID
         assert result["member_ids"] == [MEMBER_ID_1]  # no duplicates
-        assert create_captured["json"]["resourceIds"] == [MEMBER_ID_1]
 
     # ------------------------------------------------------------------ #
     # remove members                                                       #
@@ -1153,3 +1182,271 @@ class TestEditAreaMembers:
         """ValueError if both add_ids and remove_ids are empty."""
         with pytest.raises(ValueError, match="add_ids.*remove_ids"):
             await api.edit_area_members(DEVICE_SERIAL, GROUP_ID)
+
+    # ------------------------------------------------------------------ #
+    # coalescing                                                           #
+    # ------------------------------------------------------------------ #
+
+    async def test_concurrent_edits_are_coalesced(
+        self, api, _one_member_area_response, ok_response
+    ):
+        """Concurrent edits of one area result in a single delete → recreate."""
+        create_calls: list[Any] = []
+
+        def _create_cb(_url, **kwargs):
+            create_calls.append(kwargs.get("json") or kwargs.get("data"))
+
+        with aioresponses() as mock:
+            mock.get(
+                f"{BASE_URL}/v3/devices/group/{DEVICE_SERIAL}/{GROUP_ID}",
+                payload=_one_member_area_response,
+            )
+            self._mock_update(mock, ok_response, create_callback=_create_cb)
+            results = await asyncio.gather(
+                api.edit_area_members(
+                    DEVICE_SERIAL, GROUP_ID, add_ids=[MEMBER_ID_2], group_name="MyArea"
+                ),
+                api.edit_area_members(DEVICE_SERIAL, GROUP_ID, add_ids=[MEMBER_ID_3]),
+                api.edit_area_members(
+                    DEVICE_SERIAL, GROUP_ID, remove_ids=[MEMBER_ID_1]
+                ),
+            )
+
+        assert len(create_calls) == 1
+        assert create_calls[0]["resourceIds"] == [MEMBER_ID_2, MEMBER_ID_3]
+        for result in results:
+            assert result.pop("area")["group_id"] == 300000
+            assert result == {
+                "action": "updated",
+                "group_id": 300000,
+                "previous_group_id": GROUP_ID,
+                "member_ids": [MEMBER_ID_2, MEMBER_ID_3],
+            }
+
+    async def test_later_edit_follows_recreated_area(
+        self, api, _one_member_area_response, ok_response
+    ):
+        """An edit using the old group_id is applied to the recreated area."""
+        with aioresponses() as mock:
+            mock.get(
+                f"{BASE_URL}/v3/devices/group/{DEVICE_SERIAL}/{GROUP_ID}",
+                payload=_one_member_area_response,
+            )
+            self._mock_update(mock, ok_response)
+            await api.edit_area_members(
+                DEVICE_SERIAL, GROUP_ID, add_ids=[MEMBER_ID_2], group_name="MyArea"
+            )
+            assert api.resolve_area_group_id(DEVICE_SERIAL, GROUP_ID) == 300000
+
+            mock.get(
+                f"{BASE_URL}/v3/devices/group/{DEVICE_SERIAL}/300000",
+                payload={
+                    "meta": {"code": 200},
+                    "list": [
+                        {
+                            "groupId": 300000,
+                            "groupDevSerial": DEVICE_SERIAL,
+                            "memberId": MEMBER_ID_1,
+                        },
+                    ],
+                },
+            )
+            mock.delete(
+                f"{BASE_URL}/v3/devices/group/{DEVICE_SERIAL}/300000",
+                payload=ok_response,
+            )
+            result = await api.edit_area_members(
+                DEVICE_SERIAL, GROUP_ID, remove_ids=[MEMBER_ID_1]
+            )
+
+        assert result == {"action": "deleted", "group_id": 300000}
+
+
+class TestBulkDefenceMode:
+    async def test_set_areas_defence_mode_reports_per_target(
+        self, api, list_areas_response, ok_response
+    ):
+        switched: list[Any] = []
+
+        def _switch_cb(url, **kwargs):
+            switched.append((url.path.split("/")[4], kwargs["json"]["groupId"]))
+
+        with aioresponses() as mock:
+            mock.get(
+                f"{BASE_URL}/v3/devices/group/{DEVICE_SERIAL}/list",
+                payload=list_areas_response,
+            )
+            mock.post(
+                f"{BASE_URL}/v3/devices/group/{DEVICE_SERIAL}/switchDefenceMode",
+                payload=ok_response,
+                callback=_switch_cb,
+            )
+            # offline device: listing fails, switching reports 70002
+            mock.get(f"{BASE_URL}/v3/devices/group/OFFLINE1/list", status=500)
+            mock.post(
+                f"{BASE_URL}/v3/devices/group/OFFLINE1/switchDefenceMode",
+                payload={"meta": {"code": 70002}},
+                callback=_switch_cb,
+            )
+            mock.get(
+                f"{BASE_URL}/v3/devices/group/BROKEN1/list",
+                payload={"meta": {"code": 200}, "list": []},
+            )
+            mock.post(
+                f"{BASE_URL}/v3/devices/group/BROKEN1/switchDefenceMode",
+                payload={"meta": {"code": 500}},
+                callback=_switch_cb,
+            )
+            results = await api.set_areas_defence_mode(
+                [
+                    (DEVICE_SERIAL, 110548, 1),  # already armed
+                    (DEVICE_SERIAL, GROUP_ID, 1),
+                    ("OFFLINE1", 5, 0),
+                    ("BROKEN1", 6, 1),
+                ],
+                concurrency=2,
+            )
+
+        assert [r["result"] for r in results] == ["skipped", "set", "offline", "failed"]
+        assert results[1] == {
+            "device_serial": DEVICE_SERIAL,
+            "group_id": GROUP_ID,
+            "mode": 1,
+            "result": "set",
+            "error": None,
+        }
+        assert isinstance(results[2]["error"], DeviceOffline)
+        assert isinstance(results[3]["error"], ValueError)
+        assert sorted(switched) == [
+            ("BROKEN1", 6),
+            (DEVICE_SERIAL, GROUP_ID),
+            ("OFFLINE1", 5),
+        ]
+
+    async def test_set_areas_defence_mode_listing_timeout(self, api, ok_response):
+        with aioresponses() as mock:
+            mock.get(
+                f"{BASE_URL}/v3/devices/group/{DEVICE_SERIAL}/list",
+                exception=asyncio.TimeoutError(),
+            )
+            mock.post(
+                f"{BASE_URL}/v3/devices/group/{DEVICE_SERIAL}/switchDefenceMode",
+                exception=asyncio.TimeoutError(),
+            )
+            mock.get(
+                f"{BASE_URL}/v3/devices/group/OTHER1/list",
+                payload={"meta": {"code": 200}, "list": []},
+            )
+            mock.post(
+                f"{BASE_URL}/v3/devices/group/OTHER1/switchDefenceMode",
+                payload=ok_response,
+            )
+            results = await api.set_areas_defence_mode(
+                [(DEVICE_SERIAL, GROUP_ID, 1), ("OTHER1", 5, 1)]
+            )
+
+        assert [r["result"] for r in results] == ["failed", "set"]
+        assert isinstance(results[0]["error"], asyncio.TimeoutError)
+
+    async def test_set_areas_defence_mode_without_skipping(self, api, ok_response):
+        with aioresponses() as mock:
+            mock.post(
+                f"{BASE_URL}/v3/devices/group/{DEVICE_SERIAL}/switchDefenceMode",
+                payload=ok_response,
+                repeat=True,
+            )
+            results = await api.set_areas_defence_mode(
+                [(DEVICE_SERIAL, 1, 0), (DEVICE_SERIAL, 2, 0)], skip_unchanged=False
+            )
+
+        assert [r["result"] for r in results] == ["set", "set"]
+
+
+class TestDoorCommands:
+    UNLOCK_URL = f"{BASE_URL}/v3/devconfig/v1/call/{{}}/{{}}/remote/unlock?srcId=1&lockId={{}}&userType=0"
+
+    async def test_unlock_fan_out_validates_against_locks(self, api, ok_response):
+        api.device_locks["D1"] = {1: 2, 2: 0}
+        with aioresponses() as mock:
+            mock.put(self.UNLOCK_URL.format("D1", 1, 1), payload=ok_response)
+            mock.put(self.UNLOCK_URL.format("D2", 1, 0), status=500)
+            # D3 is unknown to get_devices(), so it's sent without validation
+            mock.put(self.UNLOCK_URL.format("D3", 5, 0), payload=ok_response)
+            results = await api.send_door_commands(
+                "unlock",
+                [("D1", 1, 1), ("D1", 1, 2), ("D1", 2, 0), ("D2", 1, 0), ("D3", 5, 0)],
+            )
+
+        assert [r["result"] for r in results] == [
+            "sent",
+            "invalid",
+            "invalid",
+            "failed",
+            "sent",
+        ]
+        assert results[0]["target"] == ("D1", 1, 1)
+        assert results[0]["latency"] >= 0
+        assert results[1]["latency"] is None
+        assert isinstance(results[1]["error"], ValueError)
+
+    async def test_call_command_fan_out(self, api, ok_response):
+        with aioresponses() as mock:
+            for serial in ("D1", "D2"):
+                mock.put(
+                    f"{BASE_URL}/v3/devconfig/v1/call/{serial}/operation?cmdId=3",
+                    payload=ok_response,
+                )
+            results = await api.send_door_commands("cancel_call", ["D1", ("D2",)])
+
+        assert [(r["target"], r["result"]) for r in results] == [
+            (("D1",), "sent"),
+            (("D2",), "sent"),
+        ]
+
+    async def test_door_commands_do_not_queue_behind_other_requests(self, ok_response):
+        async def _slow(*_args, **_kwargs):
+            await asyncio.sleep(0.2)
+
+        # a pool of 100 connections, all but one reserved for door commands
+        async with HikConnect(reserved_connections=99) as api:
+            with aioresponses() as mock:
+                mock.get(
+                    f"{BASE_URL}/v3/devconfig/v1/call/D1/status",
+                    payload={"meta": {"code": 200}, "data": '{"callStatus": 1}'},
+                    callback=_slow,
+                    repeat=True,
+                )
+                mock.put(self.UNLOCK_URL.format("D1", 1, 0), payload=ok_response)
+                statuses = [
+                    asyncio.create_task(api.get_call_status("D1")) for _ in range(3)
+                ]
+                await asyncio.sleep(0)
+                [result] = await api.send_door_commands("unlock", [("D1", 1, 0)])
+                # the status requests queue for the one regular connection
+                start = time.perf_counter()
+                await asyncio.gather(*statuses)
+                queued = time.perf_counter() - start
+
+        assert result["result"] == "sent"
+        assert result["latency"] < 0.1
+        assert queued >= 0.5
+
+    async def test_target_of_wrong_arity_is_invalid(self, api, ok_response):
+        with aioresponses() as mock:
+            mock.put(self.UNLOCK_URL.format("D1", 1, 0), payload=ok_response)
+            results = await api.send_door_commands("unlock", [("D1",), ("D1", 1)])
+
+        assert [r["result"] for r in results] == ["invalid", "sent"]
+        assert "missing a required argument" in str(results[0]["error"])
+
+    async def test_programming_error_is_raised(self, api, monkeypatch):
+        async def broken(_device_serial):
+            raise AttributeError("oops")
+
+        monkeypatch.setattr(api, "cancel_call", broken)
+        with pytest.raises(AttributeError, match="oops"):
+            await api.send_door_commands("cancel_call", ["D1"])
+
+    async def test_unknown_command(self, api):
+        with pytest.raises(ValueError, match="Unknown door command"):
+            await api.send_door_commands("open_sesame", ["D1"])
@@ -0,0 +1,111 @@
+import asyncio
+import functools
+
+import pytest
+from aioresponses import aioresponses
+
+from hikconnect.batch import BatchExecutor, raise_for_errors
+from hikconnect.exceptions import BatchError, DeviceOffline, HikConnectError
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _sleep_and_return(delay, value):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def _raise(exc):
+    raise exc
+
+
+async def _generate(*values):
+    for value in values:
+        yield value
+
+
+async def test_run_keeps_order_and_typed_errors():
+    progress = []
+    executor = BatchExecutor(
+        concurrency=2, on_progress=lambda *args: progress.append(args[:2])
+    )
+    results = await executor.run(
+        [
+            functools.partial(_sleep_and_return, 0.02, "slow"),
+            functools.partial(_raise, DeviceOffline()),
+            functools.partial(_generate, 1, 2),
+            functools.partial(_sleep_and_return, 0, "fast"),
+        ]
+    )
+
+    assert [r.position for r in results] == [0, 1, 2, 3]
+    assert [r.value for r in results] == ["slow", None, [1, 2], "fast"]
+    assert [r.ok for r in results] == [True, False, True, True]
+    assert isinstance(results[1].error, DeviceOffline)
+    assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+
+async def test_concurrency_limit_and_timeout():
+    running = peak = 0
+
+    async def tracked():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    results = await BatchExecutor(concurrency=3).run([tracked] * 10)
+    assert peak == 3
+    assert all(r.ok for r in results)
+
+    results = await BatchExecutor(timeout=0.01).run(
+        [functools.partial(_sleep_and_return, 1, "too late")]
+    )
+    assert isinstance(results[0].error, asyncio.TimeoutError)
+
+
+async def test_as_completed_yields_in_completion_order():
+    executor = BatchExecutor(concurrency=None)
+    values = [
+        result.value
+        async for result in executor.as_completed(
+            [
+                functools.partial(_sleep_and_return, 0.02, "slow"),
+                functools.partial(_sleep_and_return, 0, "fast"),
+            ]
+        )
+    ]
+    assert values == ["fast", "slow"]
+
+
+async def test_raise_for_errors_groups_typed_exceptions():
+    results = await BatchExecutor().run(
+        [
+            functools.partial(_raise, DeviceOffline()),
+            functools.partial(_raise, ValueError("bad")),
+            functools.partial(_sleep_and_return, 0, "ok"),
+        ]
+    )
+    with pytest.raises(BatchError) as exc_info:
+        raise_for_errors(results)
+    assert isinstance(exc_info.value, HikConnectError)
+    assert str(exc_info.value) == "Batch operation(s) failed: 2 of 3 (2 sub-exceptions)"
+    offline, rest = exc_info.value.split(DeviceOffline)
+    assert offline is not None and rest is not None
+    assert [type(e) for e in rest.exceptions] == [ValueError]
+
+    raise_for_errors(results[2:])  # no errors, no exception
+
+
+async def test_api_batch_collects_async_generators(api):
+    url = "https://api.hik-connect.com/v3/devices/group/{}/list"
+    with aioresponses() as mock:
+        mock.get(url.format("N1"), payload={"list": []})
+        mock.get(url.format("N2"), status=500)
+        results = await api.batch(concurrency=5).run(
+            [functools.partial(api.get_areas, serial) for serial in ("N1", "N2")]
+        )
+
+    assert results[0].value == []
+    assert results[1].error.status == 500
@@ -0,0 +1,60 @@
+import pytest
+
+from benchmarks import parsing
+from benchmarks.fleet import SIZES, WORSE, percentile, run_benchmarks
+from benchmarks.report import compare
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) is None
+
+
+async def test_compare_reports_regressions():
+    baseline = {
+        "results": {
+            "a[1]": {"throughput": 100, "p95": 0.010},
+            "b[1]": {"throughput": 100, "p95": 0.010},
+        }
+    }
+    results = {
+        "results": {
+            "a[1]": {"throughput": 90, "p95": 0.011},  # within tolerance
+            "b[1]": {"throughput": 50, "p95": 0.020},
+            "c[1]": {"throughput": 1, "p95": 1},  # not in the baseline
+        }
+    }
+
+    assert [regression[:2] for regression in compare(results, baseline, WORSE)] == [
+        ("b[1]", "throughput"),
+        ("b[1]", "p95"),
+    ]
+
+
+async def test_all_scenarios_run():
+    results = await run_benchmarks(scale=0.01, repeat=1, min_time=0)
+
+    assert len(results["results"]) == sum(map(len, SIZES.values()))
+    for result in results["results"].values():
+        assert result["requests"] > 0
+        assert result["throughput"] > 0
+        assert result["p50"] <= result["p95"] <= result["p99"]
+
+
+async def test_parsing_benchmarks_run():
+    results = parsing.run_benchmarks(size=100, repeat=1)
+
+    assert set(results["results"]) == {
+        "parse_device[100]",
+        "parse_locks[100]",
+        "clean_ip[100]",
+        "parse_call_status[100]",
+    }
+    for result in results["results"].values():
+        assert result["cpu_ns_per_call"] > 0
+        assert result["peak_bytes"] > 0
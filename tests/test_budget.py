@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from aioresponses import aioresponses
+
+from hikconnect.api import HikConnect
+from hikconnect.budget import CallBudget, caller_tag, current_caller_tag
+from hikconnect.exceptions import BudgetExceeded
+
+pytestmark = pytest.mark.asyncio
+
+BASE_URL = "https://api.hik-connect.com"
+STATUS_URL = f"{BASE_URL}/v3/devconfig/v1/call/D1/status"
+STATUS_PAYLOAD = {"meta": {"code": 200}, "data": '{"callStatus": 1}'}
+
+
+@pytest.fixture
+async def budget():
+    return CallBudget(limits={"automation": (2, 60)})
+
+
+@pytest.fixture
+async def api(budget):
+    api = HikConnect(budget=budget)
+    yield api
+    await api.close()
+
+
+async def test_usage_is_accounted_per_tag_and_endpoint(api, budget):
+    with aioresponses() as mock:
+        mock.get(STATUS_URL, payload=STATUS_PAYLOAD, repeat=True)
+        await api.get_call_status("D1")
+        with caller_tag("notifications"):
+            # tasks inherit the tag of the code starting them
+            await asyncio.gather(api.get_call_status("D1"), api.get_call_status("D1"))
+
+    usage = budget.usage()
+    assert set(usage) == {"untagged", "notifications"}
+    notifications = usage["notifications"]["call/status"]
+    assert notifications["requests"] == 2
+    assert notifications["bytes"] == 2 * usage["untagged"]["call/status"]["bytes"] > 0
+    assert notifications["time"] >= 0
+    assert usage["notifications"]["*"]["requests"] == 2
+    assert current_caller_tag() == "untagged"
+
+
+async def test_limit_rejects_calls_locally(api, budget):
+    with aioresponses() as mock:
+        mock.get(STATUS_URL, payload=STATUS_PAYLOAD, repeat=True)
+        with caller_tag("automation"):
+            await api.get_call_status("D1")
+            await api.get_call_status("D1")
+            assert budget.remaining("automation") == 0
+            with pytest.raises(BudgetExceeded, match="automation"):
+                await api.get_call_status("D1")
+        # other callers aren't affected
+        await api.get_call_status("D1")
+        sent = sum(len(calls) for calls in (mock.requests or {}).values())
+
+    assert sent == 3
+    assert budget.usage()["automation"]["*"] == {
+        "requests": 2,
+        "bytes": budget.usage()["automation"]["call/status"]["bytes"],
+        "time": budget.usage()["automation"]["call/status"]["time"],
+        "rejected": 1,
+    }
+    assert budget.remaining("untagged") is None
+
+
+async def test_limit_window_slides(budget, monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("hikconnect.budget.time.monotonic", lambda: now)
+    with caller_tag("automation"):
+        budget.acquire("call/status")
+        now += 30
+        budget.acquire("call/status")
+        with pytest.raises(BudgetExceeded):
+            budget.acquire("call/status")
+        now += 31  # the first call is out of the window
+        assert budget.remaining("automation") == 1
+        budget.acquire("call/status")
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from hikconnect.coordinator import RefreshCoordinator, RefreshSnapshot
+from hikconnect.simulator import ApiSimulator
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def simulator(api):
+    async with ApiSimulator(devices=6, offline_ratio=0.0) as simulator:
+        api.BASE_URL = simulator.base_url
+        await api.login("user", "password")
+        simulator.request_counts.clear()
+        yield simulator
+
+
+async def test_first_cycle_fetches_everything(api, simulator):
+    simulator.set_online("Q00000005", False)
+    snapshots: list[RefreshSnapshot] = []
+    coordinator = RefreshCoordinator(api)
+    coordinator.add_listener(snapshots.append)
+
+    snapshot = await coordinator.refresh()
+
+    assert snapshots == [snapshot]
+    assert snapshot.cycle == 1
+    assert snapshot.refreshed == {"devices", "cameras", "areas", "call_status"}
+    assert set(snapshot.timings) == snapshot.refreshed | {"total"}
+    assert len(snapshot.devices) == 6
+    assert (
+        sorted(snapshot.cameras)
+        == sorted(snapshot.areas)
+        == [f"Q0000000{i}" for i in range(5)]
+    )
+    # door stations (devices with locks) only
+    assert sorted(snapshot.call_status) == [
+        "Q00000000",
+        "Q00000001",
+        "Q00000003",
+        "Q00000004",
+    ]
+    assert simulator.request_counts == {
+        "devices/pagelist": 1,
+        "cameras/info": 5,
+        "group/list": 5,
+        "call/status": 4,
+    }
+    with pytest.raises(TypeError):
+        snapshot.devices["Q00000000"] = {}  # type: ignore[index]
+
+
+async def test_dependents_only_for_changed_online_devices(api, simulator):
+    coordinator = RefreshCoordinator(api, intervals={"call_status": None})
+    first = await coordinator.refresh()
+    simulator.request_counts.clear()
+
+    simulator.devices["Q00000002"].version = "V9.9.9 build 991231"
+    simulator.devices["Q00000003"].wifi_signal = 1  # not a change worth re-fetching
+    simulator.set_online("Q00000004", False)
+    snapshot = await coordinator.refresh(["devices"])
+
+    assert simulator.request_counts == {
+        "devices/pagelist": 1,
+        "cameras/info": 1,
+        "group/list": 1,
+    }
+    assert snapshot.refreshed == {"devices", "cameras", "areas"}
+    assert snapshot.cameras == first.cameras  # offline device keeps its data
+    assert (
+        first.devices["Q00000002"]["version"]
+        != snapshot.devices["Q00000002"]["version"]
+    )
+
+
+async def test_intervals_and_errors(api, simulator):
+    coordinator = RefreshCoordinator(
+        api, intervals={"devices": 100, "cameras": 100, "areas": 100, "call_status": 0}
+    )
+    await coordinator.refresh()
+    assert coordinator.due() == ["call_status"]
+    simulator.request_counts.clear()
+    simulator.faults = {"call/status": {"5xx": 1.0}}
+
+    snapshot = await coordinator.refresh()
+
+    assert simulator.request_counts == {"call/status": 4}
+    assert snapshot.refreshed == {"call_status"}
+    assert {kind for kind, _ in snapshot.errors} == {"call_status"}
+    assert len(snapshot.call_status) == 4  # previous data kept
+
+
+async def test_background_refresh(api, simulator):
+    coordinator = RefreshCoordinator(api, intervals={"call_status": 0.01})
+    refreshed = asyncio.Event()
+
+    async def listener(snapshot):  # a coroutine listener holds up the cycle
+        await asyncio.sleep(0)
+        if snapshot.cycle >= 3:
+            refreshed.set()
+
+    coordinator.add_listener(listener)
+    coordinator.start()
+    await asyncio.wait_for(refreshed.wait(), 5)
+    await coordinator.stop()
+
+    assert not coordinator.running
+    assert coordinator.snapshot is not None
+    assert coordinator.snapshot.refreshed == {"call_status"}
+    assert simulator.request_counts["devices/pagelist"] == 1
+
+
+async def test_required_kinds(api, simulator):
+    coordinator = RefreshCoordinator(api, kinds=())
+    assert coordinator.wanted() == ["devices"]
+    release = coordinator.require(["devices", "areas"])
+    assert coordinator.wanted() == ["devices", "areas"]
+    with pytest.raises(ValueError):
+        coordinator.require(["doors"])
+
+    snapshot = await coordinator.refresh()
+    assert snapshot.refreshed == {"devices", "areas"}
+    assert "cameras/info" not in simulator.request_counts
+
+    coordinator.start()
+    release()  # nothing required anymore, stops
+    await asyncio.sleep(0.01)
+    assert not coordinator.running
@@ -0,0 +1,54 @@
+import pytest
+from aioresponses import aioresponses
+
+from hikconnect.api import HikConnect
+from hikconnect.devices import CORE_KEYS, EXTRA_SECTIONS, LazyDevice
+from hikconnect.payloads import generate_fleet, pagelist_payload
+
+pytestmark = pytest.mark.asyncio
+
+URL = "https://api.hik-connect.com/v3/userdevices/v1/devices/pagelist?groupId=-1&limit=50&offset=0&filter=TIME_PLAN,CONNECTION,SWITCH,STATUS,STATUS_EXT,WIFI,NODISTURB,P2P,KMS,HIDDNS"
+
+
+async def test_get_devices_lazy(api):
+    page = pagelist_payload(generate_fleet(3))
+    with aioresponses() as mock:
+        mock.get(URL, payload=page)
+        mock.get(URL, payload=page)
+        eager = [device async for device in api.get_devices()]
+        eager_locks = dict(api.device_locks)
+        api.device_locks.clear()
+        lazy = [device async for device in api.get_devices(lazy=True)]
+
+    assert all(isinstance(device, LazyDevice) for device in lazy)
+    assert api.device_locks == eager_locks
+    assert [{key: device[key] for key in CORE_KEYS} for device in lazy] == eager
+    assert lazy[0]["no_disturb"] == {"alarm_enable": 0, "calling_enable": 0}
+    assert lazy[0]["p2p"] == [{"ip": eager[0]["wan_ip"], "port": 6000}]
+    assert lazy[0]["hiddns"]["hiddns_http_port"] == 0
+    assert lazy[0]["switch"] is None  # no entry in the page
+
+
+async def test_lazy_device_parses_on_read():
+    page = pagelist_payload(generate_fleet(2))
+    calls = []
+
+    def parse(device, res_json):
+        calls.append(device["deviceSerial"])
+        return HikConnect._parse_device(  # pylint: disable=protected-access
+            device, res_json
+        )
+
+    device = LazyDevice(page["deviceInfos"][1], page, parse)
+    assert device["serial"] == "Q00000001"
+    assert list(device) == [*CORE_KEYS, *EXTRA_SECTIONS]
+    assert len(device) == len(CORE_KEYS) + len(EXTRA_SECTIONS)
+    assert device["kms"]["version"] == "101"
+    assert not calls
+
+    assert device["locks"] == {1: 1, 2: 1, 3: 2, 4: 0}
+    assert device["is_online"] is True
+    assert calls == ["Q00000001"]
+
+    with pytest.raises(KeyError):
+        device["nonexistent"]  # pylint: disable=pointless-statement
@@ -0,0 +1,187 @@
+import asyncio
+from types import MappingProxyType
+
+import pytest
+
+from hikconnect.coordinator import RefreshSnapshot
+from hikconnect.events import (
+    AREA_MODE,
+    BLOCK,
+    CALL_STATUS,
+    COALESCE,
+    ONLINE,
+    Event,
+    EventBus,
+)
+from hikconnect.simulator import ApiSimulator
+
+pytestmark = pytest.mark.asyncio
+
+
+def _event(serial, old, new, kind=CALL_STATUS):
+    return Event(kind, serial, old, new, 0.0)
+
+
+async def test_drop_oldest_and_kinds():
+    bus = EventBus()
+    subscription = bus.subscribe([CALL_STATUS], maxsize=2)
+    for new in ("ringing", "idle", "ringing"):
+        await bus.publish(_event("D1", None, new))
+    await bus.publish(_event("D1", True, False, kind=ONLINE))
+
+    assert subscription.dropped == 1
+    assert [(await subscription.get()).new for _ in range(2)] == ["idle", "ringing"]
+    assert subscription.qsize() == 0
+
+
+async def test_coalesce_by_key():
+    bus = EventBus()
+    subscription = bus.subscribe(maxsize=10, overflow=COALESCE)
+    await bus.publish(_event("D1", "idle", "ringing"))
+    await bus.publish(_event("D2", "idle", "ringing"))
+    await bus.publish(_event("D1", "ringing", "call in progress"))
+    subscription.close()
+
+    events = [event async for event in subscription]
+    assert [(e.device_serial, e.old, e.new) for e in events] == [
+        ("D1", "idle", "call in progress"),
+        ("D2", "idle", "ringing"),
+    ]
+    assert subscription.coalesced == 1
+    assert not bus.subscriptions
+
+
+async def test_block_waits_only_for_blocking_subscriber():
+    bus = EventBus()
+    blocking = bus.subscribe(maxsize=1, overflow=BLOCK)
+    other = bus.subscribe(maxsize=1)
+    await bus.publish(_event("D1", None, "ringing"))
+
+    publish = asyncio.create_task(bus.publish(_event("D1", None, "idle")))
+    await asyncio.sleep(0.01)
+    assert not publish.done()
+    assert (await other.get()).new == "idle"  # already delivered to the others
+
+    assert (await blocking.get()).new == "ringing"
+    await asyncio.wait_for(publish, 1)
+    assert (await blocking.get()).new == "idle"
+    assert blocking.dropped == 0
+
+
+async def test_invalid_policy():
+    with pytest.raises(ValueError):
+        EventBus().subscribe(overflow="explode")
+
+
+async def test_poller_fans_out_changes(api):
+    async with ApiSimulator(devices=3) as simulator:
+        api.BASE_URL = simulator.base_url
+        await api.login("user", "password")
+        first, second = api.events.subscribe(), api.events.subscribe([AREA_MODE])
+        area = await api.create_area("Q00000001", "Hall", ["cam1"])
+        poller = api.poller
+
+        assert not await poller.poll()  # baseline, no events
+        assert simulator.request_counts["call/status"] == 2  # door stations only
+
+        simulator.set_call_status("Q00000000", 2, {"unitNo": 7})
+        simulator.set_online("Q00000002", False)
+        await api.arm_area("Q00000001", area["group_id"])
+        assert await poller.poll() == poller.last_events
+        first.close()
+        second.close()
+
+    events = [event async for event in first]
+    assert [(e.kind, e.device_serial, e.old, e.new) for e in events] == [
+        (ONLINE, "Q00000002", True, False),
+        (CALL_STATUS, "Q00000000", "idle", "ringing"),
+        (AREA_MODE, "Q00000001", 0, 1),
+    ]
+    assert events[1].data["unit_number"] == 7
+    assert [event async for event in second] == events[2:]
+
+
+async def test_subscribers_share_coordinator_cycles(api):
+    async with ApiSimulator(devices=2) as simulator:
+        api.BASE_URL = simulator.base_url
+        await api.login("user", "password")
+        api.coordinator.intervals.update(call_status=0.01, areas=None)
+        snapshots: list = []
+        api.coordinator.add_listener(snapshots.append)
+
+        subscriptions = [api.subscribe([CALL_STATUS]) for _ in range(3)]
+        assert api.coordinator.running
+        while simulator.request_counts.get("call/status", 0) < 2:
+            await asyncio.sleep(0.01)
+        simulator.set_call_status("Q00000001", 2)
+        events = await asyncio.wait_for(
+            asyncio.gather(*(s.get() for s in subscriptions)), 5
+        )
+        await api.close()
+
+    assert {(e.device_serial, e.new) for e in events} == {("Q00000001", "ringing")}
+    assert not api.coordinator.running
+    # one loop: every call status request belongs to a snapshot of the listener
+    door_stations = len(snapshots[0].call_status)
+    assert simulator.request_counts["call/status"] <= door_stations * len(snapshots)
+    assert simulator.request_counts["devices/pagelist"] == 1
+
+
+async def test_poller_refreshes_only_subscribed_kinds(api):
+    async with ApiSimulator(devices=2) as simulator:
+        api.BASE_URL = simulator.base_url
+        await api.login("user", "password")
+        api.coordinator.intervals.update(call_status=0.01, areas=0.01)
+
+        subscription = api.subscribe([CALL_STATUS])
+        assert api.poller.required == {"call_status"}
+        while simulator.request_counts.get("call/status", 0) < 4:
+            await asyncio.sleep(0.01)
+        assert "group/list" not in simulator.request_counts
+
+        subscription.close()  # the last subscriber leaves
+        await asyncio.sleep(0.05)
+        assert not api.coordinator.running
+        requests = dict(simulator.request_counts)
+        await asyncio.sleep(0.05)
+        assert simulator.request_counts == requests
+
+
+def _snapshot(devices=(), call_status=None, areas=None):
+    return RefreshSnapshot(
+        cycle=0,
+        time=0.0,
+        devices=MappingProxyType(
+            {serial: {"serial": serial, "is_online": True} for serial in devices}
+        ),
+        cameras=MappingProxyType({}),
+        areas=MappingProxyType(areas or {}),
+        call_status=MappingProxyType(
+            {
+                serial: {"status": status, "info": {}}
+                for serial, status in (call_status or {}).items()
+            }
+        ),
+        refreshed=frozenset({"devices", "call_status", "areas"}),
+        timings={},
+        errors={},
+    )
+
+
+async def test_removed_devices_and_areas_are_forgotten(api):
+    poller = api.poller
+
+    def armed(mode):
+        return {"D1": [{"group_id": 1, "mode": mode}]}
+
+    await poller.publish_changes(_snapshot(["D1"], {"D1": "ringing"}, armed(1)))
+    assert await poller.publish_changes(_snapshot()) == []  # D1 removed
+    assert not (poller.online or poller.call_status or poller.area_modes)
+
+    # re-added with a different state: a new baseline, no stale change events
+    assert not await poller.publish_changes(_snapshot(["D1"], {"D1": "idle"}, armed(0)))
+    # its area deleted, then recreated armed
+    await poller.publish_changes(_snapshot(["D1"], {"D1": "idle"}, {"D1": []}))
+    assert poller.area_modes == {}
+    assert not await poller.publish_changes(_snapshot(["D1"], {"D1": "idle"}, armed(1)))
+    assert poller.area_modes == {("D1", 1): 1}
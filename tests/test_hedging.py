@@ -0,0 +1,174 @@
+import asyncio
+import time
+
+import pytest
+
+from hikconnect.api import HikConnect
+from hikconnect.budget import CallBudget, caller_tag
+from hikconnect.hedging import HedgingPolicy
+from hikconnect.metrics import Metrics
+from hikconnect.profiling import RequestProfiler
+from hikconnect.simulator import ApiSimulator
+
+pytestmark = pytest.mark.asyncio
+
+SERIAL = "Q00000000"
+
+
+def _warmed_up(latency=0.01, samples=20, **kwargs):
+    policy = HedgingPolicy(min_samples=samples, burst=1, **kwargs)
+    for _ in range(samples):
+        policy.observe("call/status", latency)
+    return policy
+
+
+def _slow_calls(*slow, fast=0.01, slow_latency=2.0):
+    """Return a simulator latency making the ``slow`` calls (counted from 0) slow."""
+    calls = iter(range(1_000_000))
+    return lambda _rng: slow_latency if next(calls) in slow else fast
+
+
+async def test_delay_follows_percentile_of_recent_latency():
+    policy = HedgingPolicy(percentile=90, min_samples=10, window=100)
+
+    for latency in range(1, 10):
+        policy.observe("call/status", latency / 100)
+    assert policy.delay("call/status") is None  # not enough samples yet
+    policy.observe("call/status", 0.1)
+
+    assert policy.delay("call/status") == pytest.approx(0.091)
+    assert policy.delay("devices/pagelist") is None
+    assert HedgingPolicy(min_delay=0.5).applies("call/status", "GET")
+    assert not HedgingPolicy().applies("call/unlock", "PUT")
+
+
+async def test_invalid_policy():
+    with pytest.raises(ValueError):
+        HedgingPolicy(percentile=100)
+    with pytest.raises(ValueError):
+        HedgingPolicy(burst=0)
+
+
+async def test_slow_call_status_is_hedged():
+    policy = HedgingPolicy(min_samples=5, max_extra=0.5)
+    async with (
+        ApiSimulator(devices=1, latency={"call/status": _slow_calls(5)}) as simulator,
+        HikConnect(hedging=policy) as api,
+    ):
+        api.BASE_URL = simulator.base_url
+        await api.login("user@example.com", "hunter2")
+        for _ in range(5):
+            await api.get_call_status(SERIAL)
+
+        start = time.perf_counter()
+        call_status = await api.get_call_status(SERIAL)
+        elapsed = time.perf_counter() - start
+
+        assert call_status["status"] == "idle"
+        assert elapsed < 1
+        assert simulator.request_counts["call/status"] == 7
+        assert policy.stats()["hedged"] == 1
+        assert policy.stats()["hedge_wins"] == 1
+
+
+async def test_duplicates_are_accounted():
+    policy = HedgingPolicy(min_samples=5, max_extra=0.5)
+    metrics, budget, profiler = Metrics(), CallBudget(), RequestProfiler()
+    async with (
+        ApiSimulator(devices=1, latency={"call/status": _slow_calls(5)}) as simulator,
+        HikConnect(
+            hedging=policy, metrics=metrics, budget=budget, profiler=profiler
+        ) as api,
+    ):
+        api.BASE_URL = simulator.base_url
+        await api.login("user@example.com", "hunter2")
+        with caller_tag("doorbell"):
+            for _ in range(6):
+                await api.get_call_status(SERIAL)
+        await asyncio.sleep(0)
+
+    assert policy.stats()["hedged"] == 1
+    call_status = metrics.snapshot()["call/status"]
+    assert call_status["requests"] == 7
+    # the original lost the race: cancelled, not failed, its latency not observed
+    assert call_status["statuses"] == {200: 6, "cancelled": 1}
+    assert call_status["latency"]["count"] == 6
+    assert budget.usage()["doorbell"]["call/status"]["requests"] == 7
+    profiles = [p for p in profiler.recent if p.endpoint == "call/status"]
+    assert len(profiles) == 7
+    # the cancelled original and its duplicate are timed separately
+    original, duplicate = sorted(profiles[-2:], key=lambda p: p.marks["start"])
+    assert "response_start" in duplicate.marks
+    assert "response_start" not in original.marks
+    assert isinstance(original.error, asyncio.CancelledError)
+    assert duplicate.error is None
+
+
+async def test_hedging_stays_within_budget():
+    # every request is slower than the warm-up ones, hedging only as allowed
+    policy = _warmed_up(latency=0.001, samples=1000, window=1000, max_extra=0.25)
+    sent: list[None] = []
+
+    async def send():
+        sent.append(None)
+        await asyncio.sleep(0.02)
+
+    for _ in range(40):
+        await policy.run("call/status", send)
+
+    stats = policy.stats()
+    assert stats["requests"] == 40
+    assert stats["hedged"] == 10
+    assert stats["over_budget"] == 30
+    assert len(sent) == 50
+
+
+async def test_loser_is_cancelled():
+    policy = _warmed_up(max_extra=1)
+    started: list[int] = []
+    cancelled: list[int] = []
+
+    async def send():
+        attempt = len(started)
+        started.append(attempt)
+        try:
+            await asyncio.sleep(10 if attempt == 0 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(attempt)
+            raise
+        return attempt
+
+    assert await policy.run("call/status", send) == 1
+    await asyncio.sleep(0)
+    assert cancelled == [0]
+
+
+async def test_error_of_original_request_when_both_fail():
+    policy = _warmed_up(max_extra=1)
+    attempts: list[int] = []
+
+    async def send():
+        attempt = len(attempts)
+        attempts.append(attempt)
+        await asyncio.sleep(0.05)
+        raise ValueError(f"attempt {attempt}")
+
+    with pytest.raises(ValueError, match="attempt 0"):
+        await policy.run("call/status", send)
+    assert attempts == [0, 1]
+
+
+async def test_failed_original_waits_for_hedge():
+    policy = _warmed_up(max_extra=1)
+    attempts: list[int] = []
+
+    async def send():
+        attempt = len(attempts)
+        attempts.append(attempt)
+        await asyncio.sleep(0.05 if attempt == 0 else 0.1)
+        if attempt == 0:
+            raise ValueError("reset")
+        return "ok"
+
+    assert await policy.run("call/status", send) == "ok"
+    assert policy.hedge_wins == 1
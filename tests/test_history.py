@@ -0,0 +1,90 @@
+import pytest
+from aioresponses import aioresponses
+
+from hikconnect.api import HikConnect
+from hikconnect.history import StatusHistory
+from hikconnect.payloads import call_status_payload, generate_fleet, pagelist_payload
+
+pytestmark = pytest.mark.asyncio
+
+URL = "https://api.hik-connect.com/v3/userdevices/v1/devices/pagelist?groupId=-1&limit=50&offset=0&filter=TIME_PLAN,CONNECTION,SWITCH,STATUS,STATUS_EXT,WIFI,NODISTURB,P2P,KMS,HIDDNS"
+START = 1_760_000_400  # whole hour
+MINUTE = 60
+
+
+async def test_ring_keeps_latest_samples_in_fixed_memory():
+    history = StatusHistory(raw_samples=5, hours=2)
+    history.record("D1", "wifi_signal", 50, at=START)
+    size = history.nbytes()
+    for minute in range(1, 600):
+        history.record("D1", "wifi_signal", minute % 100, at=START + minute * MINUTE)
+
+    assert history.nbytes() == size
+    assert history.samples("D1", "wifi_signal", until=START + 600 * MINUTE) == [
+        (START + minute * MINUTE, minute % 100) for minute in range(595, 600)
+    ]
+    assert list(history.hourly("D1", "wifi_signal", until=START + 600 * MINUTE)) == [
+        START + 7 * 3600,
+        START + 8 * 3600,
+        START + 9 * 3600,  # still being aggregated
+    ]
+
+
+async def test_min_per_hour_and_uptime():
+    history = StatusHistory(raw_samples=60, hours=24)
+    for minute in range(0, 180, 10):  # 3 hours, sample every 10 minutes
+        at = START + minute * MINUTE
+        online = minute < 120 or minute == 170
+        history.record_device("D1", online, 100 - minute if online else None, at=at)
+
+    until = START + 180 * MINUTE
+    assert history.min_per_hour("D1", since=START, until=until) == {
+        START: 50,
+        START + 3600: -10,
+        START + 7200: -70,
+    }
+    assert history.uptime("D1", since=START, until=until) == 13 / 18
+    assert history.uptime("D1", since=START + 7200, until=until) == 1 / 6
+    assert history.uptime("D1", since=until + 1, until=until + 10) is None
+
+    # raw samples no longer reach back, hourly aggregates are used
+    history = StatusHistory(raw_samples=2, hours=24)
+    for minute in range(0, 180, 10):
+        history.record("D1", "is_online", minute < 120, at=START + minute * MINUTE)
+    assert history.uptime("D1", since=START, until=until) == 12 / 18
+
+
+async def test_unknown_metric_and_device():
+    history = StatusHistory()
+    with pytest.raises(ValueError):
+        history.record("D1", "temperature", 20)
+    with pytest.raises(KeyError):
+        history.uptime("D1")
+
+
+async def test_api_records_history():
+    history = StatusHistory()
+    api = HikConnect(history=history)
+    fleet = generate_fleet(3, offline_ratio=0.5, seed=1)
+    try:
+        with aioresponses() as mock:
+            mock.get(URL, payload=pagelist_payload(fleet))
+            mock.get(
+                "https://api.hik-connect.com/v3/devconfig/v1/call/Q00000000/status",
+                payload=call_status_payload(2),
+            )
+            async for _ in api.get_devices(lazy=True):
+                pass
+            await api.get_call_status("Q00000000")
+    finally:
+        await api.close()
+
+    assert history.devices() == [device.serial for device in fleet]
+    for device in fleet:
+        [(_, online)] = history.samples(device.serial, "is_online")
+        assert online == device.is_online
+        signals = history.samples(device.serial, "wifi_signal")
+        assert [signal for _, signal in signals] == (
+            [device.wifi_signal] if device.is_online else []
+        )
+    assert [status for _, status in history.samples("Q00000000", "call_status")] == [2]
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+
+import pytest
+from aioresponses import aioresponses
+
+from hikconnect.inventory import InventoryStore, fetch_inventory
+
+pytestmark = pytest.mark.asyncio
+
+BASE_URL = "https://api.hik-connect.com"
+DEVICES_URL = f"{BASE_URL}/v3/userdevices/v1/devices/pagelist?groupId=-1&limit=50&offset=0&filter=TIME_PLAN,CONNECTION,SWITCH,STATUS,STATUS_EXT,WIFI,NODISTURB,P2P,KMS,HIDDNS"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = InventoryStore(tmp_path / "inventory.sqlite")
+    yield store
+    store.close()
+
+
+def _device(serial, device_type):
+    return {
+        "name": f"device {serial}",
+        "deviceSerial": serial,
+        "fullSerial": f"{device_type}{serial}",
+        "deviceType": device_type,
+        "version": "V1.0.0",
+    }
+
+
+@pytest.fixture
+def devices_response():
+    return {
+        "deviceInfos": [_device("D1", "DS-KH6210-L"), _device("N1", "DS-7608NI")],
+        "statusInfos": {
+            "D1": {"globalStatus": 1, "optionals": {"lockNum": '{"1":2}'}},
+            "N1": {"globalStatus": 0},
+        },
+        "page": {"hasNext": False},
+        "meta": {"code": 200},
+    }
+
+
+def _mock_fleet(mock, devices_response):
+    mock.get(DEVICES_URL, payload=devices_response)
+    for serial in ("D1", "N1"):
+        mock.get(
+            f"{BASE_URL}/v3/userdevices/v1/cameras/info?deviceSerial={serial}",
+            payload={
+                "cameraInfos": [
+                    {
+                        "cameraId": f"cam-{serial}",
+                        "cameraName": "cam",
+                        "channelNo": 1,
+                        "deviceChannelInfo": {"signalStatus": 1},
+                        "isShow": 1,
+                    }
+                ]
+            },
+        )
+    mock.get(f"{BASE_URL}/v3/devices/group/D1/list", status=500)
+    mock.get(
+        f"{BASE_URL}/v3/devices/group/N1/list",
+        payload={
+            "list": [
+                {
+                    "groupId": 7,
+                    "groupDevSerial": "N1",
+                    "groupName": "Hall",
+                    "groupType": 2,
+                    "mode": 0,
+                    "createTime": 1,
+                    "modifyTime": 2,
+                }
+            ]
+        },
+    )
+    mock.get(
+        f"{BASE_URL}/v3/devices/group/N1/7",
+        payload={
+            "list": [{"groupId": 7, "groupDevSerial": "N1", "memberId": "cam-N1"}]
+        },
+    )
+
+
+async def test_fetch_inventory(api, devices_response):
+    with aioresponses() as mock:
+        _mock_fleet(mock, devices_response)
+        inventory = await fetch_inventory(api)
+
+    assert [d["serial"] for d in inventory["devices"]] == ["D1", "N1"]
+    assert inventory["cameras"]["N1"][0]["id"] == "cam-N1"
+    # failed area listing doesn't break the whole sweep
+    assert inventory["areas"]["D1"] == []
+    assert inventory["areas"]["N1"][0]["member_ids"] == ["cam-N1"]
+
+
+async def test_fetch_inventory_survives_timeout(api, devices_response):
+    with aioresponses() as mock:
+        mock.get(
+            f"{BASE_URL}/v3/userdevices/v1/cameras/info?deviceSerial=D1",
+            exception=asyncio.TimeoutError(),
+        )
+        _mock_fleet(mock, devices_response)
+        inventory = await fetch_inventory(api, concurrency=1)
+
+    assert inventory["cameras"]["D1"] == []
+    assert inventory["cameras"]["N1"][0]["id"] == "cam-N1"
+    assert inventory["areas"]["N1"][0]["member_ids"] == ["cam-N1"]
+
+
+async def test_failed_revalidation_is_logged(api, store, caplog):
+    with aioresponses() as mock:
+        mock.get(DEVICES_URL, status=500)
+        task = store.start_revalidation(api)
+        with caplog.at_level(logging.ERROR, logger="hikconnect.inventory"):
+            await asyncio.wait({task})
+
+    assert "Inventory revalidation failed" in caplog.text
+    assert store.stale is True
+
+
+async def test_revalidate_save_and_load(api, store, devices_response):
+    assert store.load()["devices"] == []
+    assert store.saved_at is None
+
+    with aioresponses() as mock:
+        _mock_fleet(mock, devices_response)
+        fetched = await store.start_revalidation(api)
+
+    assert store.stale is False
+    loaded = store.load()
+    assert loaded["devices"] == fetched["devices"]
+    assert loaded["devices"][0]["locks"] == {1: 2}
+    assert loaded["cameras"] == fetched["cameras"]
+    assert loaded["areas"] == fetched["areas"]
+    assert loaded["saved_at"] is not None
+
+
+async def test_reopened_store_is_stale_and_indexed(tmp_path, api, devices_response):
+    path = tmp_path / "inventory.sqlite"
+    store = InventoryStore(path)
+    with aioresponses() as mock:
+        _mock_fleet(mock, devices_response)
+        await store.revalidate(api)
+    store.close()
+
+    store = InventoryStore(path)
+    try:
+        assert store.load()["stale"] is True
+        device = store.get_device("N1")
+        assert device is not None
+        assert device["type"] == "DS-7608NI"
+        assert store.get_device("missing") is None
+        assert [d["serial"] for d in store.find_devices(is_online=False)] == ["N1"]
+        assert [d["serial"] for d in store.find_devices(device_type="DS-KH6210-L")] == [
+            "D1"
+        ]
+        plan = store._db.execute(  # pylint: disable=protected-access
+            "EXPLAIN QUERY PLAN SELECT data FROM devices WHERE is_online = 1"
+        ).fetchall()
+        assert "devices_is_online" in str(plan)
+    finally:
+        store.close()
@@ -0,0 +1,85 @@
+import pytest
+from aiohttp import ClientResponseError
+from aioresponses import aioresponses
+
+from hikconnect.api import HikConnect
+from hikconnect.exceptions import DeviceOffline
+from hikconnect.metrics import Metrics
+
+pytestmark = pytest.mark.asyncio
+
+BASE_URL = "https://api.hik-connect.com"
+
+
+@pytest.fixture
+def api(api):
+    api.metrics = Metrics(latency_buckets=(0.1, 1))
+    return api
+
+
+async def test_requests_are_recorded_per_endpoint(api):
+    with aioresponses() as mock:
+        mock.get(
+            f"{BASE_URL}/v3/devconfig/v1/call/D1/status",
+            payload={"meta": {"code": 2003}},
+        )
+        mock.get(f"{BASE_URL}/v3/devconfig/v1/call/D2/status", status=503)
+        mock.put(
+            f"{BASE_URL}/v3/devconfig/v1/call/D1/1/remote/unlock?srcId=1&lockId=0&userType=0",
+            payload={"meta": {"code": 200}},
+        )
+        with pytest.raises(DeviceOffline):
+            await api.get_call_status("D1")
+        with pytest.raises(ClientResponseError):
+            await api.get_call_status("D2")
+        await api.unlock("D1", 1)
+
+    snapshot = api.metrics.snapshot()
+    assert set(snapshot) == {"call/status", "call/unlock"}
+    status = snapshot["call/status"]
+    assert status["requests"] == 2
+    assert status["statuses"] == {200: 1, 503: 1}
+    assert status["codes"] == {2003: 1}
+    assert status["latency"]["count"] == 2
+    assert status["latency"]["buckets"][float("inf")] == 2
+    assert status["bytes"]["sum"] == len('{"meta": {"code": 2003}}')
+    assert snapshot["call/unlock"]["codes"] == {200: 1}
+
+
+async def test_prometheus_exposition():
+    metrics = Metrics(latency_buckets=(0.1, 1))
+    metrics.observe("devices/pagelist", 200, 200, 0.05, 100)
+    metrics.observe("devices/pagelist", 200, 200, 0.5, 120)
+    metrics.observe("devices/pagelist", None, None, 2.0, 0)
+
+    lines = metrics.to_prometheus().splitlines()
+    assert (
+        'hikconnect_requests_total{endpoint="devices/pagelist",status="200"} 2' in lines
+    )
+    assert (
+        'hikconnect_requests_total{endpoint="devices/pagelist",status="error"} 1'
+        in lines
+    )
+    assert (
+        'hikconnect_response_codes_total{endpoint="devices/pagelist",code="200"} 2'
+        in lines
+    )
+    for le, count in (("0.1", 1), ("1.0", 2), ("+Inf", 3)):
+        assert (
+            f'hikconnect_request_duration_seconds_bucket{{endpoint="devices/pagelist",le="{le}"}} {count}'
+            in lines
+        )
+    assert (
+        'hikconnect_request_duration_seconds_count{endpoint="devices/pagelist"} 3'
+        in lines
+    )
+    assert 'hikconnect_response_bytes_sum{endpoint="devices/pagelist"} 220' in lines
+    assert "# TYPE hikconnect_request_duration_seconds histogram" in lines
+
+    metrics.reset()
+    assert not metrics.snapshot()
+
+
+async def test_metrics_are_disabled_by_default():
+    async with HikConnect() as api:
+        assert api.metrics is None
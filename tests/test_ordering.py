@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from aioresponses import aioresponses
+
+from hikconnect.api import HikConnect
+from hikconnect.ordering import DeviceSerializer
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_same_device_runs_in_order_other_devices_in_parallel():
+    serializer = DeviceSerializer()
+    log = []
+
+    async def operation(device_serial, name, delay):
+        async with serializer.hold(device_serial):
+            log.append(f"start {name}")
+            await asyncio.sleep(delay)
+            log.append(f"end {name}")
+
+    await asyncio.gather(
+        operation("A", "a1", 0.02),
+        operation("A", "a2", 0),
+        operation("B", "b1", 0),
+    )
+
+    # a2 waits for a1, b1 doesn't
+    assert log.index("end a1") < log.index("start a2")
+    assert log.index("end b1") < log.index("end a1")
+
+
+async def test_hold_is_reentrant_and_reports_depth():
+    serializer = DeviceSerializer()
+    depths = []
+
+    async def composite():
+        async with serializer.hold("A"):
+            async with serializer.hold("A"):
+                await asyncio.sleep(0)
+                depths.append(serializer.queue_depths())
+
+    await asyncio.gather(composite(), composite())
+
+    assert depths[0] == {"A": 2}  # one running, one waiting
+    assert depths[1] == {"A": 1}
+    assert serializer.queue_depth("A") == 0
+    assert not serializer.queue_depths()
+
+
+async def test_tasks_started_by_holder_wait_for_their_turn():
+    serializer = DeviceSerializer()
+    log = []
+
+    async def child():
+        async with serializer.hold("A"):
+            log.append("child")
+
+    async with serializer.hold("A"):
+        assert serializer.holds("A")
+        task = asyncio.create_task(child())
+        await asyncio.sleep(0.01)
+        log.append("holder done")
+    await task
+
+    assert log == ["holder done", "child"]
+    assert not serializer.holds("A")
+
+
+async def test_edit_area_members_within_hold():
+    async with HikConnect() as api:
+        url = "https://api.hik-connect.com/v3/devices/group/A"
+        with aioresponses() as mock:
+            mock.get(
+                f"{url}/1",
+                payload={
+                    "list": [{"groupId": 1, "groupDevSerial": "A", "memberId": "x"}]
+                },
+            )
+            mock.delete(f"{url}/1", payload={"meta": {"code": 200}})
+            async with api.device_serializer.hold("A"), asyncio.timeout(1):
+                # applied by the holder itself, not by a task waiting for it
+                result = await api.edit_area_members("A", 1, remove_ids=["x"])
+
+    assert result == {"action": "deleted", "group_id": 1}
+
+
+async def test_area_mutations_are_serialized_per_device():
+    async with HikConnect() as api:
+        requests, depths = [], []
+
+        async def _callback(url, **kwargs):
+            requests.append((url.path.split("/")[4], kwargs["json"]["groupId"]))
+            await asyncio.sleep(0.01)
+            depths.append(api.device_serializer.queue_depths())
+
+        with aioresponses() as mock:
+            url = "https://api.hik-connect.com/v3/devices/group/{}/switchDefenceMode"
+            for serial in ("A", "A", "B"):
+                mock.post(
+                    url.format(serial),
+                    payload={"meta": {"code": 200}},
+                    callback=_callback,
+                )
+            await asyncio.gather(
+                api.arm_area("A", 1), api.disarm_area("A", 2), api.arm_area("B", 3)
+            )
+
+    # the second request of A waits for the first one, B is not blocked by A
+    assert requests == [("A", 1), ("B", 3), ("A", 2)]
+    assert {"A": 2, "B": 1} in depths
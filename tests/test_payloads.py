@@ -0,0 +1,48 @@
+import pytest
+
+from hikconnect.api import HikConnect
+from hikconnect.payloads import (
+    call_status_payloads,
+    cameras_payload,
+    generate_fleet,
+    pagelist_pages,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_fleet_is_deterministic():
+    first, second = generate_fleet(20, seed=3), generate_fleet(20, seed=3)
+    assert [vars(d) for d in first] == [vars(d) for d in second]
+    assert [vars(d) for d in first] != [vars(d) for d in generate_fleet(20, seed=4)]
+
+
+async def test_pages_parse_like_real_responses():
+    fleet = generate_fleet(120, offline_ratio=0.5)
+    pages = pagelist_pages(fleet)
+
+    assert [page["page"]["hasNext"] for page in pages] == [True, True, False]
+    devices = [
+        HikConnect._parse_device(device, page)  # pylint: disable=protected-access
+        for page in pages
+        for device in page["deviceInfos"]
+    ]
+    assert [d["serial"] for d in devices] == [d.serial for d in fleet]
+    assert {d["is_online"] for d in devices} == {True, False}
+    assert devices[1]["locks"] == {1: 1, 2: 1, 3: 2, 4: 0}
+    assert devices[2]["locks"] == {}
+    online = next(d for d in devices if d["is_online"])
+    assert online["local_ip"].startswith("10.")
+    assert online["wan_ip"].startswith("81.")
+
+
+async def test_cameras_and_call_status_payloads():
+    device = generate_fleet(2)[1]
+    assert [c["channelNo"] for c in cameras_payload(device)["cameraInfos"]] == [1, 2]
+
+    parsed = [
+        HikConnect._parse_call_status(payload)  # pylint: disable=protected-access
+        for payload in call_status_payloads(200, ringing_ratio=0.1)
+    ]
+    assert {p["status"] for p in parsed} == {"idle", "ringing"}
+    assert all(len(p["info"]) == len(HikConnect.CALL_INFO_MAPPING) for p in parsed)
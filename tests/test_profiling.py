@@ -0,0 +1,79 @@
+import asyncio
+import json
+import logging
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from hikconnect.api import HikConnect
+from hikconnect.profiling import RequestProfiler
+
+pytestmark = pytest.mark.asyncio
+
+PHASES = {"queue", "dns", "connect", "send", "ttfb", "body", "decode", "total"}
+
+
+@pytest.fixture
+async def server():
+    # aioresponses bypasses aiohttp tracing, so a real local server is used here
+    async def call_status(request):
+        await asyncio.sleep(float(request.query.get("delay", 0)))
+        data = {"callStatus": 1, "callerInfo": {}}
+        return web.json_response({"meta": {"code": 200}, "data": json.dumps(data)})
+
+    app = web.Application()
+    app.router.add_get("/v3/devconfig/v1/call/{serial}/status", call_status)
+    server = TestServer(app)
+    await server.start_server()
+    yield server
+    await server.close()
+
+
+@pytest.fixture
+async def profiler():
+    return RequestProfiler(slow_threshold=0.05)
+
+
+@pytest.fixture
+async def api(server, profiler):
+    api = HikConnect(profiler=profiler)
+    api.BASE_URL = str(server.make_url("")).rstrip("/")
+    yield api
+    await api.close()
+
+
+async def test_phases_are_recorded(api, profiler):
+    await api.get_call_status("D1")
+
+    (profile,) = profiler.recent
+    assert profile.endpoint == "call/status"
+    assert profile.reused_connection is False
+    phases = profile.phases()
+    assert set(phases) == PHASES
+    assert all(duration >= 0 for duration in phases.values())
+    assert phases["total"] >= phases["ttfb"] + phases["decode"]
+
+
+async def test_connection_reuse_is_counted(api, profiler):
+    await api.get_call_status("D1")
+    await api.get_call_status("D2")
+
+    assert profiler.connection_stats() == {"new": 1, "reused": 1}
+    assert [p.reused_connection for p in profiler.recent] == [False, True]
+
+
+async def test_slow_request_is_logged(api, profiler, caplog):
+    with caplog.at_level(logging.WARNING, logger="hikconnect.profiling"):
+        await api.get_call_status("D1")
+        assert not caplog.records
+        await api._request(  # pylint: disable=protected-access
+            "GET",
+            "call/status",
+            f"{api.BASE_URL}/v3/devconfig/v1/call/D1/status?delay=0.1",
+        )
+
+    (record,) = caplog.records
+    assert "Slow request GET 'call/status'" in record.getMessage()
+    assert "ttfb=0.1" in record.getMessage()
+    assert profiler.recent[-1].phases()["ttfb"] >= 0.1
@@ -0,0 +1,133 @@
+import pytest
+from aioresponses import aioresponses
+
+from hikconnect.reconcile import format_plan, reconcile_areas
+from tests.test_topology import BASE_URL, OK_RESPONSE, _area, _members
+
+pytestmark = pytest.mark.asyncio
+
+
+def _mock_actual_state(mock):
+    mock.get(
+        f"{BASE_URL}/v3/devices/group/N1/list",
+        payload={
+            "list": [
+                _area("N1", 1, "Hall"),
+                _area("N1", 2, "Garden"),
+                _area("N1", 3, "Old"),
+            ]
+        },
+    )
+    mock.get(
+        f"{BASE_URL}/v3/devices/group/N1/1",
+        payload=_members("N1", 1, ["a", "b"]),
+    )
+    mock.get(f"{BASE_URL}/v3/devices/group/N1/2", payload=_members("N1", 2, ["c"]))
+    mock.get(f"{BASE_URL}/v3/devices/group/N1/3", payload=_members("N1", 3, ["d"]))
+    mock.get(f"{BASE_URL}/v3/devices/group/N2/list", payload={"list": []})
+
+
+DESIRED = {
+    "N1": {"Hall": ["b", "a"], "Garden": ["c", "e"]},
+    "N2": {"Gate": ["x"]},
+}
+
+
+async def test_dry_run_plans_minimal_operations(api):
+    with aioresponses() as mock:
+        _mock_actual_state(mock)
+        plan = await reconcile_areas(api, DESIRED, dry_run=True)
+
+    # "Hall" has identical members in different order, it's left alone
+    assert [(op["op"], op["device_serial"], op["group_name"]) for op in plan] == [
+        ("delete", "N1", "Old"),
+        ("update", "N1", "Garden"),
+        ("create", "N2", "Gate"),
+    ]
+    assert format_plan(plan).splitlines() == [
+        "delete N1 'Old' (group_id=3): d",
+        "update N1 'Garden' (group_id=2): c, e",
+        "create N2 'Gate': x",
+    ]
+
+
+async def test_reconcile_applies_plan(api):
+    created = []
+
+    def _create_cb(url, **kwargs):
+        created.append((url.path.split("/")[-1], kwargs["json"]))
+
+    with aioresponses() as mock:
+        _mock_actual_state(mock)
+        mock.delete(f"{BASE_URL}/v3/devices/group/N1/3", payload=OK_RESPONSE)
+        mock.delete(f"{BASE_URL}/v3/devices/group/N1/2", payload=OK_RESPONSE)
+        mock.post(
+            f"{BASE_URL}/v3/devices/group/N1",
+            payload={
+                "meta": {"code": 200},
+                "groupInfo": _area("N1", 4, "Garden"),
+            },
+            callback=_create_cb,
+        )
+        mock.post(f"{BASE_URL}/v3/devices/group/N2", status=500, callback=_create_cb)
+        results = await reconcile_areas(api, DESIRED)
+
+    assert [(op["op"], op["result"]) for op in results] == [
+        ("delete", "applied"),
+        ("update", "applied"),
+        ("create", "failed"),
+    ]
+    assert sorted(created) == [
+        ("N1", {"groupName": "Garden", "resourceIds": ["c", "e"]}),
+        ("N2", {"groupName": "Gate", "resourceIds": ["x"]}),
+    ]
+
+
+async def test_reconcile_rejects_empty_area(api):
+    with aioresponses() as mock:
+        _mock_actual_state(mock)
+        with pytest.raises(ValueError, match="no members"):
+            await reconcile_areas(api, {"N1": {"Hall": []}}, dry_run=True)
+
+
+async def test_unreachable_device_is_skipped(api):
+    with aioresponses() as mock:
+        mock.get(f"{BASE_URL}/v3/devices/group/N1/list", status=500, repeat=True)
+        mock.get(
+            f"{BASE_URL}/v3/devices/group/N2/list", payload={"list": []}, repeat=True
+        )
+        mock.post(
+            f"{BASE_URL}/v3/devices/group/N2",
+            payload={"meta": {"code": 200}, "groupInfo": _area("N2", 7, "Gate")},
+        )
+        plan = await reconcile_areas(api, DESIRED, dry_run=True)
+        results = await reconcile_areas(api, DESIRED)
+
+    assert [(op["op"], op["device_serial"]) for op in plan] == [
+        ("skip", "N1"),
+        ("create", "N2"),
+    ]
+    assert (
+        format_plan(plan).splitlines()[0].startswith("skip   N1: ClientResponseError(")
+    )
+    assert [(op["op"], op["result"]) for op in results] == [
+        ("skip", "failed"),
+        ("create", "applied"),
+    ]
+    assert results[0]["error"].status == 500
+
+
+async def test_offline_device_is_skipped(api):
+    with aioresponses() as mock:
+        # an offline NVR answers with meta only, no list
+        mock.get(
+            f"{BASE_URL}/v3/devices/group/N1/list",
+            payload={"meta": {"code": 2003, "message": "Device offline"}},
+        )
+        mock.get(f"{BASE_URL}/v3/devices/group/N2/list", payload={"list": []})
+        plan = await reconcile_areas(api, DESIRED, dry_run=True)
+
+    assert [(op["op"], op["device_serial"]) for op in plan] == [
+        ("skip", "N1"),
+        ("create", "N2"),
+    ]
@@ -0,0 +1,118 @@
+import datetime
+
+import pytest
+
+from hikconnect.api import HikConnect
+from hikconnect.rules import Rule, RuleEngine, between
+from hikconnect.simulator import ApiSimulator
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def setup():
+    engine = RuleEngine(
+        [
+            Rule("resident", {"unit_number": {101, 102}}, "unlock", (1, 0)),
+            Rule(
+                "visitor",
+                {"unit_number": lambda unit: unit is not None and unit >= 200},
+                "cancel_call",
+                condition=lambda serial, call_status: serial == "Q00000000",
+            ),
+            Rule("anything", {}, "answer_call", device_serials=["Q00000003"]),
+        ]
+    )
+    api = HikConnect(rules=engine)
+    async with ApiSimulator(devices=4) as simulator:
+        api.BASE_URL = simulator.base_url
+        await api.login("user", "password")
+        yield api, engine, simulator
+        await api.close()
+
+
+async def test_rule_runs_on_ring(setup):
+    api, engine, simulator = setup
+    await api.get_call_status("Q00000000")
+    simulator.set_call_status("Q00000000", 2, {"unitNo": 101})
+
+    await api.get_call_status("Q00000000")
+    await engine.drain()
+    await api.get_call_status("Q00000000")  # still ringing, no new action
+    await engine.drain()
+
+    assert simulator.unlocks == [("Q00000000", 1, 0)]
+    [result] = engine.results
+    assert (result.rule, result.device_serial, result.command) == (
+        "resident",
+        "Q00000000",
+        "unlock",
+    )
+    assert result.ok
+    assert 0 < result.detect < result.latency
+    stats = engine.latency_stats()
+    assert stats["count"] == 1
+    assert stats["p50"] == stats["p95"] == stats["max"] == result.latency
+
+    simulator.set_call_status("Q00000000", 1)
+    await api.get_call_status("Q00000000")
+    simulator.set_call_status("Q00000000", 2, {"unitNo": 102})
+    await api.get_call_status("Q00000000")
+    await engine.drain()
+    assert len(simulator.unlocks) == 2
+
+
+async def test_rules_match_fields_devices_and_conditions(setup):
+    api, engine, simulator = setup
+    for serial in ("Q00000000", "Q00000001", "Q00000003"):
+        simulator.set_call_status(serial, 2, {"unitNo": 250})
+        await api.get_call_status(serial)
+    await engine.drain()
+
+    assert sorted((r.rule, r.device_serial) for r in engine.results) == [
+        ("anything", "Q00000003"),
+        ("visitor", "Q00000000"),
+    ]
+    assert simulator.unlocks == []
+    assert simulator.devices["Q00000000"].call_status == 1  # cancelled
+
+
+async def test_failed_command_is_recorded(setup):
+    api, engine, simulator = setup
+    simulator.faults = {"call/unlock": {"5xx": 1.0}}
+    simulator.set_call_status("Q00000001", 2, {"unitNo": 101})
+    await api.get_call_status("Q00000001")
+    await engine.drain()
+
+    [result] = engine.results
+    assert not result.ok
+    assert engine.latency_stats()["count"] == 0
+
+
+async def test_failing_predicate_skips_only_its_rule(setup, caplog):
+    api, engine, simulator = setup
+    engine.rules.insert(
+        0, Rule("broken", {"unit_number": lambda unit: 1 / 0}, "cancel_call")
+    )
+    simulator.set_call_status("Q00000001", 2, {"unitNo": 101})
+
+    call_status = await api.get_call_status("Q00000001")
+    await engine.drain()
+
+    assert call_status["status"] == "ringing"
+    assert "Rule 'broken' failed" in caplog.text
+    assert [r.rule for r in engine.results] == ["resident"]
+
+
+async def test_invalid_rules():
+    with pytest.raises(ValueError, match="caller info"):
+        Rule("typo", {"unit": 1}, "unlock")
+    with pytest.raises(ValueError, match="door command"):
+        Rule("typo", {}, "open_sesame")
+
+
+async def test_between():
+    always = between(datetime.time(0), datetime.time.max)
+    never = between(datetime.time.max, datetime.time(0))  # spans midnight
+    assert always("D1", {})
+    assert not never("D1", {})
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+from aiohttp import ClientResponseError
+
+from hikconnect.exceptions import DeviceOffline
+from hikconnect.simulator import ApiSimulator
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _connect(api, simulator):
+    await simulator.start()
+    api.BASE_URL = simulator.base_url
+    await api.login("user", "password")
+
+
+async def test_login_redirect_and_refresh(api):
+    async with ApiSimulator(devices=1, redirect_login=True) as simulator:
+        api.BASE_URL = simulator.base_url
+        await api.login("user", "password")
+        assert api.BASE_URL.startswith("http://localhost:")
+        assert not api.is_refresh_login_needed()
+        await api.refresh_login()
+
+    assert simulator.request_counts == {"login": 2, "login/refresh": 1}
+
+
+async def test_paged_fleet(api):
+    simulator = ApiSimulator(devices=120, offline_ratio=0.5)
+    try:
+        await _connect(api, simulator)
+        devices = [device async for device in api.get_devices()]
+        cameras = [camera async for camera in api.get_cameras(devices[1]["serial"])]
+    finally:
+        await simulator.stop()
+
+    assert len(devices) == 120
+    assert simulator.request_counts["devices/pagelist"] == 3
+    assert 0 < sum(device["is_online"] for device in devices) < 120
+    assert devices[1]["locks"] == {1: 1, 2: 1, 3: 2, 4: 0}
+    assert devices[2]["locks"] == {}  # NVR
+    assert [camera["channel_number"] for camera in cameras] == [1, 2]
+
+
+async def test_fleet_is_deterministic():
+    first, second = ApiSimulator(devices=50, seed=1), ApiSimulator(devices=50, seed=1)
+    assert [d.wifi_signal for d in first.devices.values()] == [
+        d.wifi_signal for d in second.devices.values()
+    ]
+
+
+async def test_area_crud_and_call_flow(api):
+    simulator = ApiSimulator(devices=3)
+    try:
+        await _connect(api, simulator)
+        area = await api.create_area("Q00000002", "Hall", ["cam1"])
+        await api.arm_area("Q00000002", area["group_id"])
+        updated = await api.update_area("Q00000002", area["group_id"], "Hall", ["c2"])
+        areas = [area async for area in api.get_areas("Q00000002")]
+        members = await api.get_area("Q00000002", updated["group_id"])
+
+        simulator.set_call_status("Q00000000", 2, {"unitNo": 7})
+        ringing = await api.get_call_status("Q00000000")
+        await api.unlock("Q00000000", 1)
+        await api.cancel_call("Q00000000")
+        idle = await api.get_call_status("Q00000000")
+    finally:
+        await simulator.stop()
+
+    assert [a["group_name"] for a in areas] == ["Hall"]
+    assert [m["member_id"] for m in members] == ["c2"]
+    assert ringing == {"status": "ringing", "info": {"unit_number": 7}}
+    assert idle["status"] == "idle"
+    assert simulator.unlocks == [("Q00000000", 1, 0)]
+
+
+async def test_offline_device(api):
+    simulator = ApiSimulator(devices=1)
+    simulator.set_online("Q00000000", False)
+    try:
+        await _connect(api, simulator)
+        with pytest.raises(DeviceOffline):
+            await api.get_call_status("Q00000000")
+    finally:
+        await simulator.stop()
+
+
+async def test_faults_rate_limits_and_latency(api):
+    simulator = ApiSimulator(
+        devices=1,
+        latency={"call/status": 0.05},
+        rate_limits={"call/unlock": (1, 60)},
+        faults={"call/answer": {"5xx": 1.0}, "call/hangup": {"timeout": 1.0}},
+        hang_time=5,
+    )
+    try:
+        await _connect(api, simulator)
+        start = asyncio.get_running_loop().time()
+        await api.get_call_status("Q00000000")
+        assert asyncio.get_running_loop().time() - start >= 0.05
+
+        await api.unlock("Q00000000", 1)
+        with pytest.raises(ClientResponseError) as e:
+            await api.unlock("Q00000000", 1)
+        assert e.value.status == 429
+        with pytest.raises(ClientResponseError) as e:
+            await api.answer_call("Q00000000")
+        assert e.value.status in (500, 502, 503)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(api.hangup_call("Q00000000"), 0.1)
+    finally:
+        await simulator.stop()
+
+
+async def test_start_twice_is_refused():
+    async with ApiSimulator(devices=1) as simulator:
+        base_url = simulator.base_url
+        with pytest.raises(RuntimeError):
+            await simulator.start()
+        assert simulator.base_url == base_url
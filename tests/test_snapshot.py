@@ -0,0 +1,80 @@
+from collections import Counter
+
+import pytest
+from aioresponses import aioresponses
+
+from hikconnect.payloads import generate_fleet, pagelist_pages
+from hikconnect.snapshot import UNKNOWN, FleetSnapshot
+
+pytestmark = pytest.mark.asyncio
+
+URL = "https://api.hik-connect.com/v3/userdevices/v1/devices/pagelist?groupId=-1&limit=50&offset={}&filter=TIME_PLAN,CONNECTION,SWITCH,STATUS,STATUS_EXT,WIFI,NODISTURB,P2P,KMS,HIDDNS"
+
+
+@pytest.fixture
+def pages():
+    return pagelist_pages(generate_fleet(120, seed=2, offline_ratio=0.3))
+
+
+async def test_snapshot_matches_get_devices(api, pages):
+    with aioresponses() as mock:
+        for page in pages * 2:
+            mock.get(URL.format(page["page"]["offset"]), payload=page)
+        devices = [device async for device in api.get_devices()]
+        snapshot = await FleetSnapshot.fetch(api)
+
+    assert len(snapshot) == 120
+    assert snapshot.serials == [d["serial"] for d in devices]
+    assert [snapshot.types[code] for code in snapshot.type_codes] == [
+        d["type"] for d in devices
+    ]
+    assert [snapshot.versions[code] for code in snapshot.version_codes] == [
+        d["version"] for d in devices
+    ]
+    assert list(snapshot.is_online) == [int(d["is_online"]) for d in devices]
+    assert list(snapshot.wifi_signal) == [
+        UNKNOWN if d["wifi_signal"] is None else d["wifi_signal"] for d in devices
+    ]
+
+    assert snapshot.counts("type") == Counter(d["type"] for d in devices)
+    assert snapshot.counts("type", is_online=False) == Counter(
+        d["type"] for d in devices if not d["is_online"]
+    )
+    histogram = snapshot.signal_histogram("version", bin_width=50)
+    assert sum(sum(bins.values()) for bins in histogram.values()) == sum(
+        d["is_online"] for d in devices
+    )
+    assert {start for bins in histogram.values() for start in bins} <= {0, 50, 100}
+
+
+async def test_snapshot_unknown_values_and_errors():
+    page = pagelist_pages(generate_fleet(1))[0]
+    page["statusInfos"] = {}
+    snapshot = FleetSnapshot.from_pages([page])
+
+    assert list(snapshot.is_online) == [UNKNOWN]
+    assert list(snapshot.update_available) == [UNKNOWN]
+    assert list(snapshot.wifi_signal) == [UNKNOWN]
+    with pytest.raises(ValueError):
+        snapshot.counts("serial")
+
+
+async def test_to_numpy(pages):
+    numpy = pytest.importorskip("numpy")
+    snapshot = FleetSnapshot.from_pages(pages)
+    columns = snapshot.to_numpy()
+
+    offline = columns["is_online"] == 0
+    assert dict(Counter(columns["type"][offline])) == snapshot.counts(
+        "type", is_online=False
+    )
+    assert numpy.shares_memory(columns["wifi_signal"], snapshot.wifi_signal)
+
+
+async def test_to_arrow(pages):
+    pytest.importorskip("pyarrow")
+    table = FleetSnapshot.from_pages(pages).to_arrow()
+
+    assert table.num_rows == 120
+    assert table.column("is_online").null_count == 0
+    assert set(table.column("type").to_pylist()) == {d.type for d in generate_fleet(3)}
@@ -0,0 +1,189 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import ClientTimeout
+
+from hikconnect.api import HikConnect
+from hikconnect.exceptions import DeadlineExceeded
+from hikconnect.simulator import ApiSimulator
+from hikconnect.timeouts import deadline, request_timeout, resolve_timeout, time_left
+
+pytestmark = pytest.mark.asyncio
+
+SERIAL = "Q00000000"
+CAMERAS = ["Q00000000-cam1", "Q00000000-cam2"]
+DEFAULT = ClientTimeout(total=300, sock_connect=30)
+
+
+@pytest.fixture
+async def connect():
+    apis = []
+
+    async def connect(simulator, **kwargs):
+        api = HikConnect(**kwargs)
+        apis.append(api)
+        api.BASE_URL = simulator.base_url
+        await api.login("user@example.com", "hunter2")
+        return api
+
+    yield connect
+    for api in apis:
+        await api.close()
+
+
+def _resolve(timeouts: dict[str, ClientTimeout], endpoint: str) -> ClientTimeout:
+    timeout = resolve_timeout(timeouts, endpoint, DEFAULT)
+    assert timeout is not None
+    return timeout
+
+
+def _time_left() -> float:
+    left = time_left()
+    assert left is not None
+    return left
+
+
+async def test_resolve_timeout():
+    timeouts = {"*": ClientTimeout(total=30), "call/unlock": ClientTimeout(total=5)}
+
+    assert resolve_timeout({}, "call/status", DEFAULT) is None
+    assert _resolve(timeouts, "call/unlock").total == 5
+    assert _resolve(timeouts, "call/status").total == 30
+    with request_timeout(2):
+        assert _resolve(timeouts, "call/unlock").total == 2
+
+    with deadline(10):
+        assert _resolve(timeouts, "call/unlock").total == 5
+        assert _resolve(timeouts, "*").total == pytest.approx(10, abs=0.1)
+        cut = _resolve({}, "call/status")
+        assert cut.total == pytest.approx(10, abs=0.1)
+        assert cut.sock_connect == 30
+        with deadline(20):  # can't extend the enclosing one
+            assert _time_left() <= 10
+        with deadline(-1):
+            with pytest.raises(DeadlineExceeded):
+                resolve_timeout(timeouts, "call/status", DEFAULT)
+    assert time_left() is None
+
+
+async def test_per_endpoint_timeout(connect):
+    async with ApiSimulator(
+        devices=1, latency={"devices/pagelist": 1, "call/status": 0.2}
+    ) as simulator:
+        api = await connect(simulator, timeouts={"devices/pagelist": 0.1})
+
+        start = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            async for _ in api.get_devices():
+                pass
+        assert time.perf_counter() - start < 0.5
+        # endpoints without a timeout of their own aren't affected
+        assert (await api.get_call_status(SERIAL))["status"] == "idle"
+
+
+async def test_per_call_override(connect):
+    async with ApiSimulator(devices=1, latency={"call/status": 0.3}) as simulator:
+        api = await connect(simulator, timeouts={"*": 5})
+
+        with request_timeout(ClientTimeout(total=0.1)):
+            with pytest.raises(asyncio.TimeoutError):
+                await api.get_call_status(SERIAL)
+        assert (await api.get_call_status(SERIAL))["status"] == "idle"
+
+
+async def test_update_area_within_one_deadline(connect):
+    async with ApiSimulator(
+        devices=1, latency={"group/delete": 0.1, "group/create": 0.1}
+    ) as simulator:
+        api = await connect(simulator)
+        area = await api.create_area(SERIAL, "Garden", CAMERAS[:1])
+
+        updated = await api.update_area(
+            SERIAL, area["group_id"], "Garden", CAMERAS, timeout=1
+        )
+        assert updated["group_name"] == "Garden"
+
+        # each request fits in the timeout, both don't
+        with pytest.raises(asyncio.TimeoutError):
+            await api.update_area(
+                SERIAL, updated["group_id"], "Garden", CAMERAS[:1], timeout=0.15
+            )
+        assert simulator.request_counts["group/delete"] == 2
+        assert simulator.request_counts["group/create"] == 3
+
+
+async def test_deadline_over_before_sending(connect):
+    async with ApiSimulator(devices=1) as simulator:
+        api = await connect(simulator)
+        area = await api.create_area(SERIAL, "Garden", CAMERAS[:1])
+
+        with deadline(0.05):
+            await asyncio.sleep(0.1)
+            with pytest.raises(DeadlineExceeded):
+                await api.update_area(SERIAL, area["group_id"], "Garden", CAMERAS)
+        assert "group/delete" not in simulator.request_counts
+
+
+async def test_coalesced_edit_caller_stops_waiting_at_its_deadline(connect):
+    async with ApiSimulator(devices=1, latency={"group/detail": 0.3}) as simulator:
+        api = await connect(simulator)
+        area = await api.create_area(SERIAL, "Garden", CAMERAS[:1])
+
+        first = asyncio.create_task(
+            api.edit_area_members(
+                SERIAL, area["group_id"], add_ids=CAMERAS[1:], group_name="Garden"
+            )
+        )
+        await asyncio.sleep(0)
+        with pytest.raises(DeadlineExceeded):
+            await api.edit_area_members(
+                SERIAL, area["group_id"], remove_ids=CAMERAS[:1], timeout=0.1
+            )
+
+        result = await first  # the coalesced edits still apply
+        assert result["action"] == "updated"
+        assert result["member_ids"] == CAMERAS[1:]
+
+
+async def test_update_area_deadline_includes_waiting_for_device(connect):
+    async with ApiSimulator(devices=1, latency={"group/delete": 1}) as simulator:
+        api = await connect(simulator)
+        area = await api.create_area(SERIAL, "Garden", CAMERAS[:1])
+        other = await api.create_area(SERIAL, "Porch", CAMERAS[:1])
+
+        first = asyncio.create_task(
+            api.update_area(SERIAL, area["group_id"], "Garden", CAMERAS)
+        )
+        await asyncio.sleep(0)
+        # queued behind the first update for much longer than its deadline
+        start = time.perf_counter()
+        with pytest.raises(DeadlineExceeded):
+            await api.update_area(
+                SERIAL, other["group_id"], "Porch", CAMERAS, timeout=0.1
+            )
+        assert time.perf_counter() - start < 0.3
+        await first
+        assert simulator.request_counts["group/delete"] == 1
+        assert api.device_serializer.queue_depth(SERIAL) == 0
+
+
+async def test_area_edit_deadline_includes_waiting_for_device(connect):
+    async with ApiSimulator(devices=1, latency={"group/delete": 1}) as simulator:
+        api = await connect(simulator)
+        area = await api.create_area(SERIAL, "Garden", CAMERAS[:1])
+        other = await api.create_area(SERIAL, "Porch", CAMERAS[:1])
+
+        first = asyncio.create_task(
+            api.update_area(SERIAL, area["group_id"], "Garden", CAMERAS)
+        )
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        with pytest.raises(DeadlineExceeded):
+            await api.edit_area_members(
+                SERIAL, other["group_id"], add_ids=CAMERAS[1:], timeout=0.1
+            )
+        assert time.perf_counter() - start < 0.3
+        await first
+        # the edit gave up waiting for the device, nothing of it was sent
+        assert "group/detail" not in simulator.request_counts
@@ -0,0 +1,228 @@
+import asyncio
+
+import pytest
+from aioresponses import aioresponses
+
+from hikconnect.topology import AreaTopology
+
+pytestmark = pytest.mark.asyncio
+
+BASE_URL = "https://api.hik-connect.com"
+OK_RESPONSE = {"meta": {"code": 200}}
+
+
+def _area(serial, group_id, name, modify_time=1000):
+    return {
+        "groupId": group_id,
+        "groupDevSerial": serial,
+        "groupName": name,
+        "groupType": 2,
+        "mode": 0,
+        "createTime": 1000,
+        "modifyTime": modify_time,
+    }
+
+
+def _members(serial, group_id, member_ids):
+    return {
+        "list": [
+            {"groupId": group_id, "groupDevSerial": serial, "memberId": member_id}
+            for member_id in member_ids
+        ]
+    }
+
+
+def _mock_fleet(mock):
+    mock.get(
+        f"{BASE_URL}/v3/devices/group/N1/list",
+        payload={"list": [_area("N1", 1, "Hall"), _area("N1", 2, "Garden")]},
+    )
+    mock.get(f"{BASE_URL}/v3/devices/group/N1/1", payload=_members("N1", 1, ["a", "b"]))
+    mock.get(f"{BASE_URL}/v3/devices/group/N1/2", payload=_members("N1", 2, ["b"]))
+    mock.get(
+        f"{BASE_URL}/v3/devices/group/N2/list",
+        payload={"list": [_area("N2", 5, "Gate")]},
+    )
+    mock.get(f"{BASE_URL}/v3/devices/group/N2/5", payload=_members("N2", 5, ["c"]))
+
+
+@pytest.fixture
+async def topology(api):
+    topology = AreaTopology(api)
+    with aioresponses() as mock:
+        _mock_fleet(mock)
+        await topology.build(["N1", "N2"])
+    return topology
+
+
+def _group_ids(areas):
+    return sorted(area["group_id"] for area in areas)
+
+
+async def test_build_indexes_all_directions(topology):
+    assert _group_ids(topology.areas_for_device("N1")) == [1, 2]
+    assert _group_ids(topology.areas_for_device("N2")) == [5]
+    assert topology.members("N1", 1) == {"a", "b"}
+    assert _group_ids(topology.areas_for_camera("b")) == [1, 2]
+    assert _group_ids(topology.areas_for_camera("c")) == [5]
+    assert topology.areas_for_camera("unknown") == []
+    assert topology.get_area("N1", 2)["group_name"] == "Garden"
+
+
+async def test_create_and_delete_update_index(topology):
+    with aioresponses() as mock:
+        mock.post(
+            f"{BASE_URL}/v3/devices/group/N2",
+            payload={"meta": {"code": 200}, "groupInfo": _area("N2", 6, "Yard")},
+        )
+        mock.delete(f"{BASE_URL}/v3/devices/group/N1/2", payload=OK_RESPONSE)
+        await topology.create_area("N2", "Yard", ["b", "c"])
+        await topology.delete_area("N1", 2)
+
+    assert _group_ids(topology.areas_for_camera("b")) == [1, 6]
+    assert _group_ids(topology.areas_for_camera("c")) == [5, 6]
+    assert _group_ids(topology.areas_for_device("N1")) == [1]
+    assert topology.get_area("N1", 2) is None
+
+
+async def test_edit_area_members_follows_recreated_area(topology):
+    with aioresponses() as mock:
+        mock.get(
+            f"{BASE_URL}/v3/devices/group/N1/1", payload=_members("N1", 1, ["a", "b"])
+        )
+        # no /list call: group name is taken from the index, the new area
+        # (with its modify_time) from the create response
+        mock.delete(f"{BASE_URL}/v3/devices/group/N1/1", payload=OK_RESPONSE)
+        mock.post(
+            f"{BASE_URL}/v3/devices/group/N1",
+            payload={
+                "meta": {"code": 200},
+                "groupInfo": _area("N1", 3, "Hall", modify_time=3000),
+            },
+        )
+        result = await topology.edit_area_members("N1", 1, remove_ids=["a"])
+
+    assert result["group_id"] == 3
+    assert topology.get_area("N1", 1) is None
+    assert topology.get_area("N1", 3)["group_name"] == "Hall"
+    assert topology.get_area("N1", 3)["modify_time"] == 3000
+    assert topology.areas_for_camera("a") == []
+    assert _group_ids(topology.areas_for_camera("b")) == [2, 3]
+
+
+async def test_sync_after_editing_area_not_indexed(api):
+    topology = AreaTopology(api)
+    with aioresponses() as mock:
+        mock.get(f"{BASE_URL}/v3/devices/group/N3/7", payload=_members("N3", 7, ["e"]))
+        mock.get(
+            f"{BASE_URL}/v3/devices/group/N3/list",
+            payload={"list": [_area("N3", 7, "Porch")]},
+        )
+        mock.delete(f"{BASE_URL}/v3/devices/group/N3/7", payload=OK_RESPONSE)
+        mock.post(
+            f"{BASE_URL}/v3/devices/group/N3",
+            payload={
+                "meta": {"code": 200},
+                "groupInfo": _area("N3", 8, "Porch"),
+            },
+        )
+        mock.get(
+            f"{BASE_URL}/v3/devices/group/N3/list",
+            payload={"list": [_area("N3", 8, "Porch")]},
+            repeat=True,
+        )
+        await topology.edit_area_members("N3", 7, add_ids=["f"])
+        # the recreated area is indexed with its metadata, so it isn't re-fetched
+        changes = await topology.sync(["N3"])
+
+    assert topology.members("N3", 8) == {"e", "f"}
+    assert changes == {"created": [], "modified": [], "deleted": [], "failed": {}}
+
+
+async def test_edit_area_members_removing_last_member(topology):
+    with aioresponses() as mock:
+        mock.get(f"{BASE_URL}/v3/devices/group/N2/5", payload=_members("N2", 5, ["c"]))
+        mock.delete(f"{BASE_URL}/v3/devices/group/N2/5", payload=OK_RESPONSE)
+        result = await topology.edit_area_members("N2", 5, remove_ids=["c"])
+
+    assert result["action"] == "deleted"
+    assert topology.areas_for_device("N2") == []
+    assert topology.areas_for_camera("c") == []
+
+
+async def test_sync_fetches_only_new_and_modified_areas(topology):
+    with aioresponses() as mock:
+        mock.get(
+            f"{BASE_URL}/v3/devices/group/N1/list",
+            payload={
+                "list": [
+                    _area("N1", 1, "Hall", modify_time=2000),
+                    _area("N1", 4, "Attic"),
+                ]
+            },
+        )
+        # area 2 is gone; only the modified area 1 and the new area 4 are fetched
+        mock.get(f"{BASE_URL}/v3/devices/group/N1/1", payload=_members("N1", 1, ["a"]))
+        mock.get(f"{BASE_URL}/v3/devices/group/N1/4", payload=_members("N1", 4, ["d"]))
+        mock.get(
+            f"{BASE_URL}/v3/devices/group/N2/list",
+            payload={"list": [_area("N2", 5, "Gate")]},
+        )
+        changes = await topology.sync(["N1", "N2"])
+        requested = [str(url) for _method, url in mock.requests or {}]
+
+    assert _group_ids(changes["created"]) == [4]
+    assert _group_ids(changes["modified"]) == [1]
+    assert _group_ids(changes["deleted"]) == [2]
+    assert f"{BASE_URL}/v3/devices/group/N2/5" not in requested
+    assert topology.members("N1", 1) == {"a"}
+    assert topology.members("N2", 5) == {"c"}
+    assert topology.areas_for_camera("b") == []
+    assert _group_ids(topology.areas_for_camera("d")) == [4]
+
+
+async def test_sync_continues_past_failed_device(topology):
+    with aioresponses() as mock:
+        mock.get(f"{BASE_URL}/v3/devices/group/N1/list", status=500)
+        mock.get(
+            f"{BASE_URL}/v3/devices/group/N2/list",
+            payload={"list": [_area("N2", 5, "Gate"), _area("N2", 6, "Yard")]},
+        )
+        mock.get(f"{BASE_URL}/v3/devices/group/N2/6", payload=_members("N2", 6, ["c"]))
+        changes = await topology.sync(["N1", "N2"])
+
+    assert list(changes["failed"]) == ["N1"]
+    assert _group_ids(changes["created"]) == [6]
+    # areas of the failed device stay indexed as they were
+    assert _group_ids(topology.areas_for_device("N1")) == [1, 2]
+
+
+async def test_sync_limits_concurrency(api):
+    in_flight = peak = 0
+
+    async def _callback(_url, **_kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    topology = AreaTopology(api)
+    serials = [f"N{i}" for i in range(5)]
+    with aioresponses() as mock:
+        for serial in serials:
+            mock.get(
+                f"{BASE_URL}/v3/devices/group/{serial}/list",
+                payload={"list": [_area(serial, 1, "Hall"), _area(serial, 2, "Yard")]},
+                callback=_callback,
+            )
+            for group_id in (1, 2):
+                mock.get(
+                    f"{BASE_URL}/v3/devices/group/{serial}/{group_id}",
+                    payload=_members(serial, group_id, ["a"]),
+                    callback=_callback,
+                )
+        changes = await topology.sync(serials, concurrency=2)
+
+    assert len(changes["created"]) == 10
+    assert peak == 2